@@ -0,0 +1 @@
+# empty file to mark this folder as a module
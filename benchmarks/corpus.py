@@ -0,0 +1,205 @@
+# benchmarks/corpus.py
+#
+# Synthetic corpus for benchmarks: articles whose text embeds known entity
+# names, so mentions (with offsets into "title\ncontent", as process_articles.py
+# stores them), keyword tags and span annotations can be written alongside
+# without running NER. Everything is seeded, so a given scale always produces
+# the same database, and the feeds/pages written by write_site() are stable
+# inputs for the local feed server.
+import os
+import random
+from datetime import datetime, timedelta
+from html import escape
+
+from sqlalchemy import func, insert, select
+
+from data.db.article_model import (
+    Article, ArticleEntity, ArticleLabel, ArticleSpanAnnotation, get_session,
+)
+from data.db.versions import bump_version, ARTICLES, ENTITIES, LABELS, SPANS
+from digester.categorizer import KEYWORDS, categorize_article
+from digester.entity_extractor import mention_context
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000}
+
+# (name, raw spaCy label, taxonomy label)
+ENTITIES_POOL = (
+    [(f"{a} {b}", "ORG", "COMPANY") for a in (
+        "Luminar", "Hesai", "Ouster", "Coherent", "Thorlabs", "Zeiss", "Trumpf", "IPG",
+        "Lumentum", "Jenoptik", "Hamamatsu", "Edmund", "Newport", "Toptica", "NKT", "Aeva",
+    ) for b in ("Photonics", "Optics", "Technologies", "Systems")]
+    + [(f"University of {c}", "ORG", "UNIVERSITY") for c in (
+        "Arizona", "Rochester", "Central Florida", "Twente", "Jena", "Southampton",
+        "Toronto", "Tokyo", "Adelaide", "Stuttgart", "Glasgow", "Michigan",
+    )]
+    + [(n, "ORG", "GOV_LAB") for n in (
+        "Lawrence Livermore National Laboratory", "Los Alamos National Laboratory", "NIST",
+        "Sandia National Laboratories", "Argonne National Laboratory", "NASA Goddard",
+    )]
+    + [(f"{f} {l}", "PERSON", "PERSON") for f in (
+        "Anna", "Wei", "Carlos", "Priya", "Jonas", "Fatima", "Kenji", "Laura",
+    ) for l in ("Schmidt", "Chen", "Garcia", "Patel", "Novak", "Okafor", "Tanaka", "Rossi")]
+    + [(g, "GPE", "GPE") for g in (
+        "Germany", "China", "Japan", "California", "Texas", "France", "Israel", "Canada",
+    )]
+)
+
+_WORDS = (
+    "optical", "wavelength", "fiber", "photon", "detector", "sensor", "beam", "pulse",
+    "spectrometer", "lens", "coating", "wafer", "module", "array", "silicon", "quantum",
+    "imaging", "resolution", "efficiency", "throughput", "prototype", "manufacturing",
+    "semiconductor", "infrared", "visible", "emission", "cavity", "modulator", "waveguide",
+    "integrated", "compact", "automotive", "industrial", "medical", "research", "market",
+    "revenue", "partnership", "announced", "demonstrated", "improved", "reduced", "record",
+    "power", "noise", "bandwidth", "thermal", "alignment", "packaging", "supply", "volume",
+)
+_TOPIC_WORDS = [w for words in KEYWORDS.values() for w in words]
+
+
+def _sentence(rng, n_words):
+    words = rng.choices(_WORDS, k=n_words)
+    if rng.random() < 0.3:
+        words[rng.randrange(n_words)] = rng.choice(_TOPIC_WORDS)
+    return " ".join(words).capitalize() + "."
+
+
+def generate_articles(n, seed=0, mentions_per_article=8, sentences=10, days=90, end=None):
+    """
+    Yield n article dicts (title, summary, content, source, link, published,
+    fetched_at, mentions). Mentions are (name, raw_label, custom_label,
+    start_char, end_char) with offsets into "title\\ncontent".
+    """
+    rng = random.Random(seed)
+    end = end or datetime(2025, 1, 1)
+    sources = [f"Synthetic Source {i}" for i in range(20)]
+    for i in range(n):
+        title_entity = rng.choice(ENTITIES_POOL)
+        title = f"{title_entity[0]} {rng.choice(_WORDS)} {rng.choice(_WORDS)} {rng.choice(_WORDS)}"
+        mentions = [(title_entity[0], title_entity[1], title_entity[2], 0, len(title_entity[0]))]
+
+        # body: sentences with entity names appended, offsets tracked as we go
+        offset = len(title) + 1
+        parts = []
+        for j in range(sentences):
+            sent = _sentence(rng, rng.randint(8, 16))
+            if j < mentions_per_article - 1:
+                name, raw, custom = rng.choice(ENTITIES_POOL)
+                sent = sent[:-1] + ", said " if raw == "PERSON" else sent[:-1] + " at "
+                start = offset + sum(len(p) + 1 for p in parts) + len(sent)
+                mentions.append((name, raw, custom, start, start + len(name)))
+                sent += name + "."
+            parts.append(sent)
+        content = " ".join(parts)
+        fetched_at = end - timedelta(seconds=rng.randrange(days * 86400))
+        yield {
+            "title": title,
+            "summary": parts[0],
+            "content": content,
+            "source": rng.choice(sources),
+            "link": f"https://synthetic.example/{seed}/{i}",
+            "published": fetched_at.strftime("%a, %d %b %Y %H:%M:%S +0000"),
+            "fetched_at": fetched_at,
+            "mentions": mentions,
+        }
+
+
+def populate(db_url, n, seed=0, processed=True, span_rate=0.1, chunk_size=2000):
+    """
+    Bulk-insert n synthetic articles into `db_url`. With processed=True the
+    mentions, keyword labels and (for `span_rate` of the articles) span
+    annotations are written too, as if process_articles.py and an annotator
+    had already run; otherwise articles are left for the processor.
+    Returns the number of articles written.
+    """
+    session = get_session(db_url)
+    try:
+        next_id = (session.execute(select(func.max(Article.id))).scalar() or 0) + 1
+        rng = random.Random(seed + 1)
+        articles, entities, labels, spans = [], [], [], []
+
+        def flush():
+            session.execute(insert(Article), articles)
+            for model, rows in ((ArticleEntity, entities), (ArticleLabel, labels), (ArticleSpanAnnotation, spans)):
+                if rows:
+                    session.execute(insert(model), rows)
+            session.commit()
+            for rows in (articles, entities, labels, spans):
+                rows.clear()
+
+        written = 0
+        for art in generate_articles(n, seed=seed):
+            aid = next_id + written
+            text = f"{art['title']}\n{art['content']}"
+            tags = categorize_article(art) if processed else []
+            articles.append({
+                "id": aid, "title": art["title"], "link": art["link"], "summary": art["summary"],
+                "content": art["content"], "published": art["published"], "source": art["source"],
+                "fetched_at": art["fetched_at"], "tags": ",".join(tags),
+                "categorized_at": art["fetched_at"] if processed else None,
+            })
+            if processed:
+                for name, raw, custom, start, end in art["mentions"]:
+                    context, context_start = mention_context(text, start, end)
+                    entities.append({
+                        "article_id": aid, "name": name, "type": raw, "raw_label": raw,
+                        "custom_label": custom, "start_char": start, "end_char": end,
+                        "context": context, "context_start": context_start,
+                    })
+                labels.extend({"article_id": aid, "label": t} for t in tags)
+                if rng.random() < span_rate:
+                    # annotator text is the content alone (no title)
+                    name, _, custom, start, end = art["mentions"][-1]
+                    shift = len(art["title"]) + 1
+                    spans.append({
+                        "article_id": aid, "start_char": start - shift, "end_char": end - shift,
+                        "label": custom, "text": name, "annotator": "synthetic",
+                    })
+            written += 1
+            if len(articles) >= chunk_size:
+                flush()
+        if articles:
+            flush()
+        bump_version(session, ARTICLES, ENTITIES, LABELS, SPANS)
+        session.commit()
+        return written
+    finally:
+        session.close()
+
+
+def write_site(out_dir, n_feeds=5, per_feed=20, seed=0):
+    """
+    Write recorded-style fixtures: feeds/feed_<i>.xml (RSS 2.0) and
+    pages/<id>.html. Links use the {{BASE_URL}} placeholder the feed server
+    substitutes, so fixtures work on any port. Returns the feed paths.
+    """
+    os.makedirs(os.path.join(out_dir, "feeds"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "pages"), exist_ok=True)
+    articles = list(generate_articles(n_feeds * per_feed, seed=seed))
+    feeds = []
+    for f in range(n_feeds):
+        items = []
+        for k, art in enumerate(articles[f * per_feed:(f + 1) * per_feed]):
+            page_id = f * per_feed + k
+            page = (
+                f"<html><head><title>{escape(art['title'])}</title></head><body>"
+                f"<nav>Home | News | Products</nav><article><h1>{escape(art['title'])}</h1>"
+                + "".join(f"<p>{escape(s)}.</p>" for s in art["content"].split(". ") if s)
+                + "</article><footer>© Synthetic Photonics Media</footer></body></html>"
+            )
+            with open(os.path.join(out_dir, "pages", f"{page_id}.html"), "w", encoding="utf-8") as fh:
+                fh.write(page)
+            items.append(
+                f"<item><title>{escape(art['title'])}</title>"
+                f"<link>{{{{BASE_URL}}}}/pages/{page_id}.html</link>"
+                f"<description>{escape(art['summary'])}</description>"
+                f"<pubDate>{art['published']}</pubDate></item>"
+            )
+        path = os.path.join(out_dir, "feeds", f"feed_{f}.xml")
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.write(
+                '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+                f"<title>Synthetic feed {f}</title><link>{{{{BASE_URL}}}}</link>"
+                f"<description>Benchmark fixture</description>{''.join(items)}</channel></rss>"
+            )
+        feeds.append(path)
+    return feeds
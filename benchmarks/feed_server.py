@@ -0,0 +1,199 @@
+# benchmarks/feed_server.py
+#
+# Local stand-in for feed and article sites. Serves a fixtures directory
+# (feeds/*.xml, pages/*.html — written by corpus.write_site() or recorded from
+# the real sources with --record) over HTTP with configurable latency and
+# error rate, so fetch benchmarks are repeatable and never touch the network.
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+BASE_URL_PLACEHOLDER = "{{BASE_URL}}"
+
+CONTENT_TYPES = {
+    ".xml": "application/rss+xml; charset=utf-8",
+    ".html": "text/html; charset=utf-8",
+}
+
+
+class FeedServer:
+    """
+    with FeedServer("benchmarks/fixtures", latency=0.05, error_rate=0.1) as server:
+        run_fetch(server.sources())
+
+    Each request sleeps latency + uniform(0, jitter) seconds; `error_rate` of
+    them (seeded) get a 503. Counters are kept in `stats`.
+    """
+
+    def __init__(self, root, latency=0.0, jitter=0.0, error_rate=0.0, seed=0, port=0):
+        self.root = os.path.abspath(root)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stats = {"requests": 0, "errors": 0, "not_found": 0, "not_modified": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def sources(self):
+        """Feed list in config/sources.yaml shape, pointing at this server."""
+        feeds_dir = os.path.join(self.root, "feeds")
+        return [
+            {"name": f"Local {os.path.splitext(f)[0]}", "url": f"{self.url}/feeds/{f}"}
+            for f in sorted(os.listdir(feeds_dir)) if f.endswith(".xml")
+        ]
+
+    def page_urls(self):
+        pages_dir = os.path.join(self.root, "pages")
+        return [f"{self.url}/pages/{f}" for f in sorted(os.listdir(pages_dir)) if f.endswith(".html")]
+
+    def _roll(self):
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.stats["errors"] += 1
+        return delay, fail
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                delay, fail = server._roll()
+                if delay:
+                    time.sleep(delay)
+                if fail:
+                    self.send_error(503, "Injected failure")
+                    return
+                rel = os.path.normpath(self.path.split("?", 1)[0].lstrip("/"))
+                path = os.path.join(server.root, rel)
+                if rel.startswith("..") or not os.path.isfile(path):
+                    with server._lock:
+                        server.stats["not_found"] += 1
+                    self.send_error(404)
+                    return
+                # validators from the fixture file, so conditional GETs (ETag / If-Modified-Since) get 304s
+                st = os.stat(path)
+                etag = f'"{int(st.st_mtime)}-{st.st_size}"'
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.stats["not_modified"] += 1
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                with open(path, "r", encoding="utf-8") as f:
+                    body = f.read().replace(BASE_URL_PLACEHOLDER, server.url).encode("utf-8")
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", formatdate(st.st_mtime, usegmt=True))
+                self.send_header("Content-Type", CONTENT_TYPES.get(os.path.splitext(path)[1], "text/plain"))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # keep benchmark output clean
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def record_sources(sources, out_dir, limit=10, timeout=15):
+    """
+    Save each feed and the pages of its first `limit` entries as fixtures,
+    rewriting entry links to the local pages/ copies.
+    """
+    import requests
+    import feedparser
+    from scripts.run_fetcher import HEADERS
+
+    os.makedirs(os.path.join(out_dir, "feeds"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "pages"), exist_ok=True)
+    page_id = 0
+    for f, feed in enumerate(sources):
+        try:
+            resp = requests.get(feed["url"], headers=HEADERS, timeout=timeout)
+            resp.raise_for_status()
+        except Exception as ex:
+            print(f"[Record] Skipping {feed.get('name')}: {ex}")
+            continue
+        xml = resp.text
+        for entry in feedparser.parse(resp.content).entries[:limit]:
+            link = entry.get("link")
+            if not link:
+                continue
+            try:
+                page = requests.get(link, headers=HEADERS, timeout=timeout)
+                page.raise_for_status()
+            except Exception as ex:
+                print(f"[Record] Page failed {link}: {ex}")
+                continue
+            with open(os.path.join(out_dir, "pages", f"{page_id}.html"), "w", encoding="utf-8") as fh:
+                fh.write(page.text)
+            xml = xml.replace(link, f"{BASE_URL_PLACEHOLDER}/pages/{page_id}.html")
+            page_id += 1
+        # drop links to entries beyond `limit` so they 404 fast instead of hitting the network
+        xml = re.sub(r"https?://[^<\"'\s]+", lambda m: m.group(0) if m.group(0).startswith(BASE_URL_PLACEHOLDER) else f"{BASE_URL_PLACEHOLDER}/missing", xml)
+        with open(os.path.join(out_dir, "feeds", f"feed_{f}.xml"), "w", encoding="utf-8") as fh:
+            fh.write(xml)
+        print(f"[Record] {feed.get('name')}: saved feed + {page_id} pages so far")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve (or record) feed/page fixtures for benchmarks.")
+    parser.add_argument("root", help="Fixtures directory (feeds/, pages/)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra uniform random delay (seconds)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--synthetic", action="store_true", help="Write synthetic fixtures into root first")
+    parser.add_argument("--record", metavar="SOURCES_YAML", help="Record real feeds into root instead of serving")
+    parser.add_argument("--limit", type=int, default=10, help="Entries per feed to record")
+    args = parser.parse_args()
+
+    if args.record:
+        from scripts.run_fetcher import load_sources
+        record_sources(load_sources(args.record), args.root, limit=args.limit)
+        sys.exit(0)
+    if args.synthetic:
+        from benchmarks.corpus import write_site
+        write_site(args.root)
+
+    server = FeedServer(args.root, args.latency, args.jitter, args.error_rate, port=args.port)
+    print(f"[Serve] {server.root} on {server.url} (Ctrl-C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
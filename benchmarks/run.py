@@ -0,0 +1,312 @@
+# benchmarks/run.py
+#
+# Offline benchmark suite. Builds a synthetic corpus in a temporary SQLite
+# database, serves synthetic (or recorded) feeds from a local HTTP server, and
+# times the ingestion and dashboard hot paths. Results are written as JSON so
+# runs can be compared over time:
+#
+#   python benchmarks/run.py --scale 10k
+#   python benchmarks/run.py --scale 10k --only dashboard_queries --compare benchmarks/results/<old>.json
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+
+def measure(name, fn, items=1, repeat=3, setup=None, **extra):
+    """Run fn() `repeat` times (setup() untimed before each) and summarise."""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    median = statistics.median(times)
+    return {
+        "name": name, "items": items, "repeat": repeat,
+        "times_s": [round(t, 6) for t in times],
+        "min_s": round(min(times), 6), "median_s": round(median, 6),
+        "items_per_s": round(items / median, 2) if median else None,
+        **extra,
+    }
+
+
+def skipped(name, reason):
+    return {"name": name, "skipped": reason}
+
+
+class Context:
+    """Shared fixtures: the populated corpus database, fixtures dir and options."""
+
+    def __init__(self, args, workdir):
+        from benchmarks.corpus import SCALES, populate, write_site
+
+        self.args = args
+        self.workdir = workdir
+        self._scratch = 0
+        self.n = SCALES[args.scale]
+        self.db_url = f"sqlite:///{os.path.join(workdir, 'corpus.db')}"
+        t0 = time.perf_counter()
+        populate(self.db_url, self.n, seed=args.seed)
+        self.populate_s = time.perf_counter() - t0
+        print(f"[Bench] Populated {self.n:,} articles in {self.populate_s:.1f}s")
+
+        self.site = args.fixtures or os.path.join(workdir, "site")
+        if not args.fixtures:
+            write_site(self.site, n_feeds=args.feeds, per_feed=args.per_feed, seed=args.seed)
+
+    def scratch_db_url(self, copy_of=None):
+        """A new database file per call: get_session() keeps one engine per URL."""
+        self._scratch += 1
+        path = os.path.join(self.workdir, f"scratch_{self._scratch}.db")
+        if copy_of:
+            shutil.copy(copy_of, path)
+        return f"sqlite:///{path}"
+
+    def server(self):
+        from benchmarks.feed_server import FeedServer
+        return FeedServer(self.site, latency=self.args.latency, jitter=self.args.jitter,
+                          error_rate=self.args.error_rate, seed=self.args.seed)
+
+    def sample_articles(self, k):
+        from benchmarks.corpus import generate_articles
+        return list(generate_articles(min(k, self.n), seed=self.args.seed))
+
+
+@benchmark("categorize_article")
+def bench_categorize(ctx):
+    from digester.categorizer import categorize_article
+    arts = ctx.sample_articles(ctx.n)
+    return [measure("categorize_article", lambda: [categorize_article(a) for a in arts], items=len(arts))]
+
+
+@benchmark("extract_entities")
+def bench_extract(ctx):
+    from digester.entity_extractor import extract_entities, get_nlp, FULL, RULER_ONLY
+    texts = [f"{a['title']}\n{a['content']}" for a in ctx.sample_articles(ctx.args.ner_sample)]
+    results = []
+    get_nlp(RULER_ONLY)
+    results.append(measure("extract_entities[ruler]", lambda: [extract_entities(t, RULER_ONLY) for t in texts],
+                           items=len(texts)))
+    try:
+        get_nlp(FULL)  # SPACY_MODEL=en_core_web_sm is set in main()
+    except OSError as ex:
+        results.append(skipped("extract_entities[sm]", f"spaCy model unavailable: {ex}"))
+        return results
+    results.append(measure("extract_entities[sm]", lambda: [extract_entities(t, FULL) for t in texts],
+                           items=len(texts), repeat=1))
+    return results
+
+
+@benchmark("fetch_full_text")
+def bench_fetch_full_text(ctx):
+    from scripts.run_fetcher import fetch_full_text
+
+    def fetch_all(urls, failures):
+        for url in urls:
+            try:
+                fetch_full_text(url, timeout=10)
+            except Exception:
+                failures.append(url)
+
+    with ctx.server() as server:
+        urls = server.page_urls()[:ctx.args.pages]
+        failures = []
+        result = measure("fetch_full_text", lambda: fetch_all(urls, failures), items=len(urls), repeat=1)
+        result.update(failures=len(failures), server=dict(server.stats))
+    return [result]
+
+
+@benchmark("run_fetch")
+def bench_run_fetch(ctx):
+    from scripts.run_fetcher import run_fetch
+
+    results = []
+    for fulltext in (False, True):
+        name = f"run_fetch[{'fulltext' if fulltext else 'rss_only'}]"
+
+        def fresh_db():
+            os.environ["DATABASE_URL"] = ctx.scratch_db_url()
+
+        with ctx.server() as server:
+            sources = server.sources()
+            items = ctx.args.feeds * ctx.args.per_feed
+            result = measure(name, lambda: run_fetch(sources, delay=0, fulltext=fulltext, relevance_filter=False),
+                             items=items, repeat=1, setup=fresh_db)
+            result["server"] = dict(server.stats)
+        results.append(result)
+    return results
+
+
+@benchmark("process_articles")
+def bench_process(ctx):
+    from benchmarks.corpus import populate
+    from digester.entity_extractor import RULER_ONLY
+    from scripts.process_articles import process_unprocessed_articles
+
+    n = min(ctx.n, ctx.args.process_limit)
+    template = os.path.join(ctx.workdir, "unprocessed.db")
+    populate(f"sqlite:///{template}", n, seed=ctx.args.seed + 1, processed=False)
+
+    def fresh_db():
+        os.environ["DATABASE_URL"] = ctx.scratch_db_url(copy_of=template)
+        # the graph and related index are rebuilt from scratch on every repeat
+        for var in ("COOCCURRENCE_PATH", "RELATED_INDEX_PATH"):
+            if os.path.exists(os.environ[var]):
+                os.remove(os.environ[var])
+
+    # ruler-only keeps NER cost small, so this mostly times categorisation + DB writes
+    return [measure("process_articles[ruler]", lambda: process_unprocessed_articles(batch_limit=n, mode=RULER_ONLY),
+                    items=n, repeat=ctx.args.repeat, setup=fresh_db)]
+
+
+@benchmark("dashboard_queries")
+def bench_dashboard_queries(ctx):
+    from data.db import queries
+    from data.db.article_model import get_session
+    from digester import trends
+
+    session = get_session(ctx.db_url)
+    try:
+        tag = next(iter(queries.tag_counts(session)), (None,))[0]
+        sources = tuple(queries.distinct_sources(session)[:3])
+        until = datetime(2025, 1, 1)
+        since = datetime(2024, 12, 1)
+        cases = [
+            ("entity_counts", lambda: queries.entity_counts(session, limit=20)),
+            ("entity_counts[types]", lambda: queries.entity_counts(session, types=("ORG",), limit=20)),
+            ("entity_counts[tag]", lambda: queries.entity_counts(session, tag=tag, limit=20)),
+            ("entity_counts[sources+dates]",
+             lambda: queries.entity_counts(session, sources=sources, since=since, until=until, limit=200)),
+            ("entity_mentions", lambda: queries.entity_mentions(session, limit=1000)),
+            ("tag_counts", lambda: queries.tag_counts(session)),
+            ("categorization_status", lambda: queries.categorization_status(session)),
+            ("distinct_entity_types", lambda: queries.distinct_entity_types(session)),
+            ("trends.build_matrix[35d]", lambda: trends.build_matrix(session, days=35, end=until)),
+        ]
+        return [measure(f"dashboard:{name}", fn, repeat=ctx.args.repeat) for name, fn in cases]
+    finally:
+        session.close()
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def compare(baseline_path, run):
+    """Print median time per benchmark against an earlier results file."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        base = {r["name"]: r for r in json.load(f)["results"] if "median_s" in r}
+    print(f"\n{'benchmark':40} {'before':>10} {'after':>10} {'change':>8}")
+    for r in run["results"]:
+        if "median_s" not in r or r["name"] not in base:
+            continue
+        before, after = base[r["name"]]["median_s"], r["median_s"]
+        change = f"{(after / before - 1) * 100:+.0f}%" if before else "n/a"
+        print(f"{r['name']:40} {before:>10.4f} {after:>10.4f} {change:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--scale", choices=["1k", "10k", "100k"], default="1k")
+    parser.add_argument("--only", default=None, help=f"Comma-separated subset of: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeats for the cheap benchmarks")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--fixtures", default=None, help="Recorded fixtures dir (default: synthetic site)")
+    parser.add_argument("--feeds", type=int, default=5, help="Synthetic feeds to serve")
+    parser.add_argument("--per-feed", type=int, default=20, help="Entries per synthetic feed")
+    parser.add_argument("--pages", type=int, default=50, help="Pages for fetch_full_text")
+    parser.add_argument("--latency", type=float, default=0.0, help="Feed server latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Feed server random extra latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of feed server 503s")
+    parser.add_argument("--ner-sample", type=int, default=200, help="Texts for extract_entities")
+    parser.add_argument("--process-limit", type=int, default=2000, help="Max articles for process_articles")
+    parser.add_argument("--out", default=None, help="Results JSON path (default: benchmarks/results/)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp(prefix="digester-bench-")
+    # keep every artefact the pipeline saves out of the working tree
+    for var, fname in (("COOCCURRENCE_PATH", "cooccurrence.npz"), ("RELATED_INDEX_PATH", "related.npz"),
+                       ("GAZETTEER_PATH", "gazetteer.jsonl"), ("RELEVANCE_MODEL_PATH", "relevance.npz"),
+                       ("METRICS_DIR", "metrics")):
+        os.environ[var] = os.path.join(workdir, fname)
+    os.environ.setdefault("SPACY_MODEL", "en_core_web_sm")
+    db_url_before = os.environ.get("DATABASE_URL")
+
+    run = {
+        "meta": {
+            "started_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "args": vars(args),
+        },
+        "results": [],
+    }
+    try:
+        ctx = Context(args, workdir)
+        run["meta"]["populate_s"] = round(ctx.populate_s, 3)
+        for name in names:
+            print(f"[Bench] {name} ...")
+            try:
+                results = BENCHMARKS[name](ctx)
+            except Exception as ex:
+                results = [{"name": name, "error": repr(ex)}]
+            for r in results:
+                run["results"].append(r)
+                if "median_s" in r:
+                    print(f"  {r['name']:38} median {r['median_s']:.4f}s  ({r['items_per_s']} items/s)")
+                else:
+                    print(f"  {r['name']:38} {r.get('skipped') or r.get('error')}")
+    finally:
+        if db_url_before is None:
+            os.environ.pop("DATABASE_URL", None)
+        else:
+            os.environ["DATABASE_URL"] = db_url_before
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    out = args.out or os.path.join(
+        RESULTS_DIR, f"{datetime.utcnow():%Y%m%dT%H%M%S}_{args.scale}_{run['meta']['commit'] or 'nogit'}.json"
+    )
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(run, f, indent=2, default=str)
+    print(f"[Bench] Results written to {out}")
+    if args.compare:
+        compare(args.compare, run)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 import streamlit as st
-from db.article_model import get_session, ArticleEntity
-from collections import Counter
-import pandas as pd
-from db.article_model import Article
+from data.db.article_model import get_session
+from data.db.versions import current_data_version, ARTICLES, ENTITIES, LABELS
+from data.db.queries import distinct_entity_types, tag_counts
+from data.db.frames import entity_counts_frame, entity_mentions_frame
 
 st.set_page_config(page_title="Optics & Photonics Entity Dashboard", layout="wide")
 
@@ -11,26 +11,49 @@ st.sidebar.title("Filters")
 top_n = st.sidebar.slider("Top N entities", min_value=5, max_value=50, value=20)
 
 
-@st.cache_data
-def load_entity_data():
+@st.cache_data(max_entries=4)
+def load_filter_options(version):
     session = get_session()
-    entities = session.query(ArticleEntity).all()
-    return [(e.name.strip(), e.type) for e in entities]
+    try:
+        return distinct_entity_types(session), tag_counts(session)
+    finally:
+        session.close()
 
 
-data = load_entity_data()
+@st.cache_data(max_entries=64)
+def load_entity_data(version, types, tag, limit):
+    session = get_session()
+    try:
+        return entity_counts_frame(session, types=types, tag=tag, limit=limit)
+    finally:
+        session.close()
+
+
+@st.cache_data(max_entries=64)
+def load_audit_data(version, types, tag, limit):
+    session = get_session()
+    try:
+        return entity_mentions_frame(session, types=types, tag=tag, limit=limit)
+    finally:
+        session.close()
 
-# Build frequency DataFrame
-counter = Counter(data)
-df = pd.DataFrame(counter.items(), columns=["Entity", "Count"])
-df[["Name", "Type"]] = pd.DataFrame(df["Entity"].tolist(), index=df.index)
-df = df[["Name", "Type", "Count"]].sort_values("Count", ascending=False)
 
-# Entity type filter
-entity_types = sorted(df["Type"].unique())
+# Entity type and tag filters
+version = current_data_version(ARTICLES, ENTITIES, LABELS)
+entity_types, tags = load_filter_options(version)
 selected_types = st.sidebar.multiselect("Entity Types", entity_types, default=entity_types)
+types_key = tuple(sorted(selected_types)) if len(selected_types) < len(entity_types) else None
+tag = st.sidebar.selectbox(
+    "Tag", ["(any)"] + [t for t, _ in tags], index=0,
+    format_func=lambda t: t if t == "(any)" else f"{t} ({dict(tags)[t]:,})",
+)
+tag_key = None if tag == "(any)" else tag
+
+if not selected_types:
+    st.info("Select at least one entity type.")
+    st.stop()
 
-filtered_df = df[df["Type"].isin(selected_types)]
+filtered_df = load_entity_data(version, types_key, tag_key, max(200, top_n))
 
 # Main display
 st.title("Named Entity Frequency in Optics & Photonics News")
@@ -38,22 +61,8 @@ st.title("Named Entity Frequency in Optics & Photonics News")
 st.bar_chart(filtered_df.head(top_n).set_index("Name")["Count"])
 
 with st.expander("Show Full Table"):
-    st.dataframe(filtered_df.reset_index(drop=True))
+    st.dataframe(filtered_df)
 
 # Section: Entity audit
 with st.expander("🕵️ Audit Entities by Article"):
-    session = get_session()
-    joined = session.query(ArticleEntity, Article).join(Article).all()
-
-    audit_rows = []
-    for entity, article in joined:
-        audit_rows.append({
-            "Entity": entity.name,
-            "Type": entity.type,
-            "Article Title": article.title,
-            "Source": article.source,
-            "Published": article.published
-        })
-
-    audit_df = pd.DataFrame(audit_rows)
-    st.dataframe(audit_df)
+    st.dataframe(load_audit_data(version, types_key, tag_key, 1000))
@@ -0,0 +1,75 @@
+# data/db/article_labels.py
+#
+# Keyword-tag writes into the indexed article_labels table. Article.tags keeps
+# the comma-joined copy for display, but filters and counts go through
+# article_labels. Article.categorized_at separates "tagged with nothing"
+# (set, no label rows) from "not processed yet" (NULL).
+from datetime import datetime
+
+from sqlalchemy import delete, exists, insert, or_, select, update
+
+from data.db.article_model import Article, ArticleEntity, ArticleLabel
+from data.db.versions import bump_version, ARTICLES, LABELS
+
+# Keeps IN bind parameters under SQLite's historical 999-variable limit
+CHUNK_SIZE = 500
+
+
+def split_tags(tags):
+    """'lasers,LiDAR' -> ['lasers', 'LiDAR'] (blank and repeated tags dropped)."""
+    return list(dict.fromkeys(t.strip() for t in (tags or "").split(",") if t.strip()))
+
+
+def save_article_labels(session, tags_by_article, now=None):
+    """
+    Replace the labels of every article in {article_id: [tag, ...]} with one
+    DELETE, one executemany INSERT and one UPDATE per chunk, and mark the
+    articles categorized. The caller commits.
+    """
+    if not tags_by_article:
+        return 0
+    now = now or datetime.utcnow()
+    ids = list(tags_by_article)
+    written = 0
+    for i in range(0, len(ids), CHUNK_SIZE):
+        chunk = ids[i:i + CHUNK_SIZE]
+        session.execute(delete(ArticleLabel).where(ArticleLabel.article_id.in_(chunk)))
+        rows = [
+            {"article_id": aid, "label": tag}
+            for aid in chunk for tag in dict.fromkeys(tags_by_article[aid])
+        ]
+        if rows:
+            session.execute(insert(ArticleLabel), rows)
+            written += len(rows)
+        session.execute(
+            update(Article)
+            .where(Article.id.in_(chunk))
+            .values(categorized_at=now)
+            .execution_options(synchronize_session=False)
+        )
+    bump_version(session, ARTICLES, LABELS)
+    return written
+
+
+def backfill_from_tags(session, chunk_size=CHUNK_SIZE):
+    """
+    Copy Article.tags of articles processed before article_labels was written
+    into the table. An article counts as processed if it has tags or entity
+    mentions; the rest stay NULL and go through process_articles.py again.
+    Returns (articles, labels) written.
+    """
+    has_entities = exists().where(ArticleEntity.article_id == Article.id)
+    stmt = (
+        select(Article.id, Article.tags)
+        .where(Article.categorized_at == None)  # noqa: E711
+        .where(or_((Article.tags != None) & (Article.tags != ""), has_entities))  # noqa: E711
+        .order_by(Article.id)
+    )
+    pending = session.execute(stmt).all()
+    articles = labels = 0
+    for i in range(0, len(pending), chunk_size):
+        chunk = {aid: split_tags(tags) for aid, tags in pending[i:i + chunk_size]}
+        labels += save_article_labels(session, chunk)
+        session.commit()
+        articles += len(chunk)
+    return articles, labels
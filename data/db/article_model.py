@@ -1,18 +1,24 @@
 # db/article_model.py
 import os
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint
+    create_engine, Column, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint,
+    LargeBinary, PrimaryKeyConstraint, Float, Boolean
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 from datetime import datetime
 
+from utils import metrics
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
 except ImportError:
     pass
 
+# seconds a SQLite write waits for another writer's lock before "database is locked"
+SQLITE_BUSY_TIMEOUT = float(os.environ.get("SQLITE_BUSY_TIMEOUT", "30"))
+
 Base = declarative_base()
 
 class Article(Base):
@@ -27,6 +33,10 @@ class Article(Base):
     source = Column(String)
     tags = Column(String)                # comma-separated
     fetched_at = Column(DateTime, default=datetime.utcnow)
+    canonical_id = Column(Integer, ForeignKey("articles.id"), index=True)  # set on near-duplicates
+    relevance = Column(Float)            # pre-filter score at fetch time (None = not scored)
+    deferred = Column(Boolean)           # scored below the fetch-time threshold: not scraped, NER waits
+    categorized_at = Column(DateTime, index=True)  # when ArticleLabel rows were written (None = not yet)
 
     entities = relationship("ArticleEntity", back_populates="article", cascade="all, delete-orphan")
     labels = relationship("ArticleLabel", backref="article", cascade="all, delete-orphan")
@@ -36,7 +46,7 @@ class ArticleEntity(Base):
     __tablename__ = "article_entities"
 
     id = Column(Integer, primary_key=True)
-    article_id = Column(Integer, ForeignKey("articles.id"))
+    article_id = Column(Integer, ForeignKey("articles.id"), index=True)
     name = Column(String)
 
     # legacy + explicit NER fields
@@ -44,6 +54,13 @@ class ArticleEntity(Base):
     raw_label = Column(String)     # spaCy label
     custom_label = Column(String)  # your taxonomy (COMPANY, UNIVERSITY, ...)
 
+    # mention offsets into the processed text ("title\ncontent"), exclusive end
+    start_char = Column(Integer)
+    end_char = Column(Integer)
+    context = Column(Text)             # window of text around the mention
+    context_start = Column(Integer)    # offset of context[0] in the processed text
+    updated_at = Column(DateTime, index=True)  # last custom_label write (label corrections / undo)
+
     article = relationship("Article", back_populates="entities")
 
 class ArticleLabel(Base):
@@ -71,6 +88,48 @@ class ArticleSpanAnnotation(Base):
 
     article = relationship("Article", back_populates="span_annotations")
 
+class EntityLabelChange(Base):
+    """Undo log for custom_label edits; one batch per save / bulk relabel."""
+    __tablename__ = "entity_label_changes"
+
+    id = Column(Integer, primary_key=True)
+    batch_id = Column(String, index=True)
+    entity_id = Column(Integer, index=True)   # no FK: reprocessing replaces entity rows
+    old_label = Column(String)
+    new_label = Column(String)
+    action = Column(String)                   # human-readable description of the batch
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class ArticleFingerprint(Base):
+    """MinHash signature of an article's title+summary or body (see digester/dedupe.py)."""
+    __tablename__ = "article_fingerprints"
+
+    article_id = Column(Integer, ForeignKey("articles.id"))
+    kind = Column(String)            # "title" | "body"
+    signature = Column(LargeBinary)  # uint32[NUM_PERM]
+
+    __table_args__ = (PrimaryKeyConstraint("article_id", "kind"),)
+
+class DataVersion(Base):
+    """Per-table change counter bumped by writers; page caches key on it."""
+    __tablename__ = "data_versions"
+
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class PipelineRun(Base):
+    """Summary of one instrumented pipeline run (see utils/metrics.py)."""
+    __tablename__ = "pipeline_runs"
+
+    id = Column(Integer, primary_key=True)
+    run_id = Column(String, unique=True)
+    name = Column(String, index=True)         # "run_fetcher", "process_articles", ...
+    started_at = Column(DateTime, index=True)
+    duration_s = Column(Float)
+    status = Column(String)                   # "ok" | "error"
+    summary = Column(Text)                    # JSON: stages, feeds, counters, db
+
 
 def _resolve_db_url():
     """
@@ -83,39 +142,98 @@ def _resolve_db_url():
     url = os.environ.get("DATABASE_URL") or os.environ.get("DB_SQLALCHEMY_URL")
     if not url:
         url = "sqlite:///data/articles.db"
+    return normalize_db_url(url)
+
+
+def normalize_db_url(url):
     # Supabase / Heroku ship postgres:// URIs; SQLAlchemy 1.4+ requires postgresql://
     if url.startswith("postgres://"):
         url = url.replace("postgres://", "postgresql://", 1)
     return url
 
 
+# Columns and indexes added after their tables first shipped. create_all() only
+# creates missing tables, so existing databases (a local SQLite file, the
+# Supabase database the ingest workflow writes to) get them here.
+_ADDED_COLUMNS = [
+    ("articles", "content"),
+    ("articles", "fetched_at"),
+    ("articles", "canonical_id"),
+    ("articles", "relevance"),
+    ("articles", "deferred"),
+    ("articles", "categorized_at"),
+    ("article_entities", "raw_label"),
+    ("article_entities", "custom_label"),
+    ("article_entities", "start_char"),
+    ("article_entities", "end_char"),
+    ("article_entities", "context"),
+    ("article_entities", "context_start"),
+    ("article_entities", "updated_at"),
+]
+_ADDED_INDEXES = [
+    ("ix_articles_canonical_id", "articles", "canonical_id"),
+    ("ix_articles_categorized_at", "articles", "categorized_at"),
+    ("ix_article_entities_article_id", "article_entities", "article_id"),
+    ("ix_article_entities_updated_at", "article_entities", "updated_at"),
+]
+
+
+def _add_missing_columns(engine):
+    """
+    ALTER TABLE ... ADD COLUMN for every _ADDED_COLUMNS entry, typed from the
+    model. Postgres skips existing columns with IF NOT EXISTS; SQLite has no
+    such clause, so there the "duplicate column" error is ignored.
+    """
+    is_sqlite = engine.dialect.name == "sqlite"
+    if_not_exists = "" if is_sqlite else "IF NOT EXISTS "
+    statements = []
+    for table, name in _ADDED_COLUMNS:
+        column = Base.metadata.tables[table].c[name]
+        ddl = f"ALTER TABLE {table} ADD COLUMN {if_not_exists}{name} {column.type.compile(engine.dialect)}"
+        for fk in column.foreign_keys:
+            ddl += f" REFERENCES {fk.column.table.name}({fk.column.name})"
+        statements.append(ddl)
+    statements += [f"CREATE INDEX IF NOT EXISTS {ix} ON {table} ({name})" for ix, table, name in _ADDED_INDEXES]
+
+    with engine.begin() as conn:
+        for stmt in statements:
+            if is_sqlite:
+                try:
+                    conn.exec_driver_sql(stmt)
+                except Exception:
+                    pass  # column already exists
+            else:
+                conn.exec_driver_sql(stmt)
+
+
+# One engine (and one round of migrations) per URL per process, so callers can
+# open short-lived sessions on every Streamlit rerun without reconnecting.
+_sessionmakers = {}
+
+
 def get_session(db_url=None):
     if db_url is None:
         db_url = _resolve_db_url()
 
+    if db_url not in _sessionmakers:
+        _sessionmakers[db_url] = _make_sessionmaker(db_url)
+    return _sessionmakers[db_url]()
+
+
+def _make_sessionmaker(db_url):
     is_sqlite = db_url.startswith("sqlite")
     engine_kwargs = {}
-    if not is_sqlite:
+    if is_sqlite:
+        # the daemon's fetch and process jobs write concurrently
+        engine_kwargs["connect_args"] = {"timeout": SQLITE_BUSY_TIMEOUT}
+    else:
         # Keep connections alive across Streamlit reruns
         engine_kwargs["pool_pre_ping"] = True
 
-    engine = create_engine(db_url, **engine_kwargs)
-
-    # SQLite-only: light schema migrations for dev convenience.
-    # On Postgres use Alembic (or run create_all on first deploy).
-    if is_sqlite:
-        with engine.begin() as conn:
-            for stmt in [
-                "ALTER TABLE articles ADD COLUMN content TEXT",
-                "ALTER TABLE articles ADD COLUMN fetched_at DATETIME",
-                "ALTER TABLE article_entities ADD COLUMN raw_label VARCHAR",
-                "ALTER TABLE article_entities ADD COLUMN custom_label VARCHAR",
-            ]:
-                try:
-                    conn.exec_driver_sql(stmt)
-                except Exception:
-                    pass  # column already exists
+    with metrics.stage("db_connect"):
+        engine = create_engine(db_url, **engine_kwargs)
+    metrics.instrument_engine(engine)
 
     Base.metadata.create_all(engine)
-    Session = sessionmaker(bind=engine)
-    return Session()
+    _add_missing_columns(engine)
+    return sessionmaker(bind=engine)
@@ -0,0 +1,256 @@
+# data/db/exports.py
+#
+# Streaming, incremental dataset exports. Rows are read in chunks through
+# yield_per (a server-side cursor on Postgres, a lazily-stepped cursor on
+# SQLite), so memory stays flat however large the tables are, and written
+# chunk by chunk as CSV, JSON lines or Parquet. Each dataset has a watermark
+# column; export_state.json remembers the last value exported per dataset and
+# format, so every run writes a new file holding only what changed since.
+import csv
+import json
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from sqlalchemy import DateTime, Float, Integer, case, func, or_, select
+
+from data.db.article_labels import backfill_from_tags
+from data.db.article_model import Article, ArticleEntity, ArticleSpanAnnotation
+
+EXPORT_DIR = os.environ.get("EXPORT_DIR", os.path.join("data", "exports"))
+CHUNK_SIZE = 5000
+
+
+@dataclass
+class Dataset:
+    columns: tuple        # labelled select columns, in file order
+    watermark: str        # column label compared against the saved watermark
+    order_by: tuple       # must be ordered by the watermark first
+    joins: tuple = ()
+    where: tuple = ()
+    # changed_since(since) → a clause equivalent to `watermark > since` that can
+    # use indexes, for watermarks computed from several columns
+    changed_since: Optional[Callable] = None
+    # prepare(session) runs before each export (e.g. stamping legacy rows)
+    prepare: Optional[Callable] = None
+
+    def select(self, since=None):
+        stmt = select(*self.columns)
+        for target, onclause in self.joins:
+            stmt = stmt.join(target, onclause)
+        stmt = stmt.where(*self.where)
+        if since is not None:
+            stmt = stmt.where(self.changed_since(since) if self.changed_since else self.watermark_column > since)
+        return stmt.order_by(*self.order_by)
+
+    @property
+    def watermark_column(self):
+        return next(c for c in self.columns if c.key == self.watermark)
+
+
+# When a mention last changed: its article was (re)processed, or its label was
+# corrected after that. CASE rather than GREATEST/max(a, b), which differ
+# between Postgres and SQLite; a NULL updated_at falls through to categorized_at.
+_mention_changed_at = case(
+    (ArticleEntity.updated_at > Article.categorized_at, ArticleEntity.updated_at),
+    else_=Article.categorized_at,
+).label("changed_at")
+
+
+def _mention_changed_since(since):
+    # changed_at > since, split into the two indexed columns it is computed
+    # from; only the matching rows are then sorted on changed_at
+    return or_(
+        ArticleEntity.updated_at > since,
+        ArticleEntity.article_id.in_(select(Article.id).where(Article.categorized_at > since)),
+    )
+
+DATASETS = {
+    # One row per mention: the context window instead of the article summary;
+    # article text lives in the "articles" export. Only mentions of finished
+    # articles (categorized_at set) are exported, after stamping articles
+    # processed before categorized_at existed; mentions of reprocessed
+    # articles and mentions with corrected labels are exported again.
+    "entities": Dataset(
+        columns=(
+            ArticleEntity.id.label("entity_id"),
+            ArticleEntity.article_id,
+            ArticleEntity.name.label("entity"),
+            func.coalesce(ArticleEntity.raw_label, ArticleEntity.type).label("predicted_type"),
+            ArticleEntity.custom_label,
+            ArticleEntity.start_char,
+            ArticleEntity.end_char,
+            ArticleEntity.context,
+            Article.categorized_at,
+            _mention_changed_at,
+        ),
+        watermark="changed_at",
+        order_by=(_mention_changed_at, ArticleEntity.id),
+        joins=((Article, Article.id == ArticleEntity.article_id),),
+        where=(Article.categorized_at.isnot(None),),
+        changed_since=_mention_changed_since,
+        prepare=backfill_from_tags,
+    ),
+    "articles": Dataset(
+        columns=(
+            Article.id.label("article_id"),
+            Article.title,
+            Article.link,
+            Article.source,
+            Article.published,
+            Article.fetched_at,
+            Article.tags,
+            Article.canonical_id,
+            Article.relevance,
+            Article.summary,
+        ),
+        watermark="article_id",
+        order_by=(Article.id,),
+    ),
+    "spans": Dataset(
+        columns=(
+            ArticleSpanAnnotation.id.label("span_id"),
+            ArticleSpanAnnotation.article_id,
+            ArticleSpanAnnotation.start_char,
+            ArticleSpanAnnotation.end_char,
+            ArticleSpanAnnotation.label,
+            ArticleSpanAnnotation.text,
+            ArticleSpanAnnotation.annotator,
+            ArticleSpanAnnotation.created_at,
+        ),
+        watermark="span_id",
+        order_by=(ArticleSpanAnnotation.id,),
+    ),
+}
+
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self._f = open(path, "w", newline="", encoding="utf-8")
+        self._w = csv.writer(self._f)
+        self._w.writerow([c.key for c in columns])
+
+    def write(self, rows):
+        self._w.writerows(rows)
+
+    def close(self):
+        self._f.close()
+
+
+class _JsonlWriter:
+    def __init__(self, path, columns):
+        self._f = open(path, "w", encoding="utf-8")
+        self._keys = [c.key for c in columns]
+
+    def write(self, rows):
+        for row in rows:
+            self._f.write(json.dumps(dict(zip(self._keys, row)), default=str, ensure_ascii=False) + "\n")
+
+    def close(self):
+        self._f.close()
+
+
+class _ParquetWriter:
+    """One row group per chunk; the schema comes from the column types so all-NULL chunks still match."""
+
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as ex:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)") from ex
+        self._pa = pa
+        self._schema = pa.schema([(c.key, self._arrow_type(c.type)) for c in columns])
+        self._w = pq.ParquetWriter(path, self._schema)
+
+    def _arrow_type(self, sa_type):
+        pa = self._pa
+        if isinstance(sa_type, Integer):
+            return pa.int64()
+        if isinstance(sa_type, Float):
+            return pa.float64()
+        if isinstance(sa_type, DateTime):
+            return pa.timestamp("us")
+        return pa.string()
+
+    def write(self, rows):
+        columns = list(zip(*rows))
+        self._w.write_table(self._pa.Table.from_arrays(
+            [self._pa.array(col, type=field.type) for col, field in zip(columns, self._schema)],
+            schema=self._schema,
+        ))
+
+    def close(self):
+        self._w.close()
+
+
+FORMATS = {"csv": _CsvWriter, "jsonl": _JsonlWriter, "parquet": _ParquetWriter}
+
+
+def _state_path(out_dir):
+    return os.path.join(out_dir, "export_state.json")
+
+
+def load_state(out_dir=EXPORT_DIR):
+    try:
+        with open(_state_path(out_dir), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_state(state, out_dir):
+    tmp = _state_path(out_dir) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, _state_path(out_dir))
+
+
+def export_dataset(session, name, fmt="csv", out_dir=EXPORT_DIR, full=False, chunk_size=CHUNK_SIZE):
+    """
+    Write the rows of dataset `name` added since the last `fmt` export (all
+    rows with full=True) to a new timestamped file in `out_dir`. The watermark
+    only advances once the file is complete. Returns (path, rows); path is
+    None when there was nothing new.
+    """
+    dataset = DATASETS[name]
+    if dataset.prepare is not None:
+        dataset.prepare(session)
+    os.makedirs(out_dir, exist_ok=True)
+    state = load_state(out_dir)
+    key = f"{name}.{fmt}"
+    since = None if full else state.get(key, {}).get("watermark")
+    if since is not None and isinstance(dataset.watermark_column.type, DateTime):
+        since = datetime.fromisoformat(since)
+
+    path = os.path.join(out_dir, f"{name}-{datetime.utcnow():%Y%m%dT%H%M%S}.{fmt}")
+    tmp = path + ".part"
+    mark = [c.key for c in dataset.columns].index(dataset.watermark)
+    rows = 0
+    last = None
+    writer = FORMATS[fmt](tmp, dataset.columns)
+    try:
+        result = session.execute(dataset.select(since).execution_options(yield_per=chunk_size))
+        for chunk in result.partitions():
+            writer.write(chunk)
+            rows += len(chunk)
+            last = chunk[-1][mark]
+    except BaseException:
+        writer.close()
+        os.remove(tmp)
+        raise
+    writer.close()
+
+    if not rows:
+        os.remove(tmp)
+        return None, 0
+    os.replace(tmp, path)
+    state[key] = {
+        "watermark": last.isoformat() if isinstance(last, datetime) else last,
+        "exported_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "rows": rows,
+        "path": path,
+    }
+    _save_state(state, out_dir)
+    return path, rows
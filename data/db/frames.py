@@ -0,0 +1,103 @@
+# data/db/frames.py
+#
+# Compact DataFrame loaders for the Streamlit pages. Each loader runs a
+# column-projected Core select() and builds the frame column-wise from the
+# fetched row tuples: no ORM objects, no per-row dicts. Repeated strings
+# (labels, sources, titles, links) become categoricals, so each distinct value
+# is stored once, and ids are int32. Cached with st.cache_data, these frames
+# are also what gets pickled per cache entry, so smaller frames mean cheaper
+# cache hits.
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+
+from data.db.article_model import Article, ArticleEntity
+from data.db.queries import entity_counts_stmt, entity_mentions_stmt, tag_counts_stmt
+
+
+def to_frame(result, columns, categorical=(), int32=()):
+    """
+    DataFrame from a Core result, labelled `columns`. Names in `categorical`
+    become category dtype; names in `int32` become int32 (nullable Int32 when
+    the column has NULLs).
+    """
+    rows = result.all()
+    data = {}
+    for name, values in zip(columns, zip(*rows) if rows else [()] * len(columns)):
+        if name in categorical:
+            data[name] = pd.Categorical(values)
+        elif name in int32:
+            data[name] = (pd.array(values, dtype="Int32") if None in values
+                          else np.fromiter(values, dtype=np.int32, count=len(values)))
+        else:
+            data[name] = pd.Series(values, dtype=object if not values else None)
+    return pd.DataFrame(data, columns=list(columns))
+
+
+def entity_counts_frame(session, types=None, sources=None, tag=None, since=None, until=None, limit=20):
+    """Name / Type / Count, most mentioned first (see queries.entity_counts_stmt)."""
+    return to_frame(
+        session.execute(entity_counts_stmt(types, sources, tag, since, until, limit)),
+        ["Name", "Type", "Count"], categorical=("Type",), int32=("Count",),
+    )
+
+
+def entity_mentions_frame(session, types=None, sources=None, tag=None, since=None, until=None, limit=1000):
+    """Most recent mentions with their article's title, source and date."""
+    return to_frame(
+        session.execute(entity_mentions_stmt(types, sources, tag, since, until, limit)),
+        ["Entity", "Type", "Article Title", "Source", "Published"],
+        categorical=("Type", "Article Title", "Source", "Published"),
+    )
+
+
+def tag_counts_frame(session, sources=None, since=None, until=None):
+    return to_frame(session.execute(tag_counts_stmt(sources, since, until)), ["Tag", "Articles"], int32=("Articles",))
+
+
+def entity_review_frame(session):
+    """
+    Every mention with what the label-correction table shows: offsets and the
+    stored context window, plus its article's title/source/link/date. Missing
+    labels come back as "" so label columns compare without NaN handling.
+    """
+    stmt = (
+        select(
+            ArticleEntity.id,
+            ArticleEntity.name,
+            func.coalesce(ArticleEntity.raw_label, ArticleEntity.type, ""),
+            func.coalesce(ArticleEntity.custom_label, ""),
+            ArticleEntity.context,
+            ArticleEntity.context_start,
+            ArticleEntity.start_char,
+            ArticleEntity.end_char,
+            Article.id,
+            Article.title,
+            Article.source,
+            Article.link,
+            Article.published,
+        )
+        .join(Article, Article.id == ArticleEntity.article_id)
+        .order_by(ArticleEntity.id)
+    )
+    return to_frame(
+        session.execute(stmt),
+        ["entity_id", "name", "raw_label", "custom_label", "context", "context_start", "start_char", "end_char",
+         "article_id", "title", "source", "link", "published"],
+        categorical=("name", "raw_label", "custom_label", "title", "source", "link", "published"),
+        int32=("entity_id", "article_id"),
+    )
+
+
+def article_texts(session, article_ids, chunk_size=500):
+    """{article_id: "title\\ncontent-or-summary"} for just these articles."""
+    ids = list(article_ids)
+    texts = {}
+    for i in range(0, len(ids), chunk_size):
+        stmt = select(Article.id, Article.title, Article.content, Article.summary).where(
+            Article.id.in_(ids[i:i + chunk_size])
+        )
+        for aid, title, content, summary in session.execute(stmt):
+            texts[aid] = f"{(title or '').strip()}\n{(content or summary or '').strip()}"
+    return texts
+
@@ -0,0 +1,154 @@
+# data/db/label_edits.py
+#
+# Set-based custom_label writes used by the Label Correction page. Every write
+# first copies the affected rows' current labels into entity_label_changes
+# (INSERT ... SELECT) under a batch id, so a whole batch can be undone with a
+# single correlated UPDATE.
+import uuid
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, case, delete, func, insert, literal, select, update
+
+from data.db.article_model import ArticleEntity, EntityLabelChange
+from data.db.versions import bump_version, ENTITIES
+
+# Keeps CASE + IN bind parameters under SQLite's historical 999-variable limit
+CHUNK_SIZE = 250
+
+_LOG_COLUMNS = ["batch_id", "entity_id", "old_label", "new_label", "action", "created_at"]
+
+
+def _log_and_update(session, where, new_label_expr, batch_id, action, now):
+    session.execute(
+        insert(EntityLabelChange).from_select(
+            _LOG_COLUMNS,
+            select(
+                literal(batch_id, String),
+                ArticleEntity.id,
+                ArticleEntity.custom_label,
+                new_label_expr,
+                literal(action, String),
+                literal(now, DateTime),
+            ).where(*where),
+        )
+    )
+    result = session.execute(
+        update(ArticleEntity)
+        .where(*where)
+        .values(custom_label=new_label_expr, updated_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
+
+
+def save_label_changes(session, changes, action="edit"):
+    """
+    Apply {entity_id: new_label_or_None} as one UPDATE ... CASE id per chunk.
+    Returns (batch_id, rows_updated); batch_id is None when there is nothing to do.
+    """
+    if not changes:
+        return None, 0
+    batch_id = uuid.uuid4().hex
+    now = datetime.utcnow()
+    ids = list(changes)
+    updated = 0
+    for i in range(0, len(ids), CHUNK_SIZE):
+        chunk = ids[i:i + CHUNK_SIZE]
+        new_label = case({eid: changes[eid] for eid in chunk}, value=ArticleEntity.id)
+        updated += _log_and_update(
+            session, [ArticleEntity.id.in_(chunk)], new_label, batch_id, action, now
+        )
+    bump_version(session, ENTITIES)
+    session.commit()
+    return batch_id, updated
+
+
+def relabel_by_name(session, name, label):
+    """Set custom_label on every mention whose trimmed name equals `name`."""
+    batch_id = uuid.uuid4().hex
+    where = [
+        func.trim(ArticleEntity.name) == (name or "").strip(),
+        ArticleEntity.custom_label.is_distinct_from(label),
+    ]
+    updated = _log_and_update(
+        session, where, literal(label, String), batch_id,
+        f"relabel '{(name or '').strip()}' → {label or '—'}", datetime.utcnow(),
+    )
+    bump_version(session, ENTITIES)
+    session.commit()
+    return batch_id, updated
+
+
+def _logged(column, batch_id):
+    """`column` of this entity's log row in `batch_id`, correlated to the UPDATE."""
+    return (
+        select(column)
+        .where(
+            EntityLabelChange.batch_id == batch_id,
+            EntityLabelChange.entity_id == ArticleEntity.id,
+        )
+        .scalar_subquery()
+    )
+
+
+def undo_batch(session, batch_id):
+    """
+    Restore the labels recorded for `batch_id`. Rows whose label has changed
+    again since (a later batch) keep the newer label and stay in the log, so
+    the batch can be undone for them once the later batch is undone. Returns
+    (restored, skipped).
+    """
+    restorable = [
+        r[0] for r in session.execute(
+            select(EntityLabelChange.entity_id)
+            .join(ArticleEntity, ArticleEntity.id == EntityLabelChange.entity_id)
+            .where(
+                EntityLabelChange.batch_id == batch_id,
+                ArticleEntity.custom_label.is_not_distinct_from(EntityLabelChange.new_label),
+            )
+        )
+    ]
+    logged = session.execute(
+        select(func.count(EntityLabelChange.id)).where(EntityLabelChange.batch_id == batch_id)
+    ).scalar()
+    now = datetime.utcnow()
+    restored = 0
+    for i in range(0, len(restorable), CHUNK_SIZE):
+        chunk = restorable[i:i + CHUNK_SIZE]
+        restored += session.execute(
+            update(ArticleEntity)
+            .where(ArticleEntity.id.in_(chunk))
+            .values(custom_label=_logged(EntityLabelChange.old_label, batch_id), updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        session.execute(
+            delete(EntityLabelChange)
+            .where(EntityLabelChange.batch_id == batch_id, EntityLabelChange.entity_id.in_(chunk))
+        )
+    # log rows of entities deleted since (reprocessing replaces them) can never be restored
+    gone = session.execute(
+        delete(EntityLabelChange).where(
+            EntityLabelChange.batch_id == batch_id,
+            EntityLabelChange.entity_id.not_in(select(ArticleEntity.id)),
+        )
+    ).rowcount
+    bump_version(session, ENTITIES)
+    session.commit()
+    return restored, logged - len(restorable) - gone
+
+
+def recent_batches(session, limit=10):
+    """Return [(batch_id, action, rows, created_at), ...], newest first."""
+    created = func.max(EntityLabelChange.created_at).label("created_at")
+    stmt = (
+        select(
+            EntityLabelChange.batch_id,
+            func.max(EntityLabelChange.action),
+            func.count(EntityLabelChange.id),
+            created,
+        )
+        .group_by(EntityLabelChange.batch_id)
+        .order_by(created.desc())
+        .limit(limit)
+    )
+    return [tuple(r) for r in session.execute(stmt).all()]
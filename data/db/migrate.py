@@ -0,0 +1,276 @@
+# data/db/migrate.py
+#
+# Bulk copy of every table from one database to another (local SQLite →
+# Supabase Postgres). Rows keep their primary keys and are streamed in keyset
+# batches (WHERE pk > last ORDER BY pk LIMIT n). On Postgres each batch is
+# loaded with a single COPY; on other targets with one executemany INSERT.
+# Each batch commits together with a progress row in the target
+# (_migration_progress), so an interrupted run resumes exactly after the last
+# committed batch. Tables are loaded in dependency waves (articles before the
+# tables that reference it); tables within a wave are copied in parallel.
+# Self-references (articles.canonical_id) may point at rows of a later batch,
+# which Postgres would reject mid-COPY, so they are copied as NULL and filled
+# in by a second pass once the whole table is there.
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+from sqlalchemy import (
+    BigInteger, Boolean, Column, DateTime, Integer, MetaData, String, Table, Text,
+    bindparam, func, insert, or_, select, text, tuple_, update,
+)
+
+from data.db.article_model import Base, get_session, normalize_db_url
+
+BATCH_SIZE = 10000
+
+progress_table = Table(
+    "_migration_progress", MetaData(),
+    Column("table_name", String, primary_key=True),
+    Column("last_key", Text),        # JSON list: primary key of the last copied row
+    Column("rows", BigInteger, nullable=False, default=0),
+    Column("done", Boolean, nullable=False, default=False),
+    Column("updated_at", DateTime),
+)
+
+_print_lock = threading.Lock()
+
+
+def log(message):
+    with _print_lock:
+        print(message, flush=True)
+
+
+def engine_for(url):
+    """Engine with the app schema in place (get_session creates tables and runs the SQLite migrations)."""
+    session = get_session(normalize_db_url(url))
+    try:
+        return session.get_bind()
+    finally:
+        session.close()
+
+
+def dependency_waves(tables):
+    """
+    [[table, ...], ...]: every table's foreign-key targets sit in an earlier
+    wave, are the table itself, or are not being copied at all.
+    """
+    waves, remaining = [], list(tables)
+    while remaining:
+        pending = {t.name for t in remaining}
+        wave = [t for t in remaining
+                if all(fk.column.table is t or fk.column.table.name not in pending for fk in t.foreign_keys)]
+        if not wave:
+            raise ValueError(f"foreign-key cycle between {sorted(pending)}")
+        waves.append(wave)
+        remaining = [t for t in remaining if t not in wave]
+    return waves
+
+
+def _copy_value(value):
+    """One field in COPY text format."""
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()  # bytea hex input, backslash escaped for COPY
+    if isinstance(value, datetime):
+        value = value.isoformat(sep=" ")
+    elif isinstance(value, date):
+        value = value.isoformat()
+    # Postgres text cannot hold NUL; the rest are COPY's own escapes
+    return (str(value).replace("\x00", "").replace("\\", "\\\\")
+            .replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def copy_buffer(rows):
+    return io.StringIO("".join("\t".join(_copy_value(v) for v in row) + "\n" for row in rows))
+
+
+def _copy_rows(conn, table, columns, rows):
+    quote = conn.dialect.identifier_preparer.quote
+    sql = f"COPY {quote(table.name)} ({', '.join(quote(c.name) for c in columns)}) FROM STDIN"
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):   # psycopg2
+            cursor.copy_expert(sql, copy_buffer(rows))
+        else:                                # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(copy_buffer(rows).getvalue())
+    finally:
+        cursor.close()
+
+
+def _self_refs(table):
+    return [fk for fk in table.foreign_keys if fk.column.table is table]
+
+
+def _kept(table):
+    """
+    WHERE clauses selecting the rows of `table` that get copied: orphans whose
+    referenced row is missing are skipped (SQLite does not enforce foreign
+    keys; Postgres would reject them). Parents are filtered the same way, so a
+    row whose parent was skipped is skipped too. Self-references don't drop
+    rows; dangling ones are left NULL (see restore_self_refs).
+    """
+    return [
+        or_(fk.parent.is_(None), fk.parent.in_(select(fk.column).where(*_kept(fk.column.table))))
+        for fk in table.foreign_keys if fk.column.table is not table
+    ]
+
+
+def _source_select(table):
+    """Rows of `table` that get copied, in primary-key order."""
+    return select(*table.columns).where(*_kept(table)).order_by(*table.primary_key.columns)
+
+
+def _after(table, last_key):
+    pk = list(table.primary_key.columns)
+    if len(pk) == 1:
+        return pk[0] > last_key[0]
+    return tuple_(*pk) > tuple_(*last_key)
+
+
+def _save_progress(conn, name, last_key, rows, done=False):
+    values = {"last_key": json.dumps(last_key), "rows": rows, "done": done, "updated_at": datetime.utcnow()}
+    updated = conn.execute(update(progress_table).where(progress_table.c.table_name == name).values(**values))
+    if updated.rowcount == 0:
+        conn.execute(insert(progress_table).values(table_name=name, **values))
+
+
+def fix_sequence(conn, table):
+    """Point a Postgres serial/identity sequence past the copied ids so new inserts don't collide."""
+    pk = list(table.primary_key.columns)
+    if conn.dialect.name != "postgresql" or len(pk) != 1 or not isinstance(pk[0].type, Integer):
+        return
+    conn.execute(text(
+        f"SELECT setval(pg_get_serial_sequence(:table, :column), COALESCE(MAX({pk[0].name}), 1), "
+        f"MAX({pk[0].name}) IS NOT NULL) FROM {conn.dialect.identifier_preparer.quote(table.name)}"
+    ), {"table": table.name, "column": pk[0].name})
+
+
+def restore_self_refs(source, target, table, batch_size=BATCH_SIZE):
+    """
+    Second pass for self-referencing columns, which copy_table writes as NULL:
+    set them to their source values where the referenced row was copied.
+    Idempotent, so an interrupted pass is simply run again. Returns the number
+    of dangling references left NULL.
+    """
+    pk = list(table.primary_key.columns)
+    dangling = 0
+    for fk in _self_refs(table):
+        if len(pk) != 1:
+            raise ValueError(f"{table.name}: self-references need a single-column primary key")
+        column = fk.parent
+        copied = select(fk.column).where(*_kept(table))
+        stmt = select(pk[0], column).where(*_kept(table), column.isnot(None))
+        set_ref = (
+            update(table)
+            .where(pk[0] == bindparam("_pk"))
+            .values({column.key: bindparam("_ref")})
+        )
+        with source.connect() as src:
+            refs = src.execute(stmt.where(column.in_(copied)).order_by(pk[0])).all()
+            dangling += src.execute(
+                select(func.count()).select_from(stmt.where(column.not_in(copied)).subquery())
+            ).scalar()
+        for i in range(0, len(refs), batch_size):
+            with target.begin() as conn:
+                conn.execute(set_ref, [{"_pk": key, "_ref": ref} for key, ref in refs[i:i + batch_size]])
+        log(f"[Migrate] {table.name}: restored {len(refs):,} {column.name} references"
+            + (f" ({dangling:,} dangling left NULL)" if dangling else ""))
+    return dangling
+
+
+def copy_table(source, target, table, batch_size=BATCH_SIZE):
+    """Copy (the rest of) one table; returns (rows copied in total, orphans skipped)."""
+    with target.connect() as conn:
+        state = conn.execute(select(progress_table).where(progress_table.c.table_name == table.name)).first()
+    if state is not None and state.done:
+        log(f"[Migrate] {table.name}: already done ({state.rows:,} rows)")
+        return state.rows, 0
+    last_key = json.loads(state.last_key) if state is not None and state.last_key else None
+    copied = state.rows if state is not None else 0
+    if last_key is not None:
+        log(f"[Migrate] {table.name}: resuming after key {last_key} ({copied:,} rows already copied)")
+
+    columns = list(table.columns)
+    pk_idx = [columns.index(c) for c in table.primary_key.columns]
+    self_idx = {columns.index(fk.parent) for fk in _self_refs(table)}
+    use_copy = target.dialect.name == "postgresql"
+    t0 = time.perf_counter()
+    with source.connect() as src:
+        while True:
+            stmt = _source_select(table)
+            if last_key is not None:
+                stmt = stmt.where(_after(table, last_key))
+            rows = src.execute(stmt.limit(batch_size)).all()
+            if not rows:
+                break
+            last_key = [rows[-1][i] for i in pk_idx]
+            if self_idx:
+                rows = [tuple(None if i in self_idx else v for i, v in enumerate(r)) for r in rows]
+            with target.begin() as conn:  # batch + progress commit together
+                if use_copy:
+                    _copy_rows(conn, table, columns, rows)
+                else:
+                    conn.execute(insert(table), [dict(zip((c.name for c in columns), r)) for r in rows])
+                copied += len(rows)
+                _save_progress(conn, table.name, last_key, copied)
+            rate = (copied - (state.rows if state is not None else 0)) / max(time.perf_counter() - t0, 1e-9)
+            log(f"[Migrate] {table.name}: {copied:,} rows ({rate:,.0f} rows/s)")
+        total = src.execute(select(func.count()).select_from(table)).scalar()
+
+    if self_idx:
+        restore_self_refs(source, target, table, batch_size)
+    with target.begin() as conn:
+        fix_sequence(conn, table)
+        _save_progress(conn, table.name, last_key, copied, done=True)
+    orphans = total - copied
+    log(f"[Migrate] {table.name}: done, {copied:,} rows" + (f" ({orphans:,} orphan rows skipped)" if orphans else ""))
+    return copied, orphans
+
+
+def prepare_target(target, tables, truncate=False):
+    """
+    Create the progress table; with `truncate`, empty every app table and
+    forget earlier progress. Without it, refuse to copy into a table that
+    already has rows the progress table doesn't account for.
+    """
+    progress_table.create(target, checkfirst=True)
+    with target.begin() as conn:
+        if truncate:
+            conn.execute(progress_table.delete())
+            for table in reversed(tables):
+                if conn.dialect.name == "postgresql":
+                    conn.execute(text(f"TRUNCATE {conn.dialect.identifier_preparer.quote(table.name)} CASCADE"))
+                else:
+                    conn.execute(table.delete())
+            return
+        started = {r.table_name for r in conn.execute(select(progress_table.c.table_name))}
+        busy = [t.name for t in tables
+                if t.name not in started and conn.execute(select(func.count()).select_from(t)).scalar()]
+    if busy:
+        raise RuntimeError(f"target tables already hold rows: {', '.join(busy)} (pass --truncate to replace them)")
+
+
+def migrate(source_url, target_url, jobs=4, batch_size=BATCH_SIZE, truncate=False, tables=None):
+    """Copy every app table (or just `tables`) from source to target; returns {table: (rows, orphans)}."""
+    if normalize_db_url(source_url) == normalize_db_url(target_url):
+        raise ValueError("source and target are the same database")
+    source, target = engine_for(source_url), engine_for(target_url)
+    selected = [t for t in Base.metadata.sorted_tables if not tables or t.name in tables]
+    prepare_target(target, selected, truncate=truncate)
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for wave in dependency_waves(selected):
+            log(f"[Migrate] Copying {', '.join(t.name for t in wave)}")
+            futures = {t.name: pool.submit(copy_table, source, target, t, batch_size) for t in wave}
+            # a failed table stops here, before any table that depends on it
+            results.update({name: f.result() for name, f in futures.items()})
+    return results
@@ -0,0 +1,136 @@
+# data/db/queries.py
+#
+# Aggregate queries shared by the dashboards and CLI tools. Everything here is
+# pushed down to SQL (GROUP BY / ORDER BY / LIMIT) so the cost of a page render
+# depends on the number of rows returned, not on the size of the corpus.
+from sqlalchemy import func, select, distinct
+
+from data.db.article_model import Article, ArticleEntity, ArticleLabel
+
+
+def _tagged(tag):
+    """Ids of articles labelled `tag`, served by the article_labels.label index."""
+    return select(ArticleLabel.article_id).where(ArticleLabel.label == tag)
+
+
+def _filter_articles(stmt, sources=None, tag=None, since=None, until=None):
+    if sources:
+        stmt = stmt.where(Article.source.in_(list(sources)))
+    if tag:
+        stmt = stmt.where(Article.id.in_(_tagged(tag)))
+    if since is not None:
+        stmt = stmt.where(Article.fetched_at >= since)
+    if until is not None:
+        stmt = stmt.where(Article.fetched_at < until)
+    return stmt
+
+
+def _needs_article_join(sources, since, until):
+    return bool(sources) or since is not None or until is not None
+
+
+def entity_counts_stmt(types=None, sources=None, tag=None, since=None, until=None, limit=20):
+    """
+    SELECT trim(name), type, count(*) ... GROUP BY 1, 2 ORDER BY count DESC LIMIT n.
+
+    `since`/`until` bound Article.fetched_at (half-open interval). `types`
+    filters on the legacy ArticleEntity.type column the dashboards display.
+    """
+    name = func.trim(ArticleEntity.name).label("name")
+    label = ArticleEntity.type.label("label")
+    count = func.count(ArticleEntity.id).label("count")
+
+    stmt = select(name, label, count)
+    if _needs_article_join(sources, since, until):
+        stmt = stmt.join(Article, Article.id == ArticleEntity.article_id)
+        stmt = _filter_articles(stmt, sources, None, since, until)
+    if tag:
+        stmt = stmt.where(ArticleEntity.article_id.in_(_tagged(tag)))
+    if types:
+        stmt = stmt.where(ArticleEntity.type.in_(list(types)))
+
+    stmt = stmt.group_by(name, label).order_by(count.desc(), name)
+    if limit:
+        stmt = stmt.limit(limit)
+    return stmt
+
+
+def entity_counts(session, types=None, sources=None, tag=None, since=None, until=None, limit=20):
+    """Return [(name, label, count), ...] ordered by count descending."""
+    stmt = entity_counts_stmt(types, sources, tag, since, until, limit)
+    return [tuple(r) for r in session.execute(stmt).all()]
+
+
+def entity_mentions_stmt(types=None, sources=None, tag=None, since=None, until=None, limit=1000):
+    """Most recent mention rows joined to their article (projected columns only)."""
+    stmt = (
+        select(
+            ArticleEntity.name,
+            ArticleEntity.type,
+            Article.title,
+            Article.source,
+            Article.published,
+        )
+        .join(Article, Article.id == ArticleEntity.article_id)
+    )
+    stmt = _filter_articles(stmt, sources, tag, since, until)
+    if types:
+        stmt = stmt.where(ArticleEntity.type.in_(list(types)))
+    return stmt.order_by(Article.fetched_at.desc(), ArticleEntity.id).limit(limit)
+
+
+def entity_mentions(session, types=None, sources=None, tag=None, since=None, until=None, limit=1000):
+    stmt = entity_mentions_stmt(types, sources, tag, since, until, limit)
+    return [tuple(r) for r in session.execute(stmt).all()]
+
+
+def distinct_entity_types(session):
+    stmt = select(distinct(ArticleEntity.type)).where(ArticleEntity.type.isnot(None))
+    return sorted(r[0] for r in session.execute(stmt).all())
+
+
+def distinct_sources(session):
+    stmt = select(distinct(Article.source)).where(Article.source.isnot(None))
+    return sorted(r[0] for r in session.execute(stmt).all())
+
+
+def tag_counts_stmt(sources=None, since=None, until=None):
+    count = func.count(ArticleLabel.article_id).label("count")
+    stmt = select(ArticleLabel.label, count)
+    if _needs_article_join(sources, since, until):
+        stmt = stmt.join(Article, Article.id == ArticleLabel.article_id)
+        stmt = _filter_articles(stmt, sources, None, since, until)
+    return stmt.group_by(ArticleLabel.label).order_by(count.desc(), ArticleLabel.label)
+
+
+def tag_counts(session, sources=None, since=None, until=None):
+    """Return [(tag, article_count), ...] from article_labels, most used first."""
+    return [tuple(r) for r in session.execute(tag_counts_stmt(sources, since, until)).all()]
+
+
+def categorization_status(session, sources=None, since=None, until=None):
+    """
+    Count non-duplicate articles as {"tagged", "untagged", "unprocessed"}:
+    untagged articles were categorized and matched no keyword, unprocessed
+    ones (categorized_at NULL) haven't been through process_articles.py yet.
+    """
+    has_label = Article.id.in_(select(ArticleLabel.article_id))
+    stmt = select(
+        func.count().filter(Article.categorized_at == None),  # noqa: E711
+        func.count().filter((Article.categorized_at != None) & has_label),  # noqa: E711
+        func.count().filter((Article.categorized_at != None) & ~has_label),  # noqa: E711
+    ).where(Article.canonical_id == None)  # noqa: E711
+    stmt = _filter_articles(stmt, sources, None, since, until)
+    unprocessed, tagged, untagged = session.execute(stmt).one()
+    return {"tagged": tagged, "untagged": untagged, "unprocessed": unprocessed}
+
+
+def corpus_stats(session):
+    """{"articles", "entities", "sources"} counts in one round trip."""
+    stmt = select(
+        select(func.count(Article.id)).scalar_subquery(),
+        select(func.count(ArticleEntity.id)).scalar_subquery(),
+        select(func.count(distinct(Article.source))).scalar_subquery(),
+    )
+    articles, entities, sources = session.execute(stmt).one()
+    return {"articles": articles, "entities": entities, "sources": sources}
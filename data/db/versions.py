@@ -0,0 +1,45 @@
+# data/db/versions.py
+#
+# Change counters per table. Writers call bump_version() inside the same
+# transaction as their writes; readers pass data_version() into cached loaders
+# so caches invalidate exactly when the underlying tables change.
+from datetime import datetime
+
+from sqlalchemy import select, update
+
+from data.db.article_model import DataVersion, get_session
+
+ARTICLES = "articles"
+ENTITIES = "article_entities"
+SPANS = "article_span_annotations"
+LABELS = "article_labels"
+PIPELINE_RUNS = "pipeline_runs"
+
+
+def bump_version(session, *tables):
+    """Increment the counters for `tables`; the caller commits."""
+    now = datetime.utcnow()
+    for table in tables:
+        result = session.execute(
+            update(DataVersion)
+            .where(DataVersion.table_name == table)
+            .values(version=DataVersion.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            session.add(DataVersion(table_name=table, version=1, updated_at=now))
+
+
+def data_version(session, *tables):
+    """Return a tuple of counters (0 for never-written tables), usable as a cache key."""
+    stmt = select(DataVersion.table_name, DataVersion.version).where(DataVersion.table_name.in_(tables))
+    versions = dict(session.execute(stmt).all())
+    return tuple(versions.get(t, 0) for t in tables)
+
+
+def current_data_version(*tables):
+    """data_version() on a short-lived session, for Streamlit pages."""
+    session = get_session()
+    try:
+        return data_version(session, *tables)
+    finally:
+        session.close()
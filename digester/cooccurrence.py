@@ -0,0 +1,240 @@
+# digester/cooccurrence.py
+#
+# Entity co-occurrence graph: C = Xᵀ·X for the binary article × entity
+# incidence matrix X, kept as a sparse CSR matrix. New articles are folded in
+# with the same product over just their rows, so updates cost O(new mentions).
+# The graph is saved to an .npz file; when the file is missing (fresh CI
+# runner, Streamlit Cloud) sync() rebuilds it from the database in one pass.
+# The graph remembers the ENTITIES data version it was synced at: after
+# relabels it refreshes its labels, and when counted articles were
+# reprocessed or linked as duplicates since, it is rebuilt.
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from datetime import datetime
+
+from sqlalchemy import distinct, exists, func, select
+
+from data.db.article_model import Article, ArticleEntity
+from data.db.versions import data_version, ENTITIES
+
+COOCCURRENCE_PATH = os.environ.get(
+    "COOCCURRENCE_PATH", os.path.join("data", "processed", "cooccurrence.npz")
+)
+
+SYNC_CHUNK = 500
+
+_RESULT_COLUMNS = ["Name", "Label", "Articles together", "PMI"]
+
+
+class CooccurrenceGraph:
+    """
+    Entities are keyed by trimmed name; `labels` holds each name's label as of
+    the last sync (max over its mentions of custom_label, else type).
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.names = []
+        self.labels = []
+        self.index = {}
+        self.doc_freq = np.zeros(0, dtype=np.int32)
+        self.matrix = csr_matrix((0, 0), dtype=np.int32)
+        self.articles = set()
+        self.entities_version = None  # ENTITIES data version at the last sync
+        self.synced_at = None         # max(categorized_at) at the last sync
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def n_docs(self):
+        return len(self.articles)
+
+    # ── updates ──────────────────────────────────────────────────────────────
+    def add_mentions(self, mentions: pd.DataFrame):
+        """Fold in rows of (article_id, name, label) for articles not yet counted."""
+        mentions = mentions[~mentions["article_id"].isin(self.articles)]
+        if mentions.empty:
+            return 0
+        mentions = mentions.drop_duplicates(["article_id", "name"])
+
+        for name, label in zip(mentions["name"], mentions["label"]):
+            if name not in self.index:
+                self.index[name] = len(self.names)
+                self.names.append(name)
+                self.labels.append(label or "")
+        n = len(self.names)
+
+        cols = mentions["name"].map(self.index).to_numpy()
+        rows, new_articles = pd.factorize(mentions["article_id"])
+        X = csr_matrix(
+            (np.ones(len(cols), dtype=np.int32), (rows, cols)),
+            shape=(len(new_articles), n),
+        )
+        self.matrix.resize((n, n))
+        self.matrix = (self.matrix + (X.T @ X)).tocsr()
+        self.doc_freq = np.bincount(cols, minlength=n).astype(np.int32) + np.pad(
+            self.doc_freq, (0, n - len(self.doc_freq))
+        )
+        self.articles.update(int(a) for a in new_articles)
+        return len(new_articles)
+
+    def _stale(self, session):
+        """
+        True when a counted article has changed since the last sync: linked as
+        a duplicate, mentions deleted, or reprocessed (categorized again).
+        """
+        # legacy rows were never categorized; a reprocessed article ends up
+        # categorized after the last sync
+        categorized = Article.categorized_at == None  # noqa: E711
+        if self.synced_at is not None:
+            categorized = categorized | (Article.categorized_at <= self.synced_at)
+        unchanged = select(Article.id).where(
+            Article.canonical_id == None,  # noqa: E711
+            categorized,
+            exists().where(ArticleEntity.article_id == Article.id),
+        )
+        return bool(self.articles - set(r[0] for r in session.execute(unchanged)))
+
+    def refresh_labels(self, session):
+        name = func.trim(ArticleEntity.name)
+        stmt = select(name, func.max(func.coalesce(ArticleEntity.custom_label, ArticleEntity.type))).group_by(name)
+        current = dict(session.execute(stmt).all())
+        self.labels = [current.get(n) or old for n, old in zip(self.names, self.labels)]
+
+    def sync(self, session):
+        """
+        Add every processed, non-duplicate article the graph hasn't seen. If
+        entities were written since the last sync, rebuild when counted
+        articles changed, else just refresh labels (relabels).
+        """
+        version = data_version(session, ENTITIES)[0]
+        if self.articles and version != self.entities_version:
+            if self._stale(session):
+                self.clear()
+            else:
+                self.refresh_labels(session)
+        self.entities_version = version
+        self.synced_at = session.execute(select(func.max(Article.categorized_at))).scalar()
+
+        with_entities = (
+            select(distinct(ArticleEntity.article_id))
+            .join(Article, Article.id == ArticleEntity.article_id)
+            .where(Article.canonical_id == None)  # noqa: E711
+        )
+        missing = sorted(
+            set(r[0] for r in session.execute(with_entities)) - self.articles
+        )
+        if not missing:
+            return 0
+        name = func.trim(ArticleEntity.name)
+        stmt = (
+            select(ArticleEntity.article_id, name, func.max(func.coalesce(ArticleEntity.custom_label, ArticleEntity.type)))
+            .group_by(ArticleEntity.article_id, name)
+        )
+        # only the missing articles' mentions, via the article_id index; chunked
+        # to stay under SQLite's bound-parameter limit
+        rows = []
+        for i in range(0, len(missing), SYNC_CHUNK):
+            chunk = missing[i:i + SYNC_CHUNK]
+            rows += session.execute(stmt.where(ArticleEntity.article_id.in_(chunk))).all()
+        mentions = pd.DataFrame(rows, columns=["article_id", "name", "label"])
+        mentions = mentions[mentions["name"] != ""]
+        return self.add_mentions(mentions)
+
+    # ── queries ──────────────────────────────────────────────────────────────
+    def _pmi(self, i, j, together):
+        # float64: int32 counts × n_docs (and doc_freq products) overflow at ~50k docs
+        return np.log(together.astype(np.float64) * self.n_docs
+                      / (self.doc_freq[i].astype(np.float64) * self.doc_freq[j]))
+
+    def neighbors(self, name, k=10, metric="count", labels=None, min_count=1):
+        """Top-k entities co-occurring with `name`, ranked by raw count or PMI."""
+        i = self.index.get(name)
+        if i is None:
+            return pd.DataFrame(columns=_RESULT_COLUMNS)
+        start, end = self.matrix.indptr[i], self.matrix.indptr[i + 1]
+        idx = self.matrix.indices[start:end]
+        together = self.matrix.data[start:end]
+
+        keep = (idx != i) & (together >= min_count)
+        if labels:
+            keep &= np.isin([self.labels[j] for j in idx], list(labels))
+        idx, together = idx[keep], together[keep]
+        pmi = self._pmi(i, idx, together)
+        score = pmi if metric == "pmi" else together + pmi * 1e-6  # PMI breaks count ties
+
+        top = _top_k(score, k)
+        return pd.DataFrame({
+            "Name": [self.names[j] for j in idx[top]],
+            "Label": [self.labels[j] for j in idx[top]],
+            "Articles together": together[top],
+            "PMI": np.round(pmi[top], 3),
+        }, columns=_RESULT_COLUMNS)
+
+    def top_pairs(self, label_a, label_b, k=20, metric="count", min_count=2):
+        """Strongest (label_a, label_b) pairs across the whole graph."""
+        labels = np.asarray(self.labels, dtype=object)
+        rows = np.flatnonzero(labels == label_a)
+        cols = np.flatnonzero(labels == label_b)
+        sub = self.matrix[rows][:, cols].tocoo()
+        r, c, together = rows[sub.row], cols[sub.col], sub.data
+        keep = (r != c) & (together >= min_count)
+        if label_a == label_b:
+            keep &= r < c  # each unordered pair once
+        r, c, together = r[keep], c[keep], together[keep]
+        pmi = self._pmi(r, c, together)
+        score = pmi if metric == "pmi" else together + pmi * 1e-6
+
+        top = _top_k(score, k)
+        return pd.DataFrame({
+            "Entity A": [self.names[j] for j in r[top]],
+            "Entity B": [self.names[j] for j in c[top]],
+            "Articles together": together[top],
+            "PMI": np.round(pmi[top], 3),
+        })
+
+    # ── persistence ──────────────────────────────────────────────────────────
+    def save(self, path=COOCCURRENCE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+            names=np.array(self.names, dtype=str), labels=np.array(self.labels, dtype=str),
+            doc_freq=self.doc_freq, articles=np.fromiter(self.articles, dtype=np.int64),
+            entities_version=np.int64(-1 if self.entities_version is None else self.entities_version),
+            synced_at=np.array(self.synced_at.isoformat() if self.synced_at else ""),
+        )
+
+
+def _top_k(score, k):
+    if len(score) > k:
+        part = np.argpartition(-score, k - 1)[:k]
+        return part[np.argsort(-score[part], kind="stable")]
+    return np.argsort(-score, kind="stable")
+
+
+def load_graph(path=COOCCURRENCE_PATH):
+    """Return the saved graph, or an empty one if nothing has been saved yet."""
+    graph = CooccurrenceGraph()
+    if not os.path.exists(path):
+        return graph
+    with np.load(path) as f:
+        graph.names = f["names"].tolist()
+        graph.labels = f["labels"].tolist()
+        graph.index = {n: i for i, n in enumerate(graph.names)}
+        graph.doc_freq = f["doc_freq"]
+        n = len(graph.names)
+        graph.matrix = csr_matrix((f["data"], f["indices"], f["indptr"]), shape=(n, n))
+        graph.articles = set(f["articles"].tolist())
+        # graphs saved before these were tracked are checked (and rebuilt) on the next sync
+        if "entities_version" in f and int(f["entities_version"]) >= 0:
+            graph.entities_version = int(f["entities_version"])
+        if "synced_at" in f and str(f["synced_at"]):
+            graph.synced_at = datetime.fromisoformat(str(f["synced_at"]))
+    return graph
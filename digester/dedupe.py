@@ -0,0 +1,124 @@
+# digester/dedupe.py
+#
+# Near-duplicate detection with MinHash + LSH banding. Signatures are stored in
+# the article_fingerprints table (so the index survives ephemeral CI runners)
+# and loaded into an in-memory band index once per run; a lookup is then a
+# handful of dict probes plus a vectorised signature comparison.
+import re
+import zlib
+from html import unescape
+
+import numpy as np
+from sqlalchemy import select
+
+from data.db.article_model import ArticleFingerprint
+
+TITLE = "title"   # title + summary, checked before fetch_full_text
+BODY = "body"     # full content, checked before NER
+
+NUM_PERM = 128
+BANDS = 16        # 16 bands × 8 rows → ~0.71 Jaccard detection threshold
+ROWS = NUM_PERM // BANDS
+SHINGLE_CHARS = 5
+THRESHOLDS = {TITLE: 0.7, BODY: 0.8}
+# Below this many shingles there is too little text to judge; never a duplicate
+MIN_SHINGLES = {TITLE: 10, BODY: 300}
+
+_PRIME = np.uint64(4294967311)  # smallest prime > 2**32
+_MASK = np.uint64(0xFFFFFFFF)
+_rng = np.random.RandomState(1729)
+_A = _rng.randint(1, 2**31, size=NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, 2**31, size=NUM_PERM).astype(np.uint64)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_NON_WORD_RE = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    text = unescape(_TAG_RE.sub(" ", text or ""))
+    return _NON_WORD_RE.sub(" ", text.lower()).strip()
+
+
+def shingles(text: str, k: int = SHINGLE_CHARS):
+    t = normalize(text)
+    return {t[i:i + k] for i in range(max(len(t) - k + 1, 0))}
+
+
+def minhash(text: str, kind: str = TITLE):
+    """Return a uint32[NUM_PERM] signature, or None if the text is too short."""
+    sh = shingles(text)
+    if len(sh) < MIN_SHINGLES[kind]:
+        return None
+    h = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in sh), dtype=np.uint64, count=len(sh))
+    # (a·h + b) mod p for every permutation × shingle, then min over shingles
+    return (((_A[:, None] * h[None, :] + _B[:, None]) % _PRIME) & _MASK).min(axis=1).astype(np.uint32)
+
+
+class LSHIndex:
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.buckets = [{} for _ in range(BANDS)]
+        self.keys = []
+        self.signatures = []
+
+    def __len__(self):
+        return len(self.keys)
+
+    def _bands(self, sig):
+        for b in range(BANDS):
+            yield self.buckets[b], sig[b * ROWS:(b + 1) * ROWS].tobytes()
+
+    def insert(self, key, sig):
+        pos = len(self.keys)
+        self.keys.append(key)
+        self.signatures.append(sig)
+        for bucket, band in self._bands(sig):
+            bucket.setdefault(band, []).append(pos)
+
+    def query(self, sig, exclude=None):
+        """
+        Return (key, estimated_jaccard) of the best match above threshold, or
+        None. Entries keyed `exclude` (e.g. the article's own signature) are skipped.
+        """
+        candidates = set()
+        for bucket, band in self._bands(sig):
+            candidates.update(bucket.get(band, ()))
+        if exclude is not None:
+            candidates = {p for p in candidates if self.keys[p] != exclude}
+        if not candidates:
+            return None
+        positions = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+        sims = (np.stack([self.signatures[p] for p in positions]) == sig).mean(axis=1)
+        best = int(sims.argmax())
+        if sims[best] < self.threshold:
+            return None
+        return self.keys[positions[best]], float(sims[best])
+
+
+def body_text(article) -> str:
+    """Scraped body, or "" when content is only the summary fallback."""
+    body = article.content or ""
+    return "" if body == (article.summary or "") else body
+
+
+def load_index(session, kind: str) -> LSHIndex:
+    index = LSHIndex(THRESHOLDS[kind])
+    stmt = (
+        select(ArticleFingerprint.article_id, ArticleFingerprint.signature)
+        .where(ArticleFingerprint.kind == kind)
+        .order_by(ArticleFingerprint.article_id)
+    )
+    for article_id, blob in session.execute(stmt):
+        index.insert(article_id, np.frombuffer(blob, dtype=np.uint32))
+    return index
+
+
+def save_signature(session, kind: str, article_id: int, sig):
+    """Persist an article's signature, replacing one left by an earlier run."""
+    session.merge(ArticleFingerprint(article_id=article_id, kind=kind, signature=sig.tobytes()))
+
+
+def remember(session, index: LSHIndex, kind: str, article_id: int, sig):
+    """Add a canonical article to the in-memory index and persist its signature."""
+    index.insert(article_id, sig)
+    session.add(ArticleFingerprint(article_id=article_id, kind=kind, signature=sig.tobytes()))
@@ -1,17 +1,12 @@
 # digester/entity_extractor.py
 import spacy
-from spacy.pipeline import EntityRuler
+import itertools
 import os
 import json
 
-# Load model (transformer → better NER; fallback to small if missing)
-try:
-    nlp = spacy.load("en_core_web_trf")
-except OSError:
-    nlp = spacy.load("en_core_web_sm")
+from digester.gazetteer import GAZETTEER_PATH, load_gazetteer
 
-# Optional: load domain patterns for guaranteed matches
-ruler = nlp.add_pipe("entity_ruler", before="ner")
+# Domain patterns for guaranteed (case-sensitive) matches
 patterns = [
     {"label": "ORG", "pattern": "Lawrence Livermore National Laboratory"},
     {"label": "ORG", "pattern": "Los Alamos National Laboratory"},
@@ -36,14 +31,131 @@ if os.path.exists(custom_patterns_path):
     except Exception:
         pass
 
-ruler.add_patterns(patterns)
-
 TRACKED = {"ORG", "PERSON", "GPE", "NORP", "FAC"}
+CONTEXT_WINDOW_CHARS = 200
+
+# "full": statistical NER + rulers. "ruler": tokenizer + rulers only, for bulk
+# backfills where the known-entity gazetteer is enough.
+FULL = "full"
+RULER_ONLY = "ruler"
+
+_pipelines = {}
+
+
+def default_mode():
+    flag = os.environ.get("ENABLE_SPACY_NER", "true").strip().lower()
+    return RULER_ONLY if flag in {"0", "false", "no", "off"} else FULL
+
+
+def _add_rulers(nlp, **placement):
+    # add_patterns runs every pipe already in the pipeline over each phrase
+    # pattern; ORTH/LOWER matchers only need the tokenizer, so disable them all
+    ruler = nlp.add_pipe("entity_ruler", **placement)
+    with nlp.select_pipes(enable=[]):
+        ruler.add_patterns(patterns)
+
+    gazetteer = load_gazetteer(GAZETTEER_PATH)
+    if gazetteer:
+        # LOWER turns the phrase matcher case-insensitive
+        gaz_ruler = nlp.add_pipe(
+            "entity_ruler", name="gazetteer_ruler",
+            config={"phrase_matcher_attr": "LOWER"}, **placement,
+        )
+        with nlp.select_pipes(enable=[]):
+            gaz_ruler.add_patterns(gazetteer)
+
+
+def _load_statistical():
+    # SPACY_MODEL pins a pipeline (e.g. en_core_web_sm for benchmarks);
+    # otherwise transformer → better NER, falling back to small if missing
+    if os.environ.get("SPACY_MODEL"):
+        return spacy.load(os.environ["SPACY_MODEL"])
+    try:
+        return spacy.load("en_core_web_trf")
+    except OSError:
+        return spacy.load("en_core_web_sm")
+
 
-def extract_entities(text: str):
-    doc = nlp(text or "")
+def get_nlp(mode=None):
+    """Load (once per process) the pipeline for `mode`."""
+    mode = mode or default_mode()
+    if mode not in _pipelines:
+        if mode == RULER_ONLY:
+            nlp = spacy.blank("en")
+            _add_rulers(nlp)
+        else:
+            nlp = _load_statistical()
+            _add_rulers(nlp, before="ner")
+        _pipelines[mode] = nlp
+    return _pipelines[mode]
+
+
+def reload_pipelines():
+    """Drop the loaded pipelines so the next get_nlp() picks up a rebuilt gazetteer."""
+    _pipelines.clear()
+
+
+def _doc_entities(doc):
     out = []
     for ent in doc.ents:
         if ent.label_ in TRACKED:
-            out.append({"text": ent.text.strip(), "raw_label": ent.label_})
+            raw = ent.text
+            name = raw.strip()
+            start = ent.start_char + (len(raw) - len(raw.lstrip()))
+            out.append({
+                "text": name,
+                "raw_label": ent.label_,
+                # gazetteer patterns carry the corrected taxonomy label as their id
+                "custom_label": ent.ent_id_ or None,
+                "start_char": start,
+                "end_char": start + len(name),
+            })
     return out
+
+
+def extract_entities(text: str, mode=None):
+    """
+    Return [{"text", "raw_label", "custom_label", "start_char", "end_char"}, ...].
+    Offsets index into `text` (exclusive end) and cover the stripped mention.
+    """
+    nlp = get_nlp(mode)
+    return _doc_entities(nlp(_capped(nlp, text)))
+
+
+def _capped(nlp, text):
+    # spaCy refuses texts over nlp.max_length (E088); NER the leading part only
+    text = text or ""
+    return text[:nlp.max_length] if len(text) > nlp.max_length else text
+
+
+def extract_entities_many(texts, mode=None, batch_size=64):
+    """
+    Like extract_entities, but streams `texts` through nlp.pipe. A batch that
+    fails is retried one text at a time; texts that still fail yield None
+    instead of entities, so one bad text doesn't abort the stream.
+    """
+    nlp = get_nlp(mode)
+    texts = iter(texts)
+    while True:
+        batch = [_capped(nlp, t) for t in itertools.islice(texts, batch_size)]
+        if not batch:
+            return
+        try:
+            results = [_doc_entities(doc) for doc in nlp.pipe(batch, batch_size=batch_size)]
+        except Exception as ex:
+            print(f"[NER] Batch of {len(batch)} failed ({ex}); retrying one at a time")
+            results = []
+            for text in batch:
+                try:
+                    results.append(_doc_entities(nlp(text)))
+                except Exception as ex:
+                    print(f"[NER] Skipping text ({len(text)} chars): {ex}")
+                    results.append(None)
+        yield from results
+
+
+def mention_context(text: str, start: int, end: int, window_chars: int = CONTEXT_WINDOW_CHARS):
+    """Return (snippet, snippet_start) for the text surrounding text[start:end]."""
+    ctx_start = max(start - window_chars, 0)
+    ctx_end = min(end + window_chars, len(text))
+    return text[ctx_start:ctx_end], ctx_start
@@ -0,0 +1,93 @@
+# digester/gazetteer.py
+#
+# Compiles human-corrected entities (span annotations + logged custom_label
+# edits) into case-insensitive phrase patterns for spaCy's EntityRuler.
+# Patterns are stored as JSON lines; the corrected taxonomy label travels in
+# the pattern "id" so extract_entities can hand it straight to the processor.
+import json
+import os
+from collections import Counter, defaultdict
+
+from sqlalchemy import func, select
+
+from data.db.article_model import ArticleEntity, ArticleSpanAnnotation, EntityLabelChange
+
+GAZETTEER_PATH = os.environ.get("GAZETTEER_PATH", os.path.join("data", "processed", "gazetteer.jsonl"))
+
+# Taxonomy label → spaCy label the ruler should emit (must be in TRACKED)
+RAW_LABEL_FOR = {
+    "PERSON": "PERSON",
+    "COMPANY": "ORG",
+    "UNIVERSITY": "ORG",
+    "RESEARCH_GROUP": "ORG",
+    "GOV_LAB": "ORG",
+    "GPE": "GPE",
+    "NORP": "NORP",
+    "FAC": "FAC",
+}
+
+MIN_TERM_CHARS = 2
+
+
+def _corrected_terms(session, include_predicted=False, min_count=3):
+    """Yield (surface_text, custom_label, weight) from every labelled source."""
+    spans = (
+        select(ArticleSpanAnnotation.text, ArticleSpanAnnotation.label, func.count())
+        .group_by(ArticleSpanAnnotation.text, ArticleSpanAnnotation.label)
+    )
+    yield from session.execute(spans).all()
+
+    name = func.trim(ArticleEntity.name)
+    corrected_ids = select(EntityLabelChange.entity_id).distinct()
+    corrected = (
+        select(name, ArticleEntity.custom_label, func.count())
+        .where(ArticleEntity.id.in_(corrected_ids))
+        .group_by(name, ArticleEntity.custom_label)
+    )
+    yield from session.execute(corrected).all()
+
+    if include_predicted:
+        predicted = (
+            select(name, ArticleEntity.custom_label, func.count())
+            .where(ArticleEntity.custom_label.isnot(None))
+            .group_by(name, ArticleEntity.custom_label)
+            .having(func.count() >= min_count)
+        )
+        yield from session.execute(predicted).all()
+
+
+def build_gazetteer(session, include_predicted=False, min_count=3):
+    """
+    Return EntityRuler patterns, one per distinct lower-cased surface form.
+    When a name carries several labels the most frequent one wins.
+    """
+    votes = defaultdict(Counter)
+    surface = {}
+    for text, label, weight in _corrected_terms(session, include_predicted, min_count):
+        text = (text or "").strip()
+        if len(text) < MIN_TERM_CHARS or label not in RAW_LABEL_FOR:
+            continue
+        key = text.lower()
+        votes[key][label] += weight
+        surface.setdefault(key, text)
+
+    patterns = []
+    for key in sorted(votes):
+        label = votes[key].most_common(1)[0][0]
+        patterns.append({"label": RAW_LABEL_FOR[label], "pattern": surface[key], "id": label})
+    return patterns
+
+
+def save_gazetteer(patterns, path=GAZETTEER_PATH):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        for p in patterns:
+            f.write(json.dumps(p, ensure_ascii=False) + "\n")
+
+
+def load_gazetteer(path=GAZETTEER_PATH):
+    """Return the saved pattern list, or [] when no gazetteer has been built."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
@@ -0,0 +1,166 @@
+# digester/related.py
+#
+# "Related articles" index. Article text is hashed (HashingVectorizer, so there
+# is no vocabulary to refit), weighted with sublinear TF × IDF and
+# L2-normalised, and stored as a CSR matrix with one row per article. New
+# articles are appended as new rows using the document frequencies seen so far;
+# a full rebuild (see scripts/build_related_index.py) re-weights everything.
+# Queries prune the source vector to its strongest terms and walk only those
+# columns of a CSC copy, so cost depends on posting lengths, not corpus size.
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, vstack
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize as l2_normalize
+from sqlalchemy import select
+
+from data.db.article_model import Article
+from digester.dedupe import normalize
+
+RELATED_INDEX_PATH = os.environ.get(
+    "RELATED_INDEX_PATH", os.path.join("data", "processed", "related_index.npz")
+)
+
+N_FEATURES = 2 ** 20
+QUERY_TERMS = 64  # strongest terms of the source article used for a query
+
+
+def _vectorizer():
+    return HashingVectorizer(
+        n_features=N_FEATURES,
+        alternate_sign=False,
+        norm=None,
+        stop_words="english",
+        preprocessor=normalize,
+        dtype=np.float32,
+    )
+
+
+def article_text(title, content, summary) -> str:
+    return f"{title or ''}\n{content or summary or ''}"
+
+
+class RelatedIndex:
+    def __init__(self):
+        self.article_ids = np.zeros(0, dtype=np.int64)
+        self.doc_freq = np.zeros(N_FEATURES, dtype=np.int32)
+        self.matrix = csr_matrix((0, N_FEATURES), dtype=np.float32)
+        self._row_of = {}
+        self._csc = None
+
+    def __len__(self):
+        return len(self.article_ids)
+
+    def __contains__(self, article_id):
+        return article_id in self._row_of
+
+    def _idf(self):
+        n = max(len(self), 1)
+        return (np.log((1 + n) / (1 + self.doc_freq)) + 1).astype(np.float32)
+
+    def add_articles(self, article_ids, texts):
+        """Append rows for articles not yet indexed; returns how many were added."""
+        pairs = [(a, t) for a, t in zip(article_ids, texts) if a not in self._row_of]
+        if not pairs:
+            return 0
+        ids, docs = zip(*pairs)
+        tf = _vectorizer().transform(docs).tocsr()
+        self.doc_freq += np.bincount(tf.indices, minlength=N_FEATURES).astype(np.int32)
+        tf.data = 1 + np.log(tf.data)
+        rows = l2_normalize(tf.multiply(self._idf()).tocsr())
+
+        start = len(self.article_ids)
+        self.matrix = vstack([self.matrix, rows], format="csr")
+        self.article_ids = np.concatenate([self.article_ids, np.asarray(ids, dtype=np.int64)])
+        self._row_of.update((a, start + i) for i, a in enumerate(ids))
+        self._csc = None
+        return len(ids)
+
+    def sync(self, session, chunk_size=500):
+        """
+        Index every processed, non-duplicate article not yet in the index: the
+        rows process_articles.py has categorized. Unprocessed and deferred
+        entries are left out until they are processed, so an entry is never
+        indexed on its feed summary and then kept after its full text arrives.
+        """
+        all_ids = [r[0] for r in session.execute(
+            select(Article.id)
+            .where(Article.canonical_id == None, Article.categorized_at != None)  # noqa: E711
+            .order_by(Article.id)
+        )]
+        missing = [a for a in all_ids if a not in self._row_of]
+        added = 0
+        for i in range(0, len(missing), chunk_size):
+            chunk = missing[i:i + chunk_size]
+            stmt = (
+                select(Article.id, Article.title, Article.content, Article.summary)
+                .where(Article.id.in_(chunk))
+            )
+            rows = session.execute(stmt).all()
+            added += self.add_articles(
+                [r[0] for r in rows], [article_text(r[1], r[2], r[3]) for r in rows]
+            )
+        return added
+
+    def related(self, article_id, k=10):
+        """Return [(article_id, cosine_similarity), ...] for the k most similar articles."""
+        row = self._row_of.get(article_id)
+        if row is None:
+            return []
+        if self._csc is None:
+            self._csc = self.matrix.tocsc()
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        terms = self.matrix.indices[start:end]
+        weights = self.matrix.data[start:end]
+        if len(terms) > QUERY_TERMS:
+            keep = np.argpartition(-weights, QUERY_TERMS - 1)[:QUERY_TERMS]
+            terms, weights = terms[keep], weights[keep]
+
+        sims = self._csc[:, terms] @ weights
+        sims[row] = -1.0
+        k = min(k, len(sims) - 1)
+        if k <= 0:
+            return []
+        top = np.argpartition(-sims, k - 1)[:k]
+        top = top[np.argsort(-sims[top], kind="stable")]
+        return [(int(self.article_ids[i]), float(sims[i])) for i in top if sims[i] > 0]
+
+    def save(self, path=RELATED_INDEX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path,
+            data=self.matrix.data, indices=self.matrix.indices, indptr=self.matrix.indptr,
+            article_ids=self.article_ids, doc_freq=self.doc_freq,
+        )
+
+
+def load_index(path=RELATED_INDEX_PATH):
+    """Return the saved index, or an empty one if nothing has been saved yet."""
+    index = RelatedIndex()
+    if not os.path.exists(path):
+        return index
+    with np.load(path) as f:
+        index.article_ids = f["article_ids"]
+        index.doc_freq = f["doc_freq"]
+        index.matrix = csr_matrix(
+            (f["data"], f["indices"], f["indptr"]), shape=(len(index.article_ids), N_FEATURES)
+        )
+    index._row_of = {int(a): i for i, a in enumerate(index.article_ids)}
+    return index
+
+
+def related_articles(session, index, article_id, k=10):
+    """index.related() joined to title/source/link, as a DataFrame in rank order."""
+    hits = index.related(article_id, k)
+    cols = ["Article ID", "Title", "Source", "Published", "Link", "Similarity"]
+    if not hits:
+        return pd.DataFrame(columns=cols)
+    sims = dict(hits)
+    stmt = select(Article.id, Article.title, Article.source, Article.published, Article.link).where(
+        Article.id.in_(list(sims))
+    )
+    df = pd.DataFrame(session.execute(stmt).all(), columns=cols[:-1])
+    df["Similarity"] = df["Article ID"].map(sims).round(3)
+    return df.sort_values("Similarity", ascending=False).reset_index(drop=True)
@@ -0,0 +1,123 @@
+# digester/relevance.py
+#
+# Cheap topical relevance score for feed entries, used by run_fetcher to defer
+# full-text scraping and NER for off-topic items. Features are hashed
+# (HashingVectorizer, no vocabulary to store) and the model is a linear
+# classifier, so the saved artifact is just a weight vector and scoring a whole
+# feed is one sparse mat-vec.
+import os
+
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sqlalchemy import exists, select
+
+from data.db.article_model import (
+    Article, ArticleEntity, ArticleLabel, ArticleSpanAnnotation, EntityLabelChange,
+)
+from digester.dedupe import normalize
+
+MODEL_PATH = os.environ.get("RELEVANCE_MODEL_PATH", os.path.join("data", "processed", "relevance_model.npz"))
+DEFAULT_THRESHOLD = float(os.environ.get("RELEVANCE_THRESHOLD", "0.2"))
+
+N_FEATURES = 2 ** 18
+NGRAM_RANGE = (1, 2)
+
+
+def _vectorizer(n_features=N_FEATURES):
+    return HashingVectorizer(
+        n_features=n_features,
+        ngram_range=NGRAM_RANGE,
+        alternate_sign=False,
+        norm="l2",
+        preprocessor=normalize,  # drops feed HTML before tokenising
+    )
+
+
+def entry_text(title, summary) -> str:
+    return f"{title or ''} {summary or ''}"
+
+
+class RelevanceModel:
+    def __init__(self, coef, intercept, threshold=DEFAULT_THRESHOLD):
+        self.coef = np.asarray(coef, dtype=np.float64)
+        self.intercept = float(intercept)
+        self.threshold = threshold
+        self.vectorizer = _vectorizer(len(self.coef))
+
+    def score(self, texts):
+        """Probability of being on-topic for each text."""
+        if not texts:
+            return np.zeros(0)
+        X = self.vectorizer.transform(texts)
+        return 1.0 / (1.0 + np.exp(-(X @ self.coef + self.intercept)))
+
+    def save(self, path=MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(path, coef=self.coef, intercept=self.intercept)
+
+
+def load_model(path=MODEL_PATH, threshold=None):
+    """Return the saved RelevanceModel, or None if none has been trained."""
+    if not os.path.exists(path):
+        return None
+    data = np.load(path)
+    return RelevanceModel(
+        data["coef"], data["intercept"],
+        DEFAULT_THRESHOLD if threshold is None else threshold,
+    )
+
+
+def training_data(session):
+    """
+    Labels from what the pipeline and annotators already recorded:
+      human    — span annotations or label corrections to something other than
+                 IGNORE (positive); only IGNORE corrections (negative)
+      weak     — keyword tags / ArticleLabel rows (positive), processed with
+                 no tags (negative). Tags are a keyword match over the same
+                 title + summary the model sees, so scores on weak labels are
+                 partly circular.
+    Human labels win where both exist. Returns (texts, labels, content_lengths,
+    human) where human is 1/0 for human-labelled articles and -1 otherwise.
+    """
+    has_label = exists().where(ArticleLabel.article_id == Article.id)
+    has_spans = exists().where(ArticleSpanAnnotation.article_id == Article.id)
+
+    def corrected(*where):
+        return exists().where(
+            EntityLabelChange.entity_id == ArticleEntity.id,
+            ArticleEntity.article_id == Article.id,
+            *where,
+        )
+
+    has_correction = corrected(EntityLabelChange.new_label != "IGNORE")
+    has_any_correction = corrected()
+    has_entities = exists().where(ArticleEntity.article_id == Article.id)
+    tagged = (Article.tags != None) & (Article.tags != "")  # noqa: E711
+
+    stmt = (
+        select(
+            Article.title, Article.summary, Article.content,
+            tagged | has_label, has_spans | has_correction, has_any_correction,
+        )
+        .where(Article.canonical_id == None)  # noqa: E711
+        .where(tagged | has_label | has_spans | has_entities)
+    )
+    texts, labels, lengths, human = [], [], [], []
+    for title, summary, content, weak, human_pos, corrected_any in session.execute(stmt):
+        texts.append(entry_text(title, summary))
+        if human_pos or corrected_any:
+            human.append(int(bool(human_pos)))
+        else:
+            human.append(-1)
+        labels.append(human[-1] if human[-1] >= 0 else int(bool(weak)))
+        lengths.append(len(content or ""))
+    return texts, np.array(labels), np.array(lengths), np.array(human)
+
+
+def train(texts, labels, C=4.0):
+    from sklearn.linear_model import LogisticRegression
+
+    X = _vectorizer().transform(texts)
+    clf = LogisticRegression(C=C, class_weight="balanced", solver="liblinear")
+    clf.fit(X, labels)
+    return RelevanceModel(clf.coef_.ravel(), clf.intercept_[0])
@@ -2,6 +2,8 @@ import yaml
 import feedparser
 import requests
 
+from utils import metrics
+
 
 def load_sources(config_path="config/sources.yaml"):
     with open(config_path, "r") as f:
@@ -19,9 +21,13 @@ def fetch_articles():
     for source in sources:
         print(f"[RSS] Fetching from: {source['name']} → {source['url']}")
         try:
-            response = requests.get(source["url"], headers=headers, timeout=10)
-            response.raise_for_status()
-            feed = feedparser.parse(response.content)
+            with metrics.stage("feed_request", feed=source["name"]) as m:
+                response = requests.get(source["url"], headers=headers, timeout=10)
+                m.update(status=str(response.status_code), bytes=len(response.content))
+                response.raise_for_status()
+            with metrics.stage("feed_parse", feed=source["name"]) as m:
+                feed = feedparser.parse(response.content)
+                m["entries"] = len(feed.entries)
         except Exception as e:
             print(f"[ERROR] Failed to fetch {source['name']}: {e}")
             continue
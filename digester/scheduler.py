@@ -1,7 +1,21 @@
-import schedule
+import fcntl
+import json
+import os
+import signal
+import threading
 import time
+import traceback
+from contextlib import contextmanager
+from datetime import datetime
+
+import schedule
+
 from digester.rss_fetcher import fetch_articles
 from digester.categorizer import categorize_article
+from utils import metrics
+
+STATUS_PATH = os.environ.get("DAEMON_STATUS_PATH", os.path.join("logs", "daemon_status.json"))
+LOCK_PATH = os.environ.get("DAEMON_LOCK_PATH", os.path.join("logs", "daemon.lock"))
 
 
 def job():
@@ -20,3 +34,209 @@ def run_scheduled_tasks():
     while True:
         schedule.run_pending()
         time.sleep(30)
+
+
+# --- resident ingestion daemon ---------------------------------------------
+#
+# Instead of a cold process per cron tick (reinstall, reload spaCy, reconnect),
+# one long-running process keeps the model, HTTP pool and DB engine warm and
+# runs each Job on its own interval in its own thread, so fetching and NER
+# overlap. A job never overlaps itself: a tick that finds the previous cycle
+# still running is coalesced into one follow-up cycle. A file lock keeps a
+# second daemon off the same machine, and the status file is rewritten on every
+# tick and job transition for health checks.
+
+def _now():
+    return datetime.utcnow().isoformat(timespec="seconds") + "Z"
+
+
+class Job:
+    """A recurring daemon job. `fn()` returns how much work it did; a truthy result wakes job `then`."""
+
+    def __init__(self, name, fn, every_s, then=None):
+        self.name = name
+        self.fn = fn
+        self.every_s = every_s
+        self.then = then
+        self.lock = threading.Lock()
+        self.pending = False
+        self.thread = None
+        self.status = {
+            "runs": 0, "failures": 0, "skipped": 0,
+            "last_started": None, "last_finished": None, "last_duration_s": None,
+            "last_status": None, "last_result": None, "last_error": None,
+        }
+
+
+class DaemonLocked(RuntimeError):
+    pass
+
+
+@contextmanager
+def daemon_lock(path=LOCK_PATH):
+    """Exclusive lock for the daemon's lifetime; the OS drops it if the process dies."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    f = open(path, "a+")
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        f.close()
+        raise DaemonLocked(f"another ingestion daemon holds {path}")
+    f.seek(0)
+    f.truncate()
+    f.write(str(os.getpid()))
+    f.flush()
+    try:
+        yield
+    finally:
+        fcntl.flock(f, fcntl.LOCK_UN)
+        f.close()
+
+
+class IngestDaemon:
+    def __init__(self, jobs, warmups=(), status_path=STATUS_PATH, lock_path=LOCK_PATH, tick_s=5.0):
+        self.jobs = {j.name: j for j in jobs}
+        self.warmups = list(warmups)  # [(name, fn)], run once before the first cycle
+        self.status_path = status_path
+        self.lock_path = lock_path
+        self.tick_s = tick_s
+        self.scheduler = schedule.Scheduler()
+        self.started_at = None
+        self.state = "starting"
+        self.warmup_s = {}
+        self._scheduled = {}
+        self._stop = threading.Event()
+        self._status_lock = threading.Lock()
+
+    def warm(self):
+        for name, fn in self.warmups:
+            t0 = time.perf_counter()
+            fn()
+            self.warmup_s[name] = round(time.perf_counter() - t0, 3)
+            print(f"[Daemon] Warmed {name} in {self.warmup_s[name]:.1f}s")
+
+    def run(self):
+        """Run until SIGINT/SIGTERM; each job starts immediately, then on its interval."""
+        with daemon_lock(self.lock_path):
+            self.started_at = _now()
+            self.write_status("warming")
+            self.warm()
+            self.state = "running"
+            for name, job in self.jobs.items():
+                self._scheduled[name] = self.scheduler.every(job.every_s).seconds.do(self.launch, name)
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+            for name in self.jobs:
+                self.launch(name)
+            print(f"[Daemon] Running {', '.join(f'{n} every {j.every_s}s' for n, j in self.jobs.items())}")
+            while not self._stop.is_set():
+                self.scheduler.run_pending()
+                self.write_status()
+                self._stop.wait(self.tick_s)
+            self.write_status("stopping")
+            for job in self.jobs.values():
+                if job.thread is not None:
+                    job.thread.join()
+            self.write_status("stopped")
+            print("[Daemon] Stopped.")
+
+    def run_once(self):
+        """Warm up, then run every job once in order (fetch before process); True if all succeeded."""
+        with daemon_lock(self.lock_path):
+            self.started_at = _now()
+            self.write_status("warming")
+            self.warm()
+            self.state = "running"
+            for job in self.jobs.values():
+                job.lock.acquire()
+                self._run(job, follow_up=False)
+            self.write_status("stopped")
+        return all(j.status["last_status"] == "ok" for j in self.jobs.values())
+
+    def stop(self, *_):
+        if self._stop.is_set():
+            raise SystemExit("[Daemon] Forced exit while jobs were still running")
+        print("[Daemon] Stopping after the running cycles finish (signal again to force)...")
+        self._stop.set()
+
+    def launch(self, name):
+        job = self.jobs[name]
+        if self._stop.is_set():
+            return
+        if not job.lock.acquire(blocking=False):
+            job.pending = True
+            job.status["skipped"] += 1
+            print(f"[Daemon] {name} still running; queued one follow-up cycle")
+            return
+        job.thread = threading.Thread(target=self._run, args=(job,), name=f"daemon-{name}", daemon=True)
+        job.thread.start()
+
+    def _run(self, job, follow_up=True):
+        """Body of one cycle; the caller holds job.lock, released here."""
+        result = None
+        job.pending = False
+        job.status["last_started"] = _now()
+        self.write_status()
+        t0 = time.perf_counter()
+        try:
+            with metrics.pipeline_run(job.name):
+                result = job.fn()
+            job.status.update(last_status="ok", last_result=result, last_error=None)
+        except Exception as ex:
+            traceback.print_exc()
+            job.status["failures"] += 1
+            job.status.update(last_status="error", last_result=None, last_error=f"{type(ex).__name__}: {ex}")
+        finally:
+            job.status["runs"] += 1
+            job.status["last_finished"] = _now()
+            job.status["last_duration_s"] = round(time.perf_counter() - t0, 3)
+            job.lock.release()
+            self.write_status()
+        if follow_up:
+            if job.pending:
+                self.launch(job.name)
+            if result and job.then in self.jobs:
+                self.launch(job.then)
+
+    def status(self):
+        jobs = {}
+        for name, job in self.jobs.items():
+            scheduled = self._scheduled.get(name)
+            jobs[name] = {
+                **job.status,
+                "running": job.lock.locked(),
+                "every_s": job.every_s,
+                "next_run": scheduled.next_run.isoformat(timespec="seconds") if scheduled and scheduled.next_run else None,
+            }
+        return {
+            "pid": os.getpid(), "state": self.state, "started_at": self.started_at,
+            "heartbeat": _now(), "warmup_s": self.warmup_s, "jobs": jobs,
+        }
+
+    def write_status(self, state=None):
+        with self._status_lock:
+            if state is not None:
+                self.state = state
+            os.makedirs(os.path.dirname(self.status_path) or ".", exist_ok=True)
+            tmp = self.status_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self.status(), f, indent=2, default=str)
+            os.replace(tmp, self.status_path)  # readers never see a half-written file
+
+
+def check_status(path=STATUS_PATH, max_age_s=120):
+    """(healthy, message) from a daemon status file: fresh heartbeat and no job whose last cycle failed."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            status = json.load(f)
+    except (OSError, ValueError) as ex:
+        return False, f"no readable status at {path}: {ex}"
+    if status.get("state") not in ("warming", "running"):
+        return False, f"daemon is {status.get('state')}"
+    age = (datetime.utcnow() - datetime.fromisoformat(status["heartbeat"].rstrip("Z"))).total_seconds()
+    if age > max_age_s:
+        return False, f"heartbeat is {age:.0f}s old (pid {status.get('pid')})"
+    failing = [n for n, j in status.get("jobs", {}).items() if j.get("last_status") == "error"]
+    if failing:
+        return False, "last cycle failed: " + ", ".join(f"{n} ({status['jobs'][n]['last_error']})" for n in failing)
+    return True, f"running (pid {status.get('pid')}, heartbeat {age:.0f}s ago)"
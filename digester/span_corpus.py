@@ -0,0 +1,150 @@
+# digester/span_corpus.py
+#
+# Span annotations → spaCy DocBin training corpus. Annotation rows are streamed
+# per article (yield_per), texts fetched one batch of articles at a time, and
+# each batch is turned into Docs in a worker process. Every batch becomes one
+# shard file under train/ and dev/; `spacy train` reads a directory of .spacy
+# files, so the corpus is never held in memory as a whole.
+#
+# Docs carry the annotations twice: doc.spans["sc"] keeps all of them (for
+# spancat), doc.ents keeps a non-overlapping subset (for ner).
+import json
+import os
+import shutil
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import groupby
+
+import spacy
+from spacy.tokens import DocBin
+from spacy.util import filter_spans
+from sqlalchemy import select
+
+from data.db.article_model import Article, ArticleSpanAnnotation
+
+DOCBIN_DIR = os.path.join(os.environ.get("EXPORT_DIR", os.path.join("data", "exports")), "spans_docbin")
+
+_nlp = None  # per worker process
+
+
+def is_dev(article_id, dev_percent):
+    """Stable split: an article stays on the same side as the corpus grows."""
+    return (article_id * 2654435761) % 2**32 % 100 < dev_percent
+
+
+def annotated_batches(session, batch_size=200, dev_percent=20, chunk_size=5000):
+    """Yield lists of (article_id, text, [(start, end, label, text)], is_dev), `batch_size` articles each."""
+    spans = session.execute(
+        select(ArticleSpanAnnotation.article_id, ArticleSpanAnnotation.start_char,
+               ArticleSpanAnnotation.end_char, ArticleSpanAnnotation.label, ArticleSpanAnnotation.text)
+        .order_by(ArticleSpanAnnotation.article_id, ArticleSpanAnnotation.start_char)
+        .execution_options(yield_per=chunk_size)
+    )
+    batch = []
+    for article_id, rows in groupby(spans, key=lambda r: r[0]):
+        batch.append((article_id, [tuple(r[1:]) for r in rows]))
+        if len(batch) == batch_size:
+            yield _with_texts(session, batch, dev_percent)
+            batch = []
+    if batch:
+        yield _with_texts(session, batch, dev_percent)
+
+
+def _with_texts(session, batch, dev_percent):
+    # same text the Span Annotator shows and offsets refer to
+    texts = {
+        aid: content or summary or ""
+        for aid, content, summary in session.execute(
+            select(Article.id, Article.content, Article.summary).where(Article.id.in_([aid for aid, _ in batch]))
+        )
+    }
+    return [(aid, texts.get(aid, ""), spans, is_dev(aid, dev_percent)) for aid, spans in batch]
+
+
+def build_shard(batch, lang="en", alignment_mode="contract"):
+    """One batch → (train DocBin bytes, dev DocBin bytes, stats). Runs in worker processes."""
+    global _nlp
+    if _nlp is None:
+        _nlp = spacy.blank(lang)
+    bins = {False: DocBin(store_user_data=True), True: DocBin(store_user_data=True)}
+    stats = Counter()
+    for article_id, text, spans, dev in batch:
+        doc = _nlp.make_doc(text)
+        kept = []
+        for start, end, label, stored in spans:
+            # the article text changed since it was annotated, or the span cuts through a token
+            if stored is not None and text[start:end] != stored:
+                stats["misaligned"] += 1
+                continue
+            span = doc.char_span(start, end, label=label, alignment_mode=alignment_mode)
+            if span is None:
+                stats["misaligned"] += 1
+                continue
+            kept.append(span)
+        doc.spans["sc"] = kept
+        doc.ents = filter_spans(kept)
+        doc.user_data["article_id"] = article_id
+        bins[dev].add(doc)
+        split = "dev" if dev else "train"
+        stats[f"{split}_docs"] += 1
+        stats["spans"] += len(kept)
+        stats["overlapping"] += len(kept) - len(doc.ents)
+    return bins[False].to_bytes(), bins[True].to_bytes(), stats
+
+
+def _build_shard_args(args):
+    return build_shard(*args)
+
+
+def build_docbin_corpus(session, out_dir=DOCBIN_DIR, jobs=None, batch_size=200, dev_percent=20,
+                        lang="en", alignment_mode="contract"):
+    """
+    Rebuild the corpus in `out_dir` (train/shard-*.spacy, dev/shard-*.spacy,
+    manifest.json). Batches are converted by `jobs` processes (default: all
+    CPUs; 1 = in-process) with at most 2 × jobs batches in flight. The old
+    corpus is replaced only once the new one is complete. Returns the stats.
+    """
+    tmp = out_dir.rstrip("/") + ".tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    for split in ("train", "dev"):
+        os.makedirs(os.path.join(tmp, split))
+
+    totals = Counter()
+    shard = 0
+
+    def save(result):
+        nonlocal shard
+        train, dev, stats = result
+        for split, data in (("train", train), ("dev", dev)):
+            if stats[f"{split}_docs"]:
+                with open(os.path.join(tmp, split, f"shard-{shard:05d}.spacy"), "wb") as f:
+                    f.write(data)
+        totals.update(stats)
+        shard += 1
+
+    batches = ((batch, lang, alignment_mode) for batch in annotated_batches(session, batch_size, dev_percent))
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1:
+        for args in batches:
+            save(_build_shard_args(args))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            in_flight = deque()
+            for args in batches:
+                in_flight.append(pool.submit(_build_shard_args, args))
+                if len(in_flight) >= 2 * jobs:
+                    save(in_flight.popleft().result())
+            while in_flight:
+                save(in_flight.popleft().result())
+
+    manifest = {
+        "created_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "lang": lang, "dev_percent": dev_percent, "alignment_mode": alignment_mode,
+        "shards": shard, **totals,
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp, out_dir)
+    return manifest
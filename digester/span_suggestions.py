@@ -0,0 +1,143 @@
+# digester/span_suggestions.py
+#
+# Pre-annotation for the Span Annotator. Stored ArticleEntity mentions are
+# projected onto the annotator's text by their offsets; mentions without
+# usable offsets and gazetteer terms are located together in a single regex
+# pass. Candidates that overlap an existing annotation (checked with an
+# IntervalIndex) or an earlier, longer candidate are dropped, so every
+# suggestion can be accepted as-is.
+import bisect
+import re
+from html import escape
+
+from digester.gazetteer import GAZETTEER_PATH, load_gazetteer
+
+MENTION = "mention"
+GAZETTEER = "gazetteer"
+
+
+class IntervalIndex:
+    """
+    Static set of half-open [start, end) intervals. Intervals are sorted by
+    start with a running maximum of their ends, so "does [s, e) overlap
+    anything?" is one bisect plus one lookup, whatever the set size.
+    """
+
+    def __init__(self, intervals=()):
+        items = sorted((int(s), int(e)) for s, e in intervals if e > s)
+        self.starts = [s for s, _ in items]
+        self.ends = [e for _, e in items]
+        self.max_end = []
+        running = -1
+        for e in self.ends:
+            running = max(running, e)
+            self.max_end.append(running)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def overlaps(self, start, end):
+        # only intervals starting before `end` can overlap; one of them must end after `start`
+        n = bisect.bisect_left(self.starts, end)
+        return n > 0 and self.max_end[n - 1] > start
+
+    def overlapping(self, start, end):
+        """[(start, end), ...] of every stored interval overlapping [start, end)."""
+        n = bisect.bisect_left(self.starts, end)
+        return [(self.starts[i], self.ends[i]) for i in range(n) if self.ends[i] > start]
+
+
+def _term_pattern(terms):
+    """One case-insensitive alternation, longest terms first so they win at a position."""
+    alts = sorted({t for t in terms if t}, key=lambda t: (-len(t), t))
+    if not alts:
+        return None
+    return re.compile(r"(?<!\w)(?:" + "|".join(map(re.escape, alts)) + r")(?!\w)", re.IGNORECASE)
+
+
+def gazetteer_terms(path=GAZETTEER_PATH):
+    """{lower-cased term: taxonomy label} from the saved gazetteer patterns."""
+    patterns = load_gazetteer(path)
+    return {p["pattern"].lower(): p.get("id") or p["label"] for p in patterns if p.get("pattern")}
+
+
+def suggest_spans(text, mentions, gazetteer=None, existing=(), offset=0):
+    """
+    Return non-overlapping suggestions as dicts (start, end, text, label, source).
+
+    `mentions` are (name, label, start_char, end_char) rows whose offsets are
+    relative to a text that starts `offset` characters before `text`
+    (process_articles.py prepends the title). `gazetteer` maps lower-cased
+    terms to labels. Spans overlapping `existing` (start, end) pairs are skipped.
+    """
+    if not text:
+        return []
+    candidates = []
+    # terms to locate by search: gazetteer entries plus mentions whose offsets don't line up
+    search_labels = dict(gazetteer or {})
+    for name, label, start, end in mentions:
+        name = (name or "").strip()
+        if not name:
+            continue
+        if start is not None and end is not None:
+            s, e = start - offset, end - offset
+            if 0 <= s < e <= len(text) and text[s:e].strip() == name:
+                candidates.append((s, e, label, MENTION))
+                continue
+        search_labels.setdefault(name.lower(), label)
+
+    pattern = _term_pattern(search_labels)
+    if pattern is not None:
+        for m in pattern.finditer(text):
+            label = search_labels.get(m.group(0).lower())
+            source = GAZETTEER if m.group(0).lower() in (gazetteer or {}) else MENTION
+            candidates.append((m.start(), m.end(), label, source))
+
+    taken = IntervalIndex(existing)
+    out = []
+    last_end = -1
+    # earliest first, longest first at the same start; greedy sweep keeps the first of any overlap
+    for s, e, label, source in sorted(candidates, key=lambda c: (c[0], -(c[1] - c[0]))):
+        if s < last_end or taken.overlaps(s, e):
+            continue
+        out.append({"start": s, "end": e, "text": text[s:e], "label": label, "source": source})
+        last_end = e
+    return out
+
+
+def highlight_spans(text, highlights):
+    """
+    HTML for `text` with each highlight (dict with start, end, and optional
+    label / color / style) wrapped in a <mark>. Overlapping spans are split at
+    every boundary; each piece takes the colour of the innermost span covering
+    it and a tooltip listing all of their labels.
+    """
+    if not text:
+        return "<i>No text</i>"
+    bounds = {0, len(text)}
+    for h in highlights:
+        bounds.update((max(0, h["start"]), min(len(text), h["end"])))
+    bounds = sorted(bounds)
+
+    by_start = sorted(highlights, key=lambda h: (h["start"], -h["end"]))
+    active = []
+    nxt = 0
+    out = []
+    for a, b in zip(bounds, bounds[1:]):
+        while nxt < len(by_start) and by_start[nxt]["start"] <= a:
+            active.append(by_start[nxt])
+            nxt += 1
+        active = [h for h in active if h["end"] > a]
+        piece = escape(text[a:b])
+        if not active:
+            out.append(piece)
+            continue
+        inner = active[-1]
+        color = inner.get("color", "#ffd54f")
+        style = inner.get("style", "")
+        title = escape(" / ".join(h.get("label") or "" for h in active))
+        out.append(
+            f'<mark style="background:{color}; padding:0 2px; border-radius:3px;{style}" '
+            f'title="{title}">{piece}</mark>'
+        )
+    return "".join(out)
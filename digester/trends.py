@@ -0,0 +1,146 @@
+# digester/trends.py
+#
+# Trending / emerging entity detection. Mentions are turned into an
+# entity × day matrix of article counts, and burst scores for every entity are
+# computed with whole-array NumPy operations (cumulative sums for the rolling
+# windows), so cost grows with the matrix size rather than with a Python loop
+# per entity.
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from sqlalchemy import func, select
+
+from data.db.article_model import Article, ArticleEntity
+
+DEFAULT_WINDOW = 7      # days in the "recent" window
+DEFAULT_BASELINE = 28   # days of history before it used as the baseline
+
+
+class EntityDayMatrix:
+    """counts[i, j] = number of articles mentioning entity i on day j."""
+
+    def __init__(self, names, labels, days, counts):
+        self.names = names      # ndarray[str], one per row
+        self.labels = labels    # ndarray[str], one per row
+        self.days = days        # DatetimeIndex, one per column
+        self.counts = counts    # float32 ndarray (entities × days)
+
+    def __len__(self):
+        return len(self.names)
+
+
+def _article_days(session, since):
+    """Publication day per article (falls back to fetched_at when unparseable)."""
+    stmt = (
+        select(Article.id, Article.published, Article.fetched_at)
+        .where(Article.canonical_id == None)  # noqa: E711
+        .where(Article.fetched_at >= since)  # fetched_at ≥ published, so a safe superset
+    )
+    df = pd.DataFrame(session.execute(stmt).all(), columns=["article_id", "published", "fetched_at"])
+    if df.empty:
+        return df.assign(day=pd.Series(dtype="datetime64[ns]"))[["article_id", "day"]]
+    published = pd.to_datetime(df["published"], errors="coerce", utc=True, format="mixed").dt.tz_localize(None)
+    df["day"] = published.fillna(pd.to_datetime(df["fetched_at"])).dt.normalize()
+    return df[["article_id", "day"]]
+
+
+def build_matrix(session, days, end=None):
+    """Build the entity × day matrix for the `days` days ending on `end` (default: today)."""
+    end = pd.Timestamp(end or datetime.utcnow()).normalize()
+    start = end - pd.Timedelta(days=days - 1)
+    day_index = pd.date_range(start, end, freq="D")
+
+    articles = _article_days(session, start.to_pydatetime() - timedelta(days=1))
+    articles = articles[(articles["day"] >= start) & (articles["day"] <= end)]
+
+    name = func.trim(ArticleEntity.name)
+    label = func.coalesce(ArticleEntity.custom_label, ArticleEntity.type)
+    stmt = (
+        select(name, label, ArticleEntity.article_id)
+        .join(Article, Article.id == ArticleEntity.article_id)
+        .where(Article.canonical_id == None)  # noqa: E711
+        .where(Article.fetched_at >= start.to_pydatetime() - timedelta(days=1))
+        .group_by(name, label, ArticleEntity.article_id)  # one hit per article
+    )
+    mentions = pd.DataFrame(session.execute(stmt).all(), columns=["name", "label", "article_id"])
+    mentions = mentions.merge(articles, on="article_id", how="inner")
+    if mentions.empty:
+        return EntityDayMatrix(np.array([], dtype=object), np.array([], dtype=object),
+                               day_index, np.zeros((0, len(day_index)), dtype=np.float32))
+
+    keys = pd.MultiIndex.from_frame(mentions[["name", "label"]].fillna(""))
+    rows, uniques = pd.factorize(keys)
+    cols = ((mentions["day"] - start).dt.days).to_numpy()
+    counts = coo_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(uniques), len(day_index)),
+    ).toarray()  # duplicates are summed
+    return EntityDayMatrix(
+        uniques.get_level_values(0).to_numpy(),
+        uniques.get_level_values(1).to_numpy(),
+        day_index,
+        counts,
+    )
+
+
+def rolling_burst_scores(counts, window=DEFAULT_WINDOW, baseline=DEFAULT_BASELINE, prior=1.0):
+    """
+    z-score of each entity's `window`-day total against its preceding
+    `baseline`-day rate, for every day at once. Variance is the larger of
+    the baseline's empirical and Poisson variance, plus `prior` so brand-new
+    entities need several mentions to score high. Columns without enough
+    history are NaN.
+    """
+    n_rows, n_days = counts.shape
+    z = np.full((n_rows, n_days), np.nan, dtype=np.float32)
+    first = window + baseline - 1
+    if n_days <= first:
+        return z
+
+    c = counts.astype(np.float64)
+    csum = np.concatenate([np.zeros((n_rows, 1)), np.cumsum(c, axis=1)], axis=1)
+    csq = np.concatenate([np.zeros((n_rows, 1)), np.cumsum(c * c, axis=1)], axis=1)
+
+    ends = np.arange(first, n_days)
+    recent = csum[:, ends + 1] - csum[:, ends + 1 - window]
+    base_end = ends - window
+    base_sum = csum[:, base_end + 1] - csum[:, base_end + 1 - baseline]
+    base_sq = csq[:, base_end + 1] - csq[:, base_end + 1 - baseline]
+
+    mu = base_sum / baseline
+    var = np.maximum(base_sq / baseline - mu * mu, 0.0)
+    expected = window * mu
+    z[:, first:] = (recent - expected) / np.sqrt(window * np.maximum(var, mu) + prior)
+    return z
+
+
+def emerging_entities(matrix, window=DEFAULT_WINDOW, baseline=DEFAULT_BASELINE,
+                      top=20, min_recent=3, labels=None):
+    """Top entities by burst score on the last day of `matrix`, as a DataFrame."""
+    cols = ["Name", "Label", "Recent", "Baseline / day", "Burst z"]
+    if len(matrix) == 0:
+        return pd.DataFrame(columns=cols)
+
+    z = rolling_burst_scores(matrix.counts, window, baseline)[:, -1]
+    recent = matrix.counts[:, -window:].sum(axis=1)
+    base = matrix.counts[:, -(window + baseline):-window].mean(axis=1)
+
+    keep = (recent >= min_recent) & ~np.isnan(z)
+    if labels:
+        keep &= np.isin(matrix.labels, list(labels))
+    idx = np.flatnonzero(keep)
+    if len(idx) > top:
+        # partial selection, then sort only the winners
+        idx = idx[np.argpartition(-z[idx], top - 1)[:top]]
+    idx = idx[np.argsort(-z[idx], kind="stable")]
+
+    return pd.DataFrame({
+        "Name": matrix.names[idx],
+        "Label": matrix.labels[idx],
+        "Recent": recent[idx].astype(int),
+        # float64 for display: rounded float32 values print as 25.889999
+        "Baseline / day": np.round(base[idx].astype(np.float64), 2),
+        "Burst z": np.round(z[idx].astype(np.float64), 2),
+    }, columns=cols)
@@ -1,16 +1,24 @@
-from db.article_model import get_session, ArticleEntity
-from collections import Counter
+import argparse
+
+from data.db.article_model import get_session
+from data.db.queries import entity_counts
+from utils import profiling
 
 
 def list_entities(limit=20):
     session = get_session()
-    entities = session.query(ArticleEntity).all()
-    counts = Counter((e.name.strip(), e.type) for e in entities)
+    counts = entity_counts(session, limit=limit)
 
     print(f"\nTop {limit} extracted entities:\n")
-    for (name, label), count in counts.most_common(limit):
+    for name, label, count in counts:
         print(f"{name} ({label}): {count}")
 
 
 if __name__ == "__main__":
-    list_entities()
+    parser = argparse.ArgumentParser(description="Print the most frequent extracted entities.")
+    parser.add_argument("--limit", type=int, default=20)
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.profiled("list_entities", profiling.profiling_enabled(args.profile)):
+        list_entities(limit=args.limit)
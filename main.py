@@ -1,8 +1,11 @@
 # main.py
+import argparse
+
 from digester.categorizer import categorize_article
 from digester.entity_extractor import extract_entities
-from db.article_model import get_session, Article, ArticleEntity
+from data.db.article_model import get_session, Article, ArticleEntity
 from sqlalchemy.exc import IntegrityError
+from utils import profiling
 
 
 def process_unprocessed_articles(batch_size=200):
@@ -31,7 +34,8 @@ def process_unprocessed_articles(batch_size=200):
             # clear any existing entities for this article (idempotent)
             session.query(ArticleEntity).filter_by(article_id=article.id).delete()
             for ent in ents:
-                session.add(ArticleEntity(article_id=article.id, name=ent["text"], type=ent["label"]))
+                session.add(ArticleEntity(article_id=article.id, name=ent["text"], type=ent["raw_label"],
+                                         raw_label=ent["raw_label"], custom_label=ent["custom_label"]))
 
             session.commit()
             processed += 1
@@ -45,4 +49,10 @@ def process_unprocessed_articles(batch_size=200):
 
 
 if __name__ == "__main__":
-    process_unprocessed_articles()
+    parser = argparse.ArgumentParser(description="Tag and extract entities for untagged articles.")
+    parser.add_argument("--batch-size", type=int, default=200)
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.profiled("main", profiling.profiling_enabled(args.profile)):
+        process_unprocessed_articles(batch_size=args.batch_size)
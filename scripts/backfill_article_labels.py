@@ -0,0 +1,29 @@
+# scripts/backfill_article_labels.py
+#
+# Copy the comma-joined Article.tags of already processed articles into the
+# indexed article_labels table. process_articles.py does the same at the start
+# of every run; this is for backfilling a large database in one go.
+import argparse
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data.db.article_model import get_session
+from data.db.article_labels import CHUNK_SIZE, backfill_from_tags
+from data.db.queries import categorization_status, tag_counts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill article_labels from Article.tags.")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Articles written per transaction")
+    args = parser.parse_args()
+
+    session = get_session()
+    try:
+        articles, labels = backfill_from_tags(session, chunk_size=args.chunk_size)
+        print(f"[Labels] Backfilled {labels} labels for {articles} articles.")
+        status = categorization_status(session)
+        print(f"[Labels] {status['tagged']} tagged, {status['untagged']} without a matching tag, "
+              f"{status['unprocessed']} not processed yet.")
+        for tag, count in tag_counts(session):
+            print(f"  {tag}: {count}")
+    finally:
+        session.close()
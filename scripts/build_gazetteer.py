@@ -0,0 +1,28 @@
+# scripts/build_gazetteer.py
+import argparse
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from collections import Counter
+
+from data.db.article_model import get_session
+from digester.gazetteer import GAZETTEER_PATH, build_gazetteer, save_gazetteer
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile corrected entities into an EntityRuler gazetteer.")
+    parser.add_argument("--out", default=GAZETTEER_PATH, help="Output JSONL path")
+    parser.add_argument("--include-predicted", action="store_true",
+                        help="Also include uncorrected custom labels seen at least --min-count times")
+    parser.add_argument("--min-count", type=int, default=3, help="Threshold for --include-predicted")
+    args = parser.parse_args()
+
+    session = get_session()
+    patterns = build_gazetteer(session, include_predicted=args.include_predicted, min_count=args.min_count)
+    session.close()
+
+    save_gazetteer(patterns, args.out)
+    by_label = Counter(p["id"] for p in patterns)
+    print(f"[Gazetteer] Wrote {len(patterns)} patterns to {args.out}: {dict(by_label)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# scripts/build_related_index.py
+import argparse
+import sys, os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data.db.article_model import get_session
+from digester.related import RELATED_INDEX_PATH, RelatedIndex, load_index, related_articles
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or update the related-articles TF-IDF index.")
+    parser.add_argument("--path", default=RELATED_INDEX_PATH, help="Index .npz path")
+    parser.add_argument("--rebuild", action="store_true", help="Start from scratch (re-weights IDF for all articles)")
+    parser.add_argument("--query", type=int, default=None, help="Print the articles related to this Article.id")
+    parser.add_argument("-k", type=int, default=10, help="Neighbours to print with --query")
+    args = parser.parse_args()
+
+    session = get_session()
+    index = RelatedIndex() if args.rebuild else load_index(args.path)
+    t0 = time.perf_counter()
+    added = index.sync(session)
+    if added or args.rebuild:
+        index.save(args.path)
+    print(f"[Related] Indexed {added} new articles in {time.perf_counter() - t0:.1f}s; "
+          f"{len(index)} articles in {args.path}")
+
+    if args.query is not None:
+        t0 = time.perf_counter()
+        df = related_articles(session, index, args.query, args.k)
+        print(f"[Related] Query took {(time.perf_counter() - t0) * 1e3:.1f} ms")
+        print(df[["Article ID", "Similarity", "Source", "Title"]].to_string(index=False) if not df.empty else "(none)")
+    session.close()
+
+if __name__ == "__main__":
+    main()
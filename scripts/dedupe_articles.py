@@ -0,0 +1,59 @@
+# scripts/dedupe_articles.py
+#
+# Backfill MinHash fingerprints for articles stored before near-duplicate
+# detection existed, linking duplicates to the earliest matching article.
+import argparse
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import select
+
+from data.db.article_model import get_session, Article, ArticleEntity, ArticleFingerprint
+from data.db.versions import bump_version, ARTICLES, ENTITIES
+from digester import dedupe
+
+def backfill(kind, drop_duplicate_entities=False):
+    session = get_session()
+    index = dedupe.load_index(session, kind)
+    done = select(ArticleFingerprint.article_id).where(ArticleFingerprint.kind == kind)
+    articles = (
+        session.query(Article)
+        .filter(Article.canonical_id == None)  # noqa: E711
+        .filter(Article.id.not_in(done))
+        .order_by(Article.id)
+        .all()
+    )
+
+    linked = 0
+    for article in articles:
+        if kind == dedupe.TITLE:
+            text = f"{article.title or ''} {article.summary or ''}"
+        else:
+            text = dedupe.body_text(article)
+        sig = dedupe.minhash(text, kind)
+        if sig is None:
+            continue
+        match = index.query(sig)
+        if match:
+            article.canonical_id = match[0]
+            if drop_duplicate_entities:
+                session.query(ArticleEntity).filter_by(article_id=article.id).delete()
+            linked += 1
+        else:
+            dedupe.remember(session, index, kind, article.id, sig)
+
+    if linked:
+        bump_version(session, ARTICLES, ENTITIES)
+    session.commit()
+    print(f"[Dedupe] {kind}: scanned {len(articles)} articles, linked {linked} near-duplicates; index size {len(index)}.")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Backfill near-duplicate fingerprints and canonical links.")
+    parser.add_argument("--kind", choices=[dedupe.TITLE, dedupe.BODY, "all"], default="all")
+    parser.add_argument("--drop-duplicate-entities", action="store_true",
+                        help="Delete entity mentions of linked duplicates so they stop counting twice")
+    args = parser.parse_args()
+
+    kinds = [dedupe.TITLE, dedupe.BODY] if args.kind == "all" else [args.kind]
+    for kind in kinds:
+        backfill(kind, drop_duplicate_entities=args.drop_duplicate_entities)
@@ -0,0 +1,57 @@
+# scripts/export_dataset.py
+#
+#   python scripts/export_dataset.py entities --format parquet   # mentions since the last parquet export
+#   python scripts/export_dataset.py articles --format jsonl --full
+#   python scripts/export_dataset.py spans-docbin --jobs 4       # spaCy training corpus
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data.db.article_model import get_session
+from data.db.exports import CHUNK_SIZE, DATASETS, EXPORT_DIR, FORMATS, export_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream dataset exports (incremental) or build a DocBin corpus.")
+    parser.add_argument("dataset", choices=[*DATASETS, "spans-docbin"])
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--full", action="store_true", help="Export everything, not just rows since the last export")
+    parser.add_argument("--out", default=None, help=f"Output directory (default: {EXPORT_DIR}, DocBin: <out>/spans_docbin)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="Rows fetched per round trip")
+    parser.add_argument("--jobs", type=int, default=None, help="DocBin: worker processes (default: all CPUs)")
+    parser.add_argument("--batch-size", type=int, default=200, help="DocBin: articles per shard")
+    parser.add_argument("--dev-percent", type=int, default=20, help="DocBin: share of articles held out for dev/")
+    parser.add_argument("--alignment", choices=["strict", "contract", "expand"], default="contract",
+                        help="DocBin: how spans that cut through a token are snapped to token boundaries")
+    args = parser.parse_args()
+
+    session = get_session()
+    t0 = time.perf_counter()
+    try:
+        if args.dataset == "spans-docbin":
+            from digester.span_corpus import DOCBIN_DIR, build_docbin_corpus
+
+            out_dir = os.path.join(args.out, "spans_docbin") if args.out else DOCBIN_DIR
+            manifest = build_docbin_corpus(session, out_dir, jobs=args.jobs, batch_size=args.batch_size,
+                                           dev_percent=args.dev_percent, alignment_mode=args.alignment)
+            print(f"[Export] {manifest.get('train_docs', 0)} train / {manifest.get('dev_docs', 0)} dev docs, "
+                  f"{manifest.get('spans', 0)} spans ({manifest.get('misaligned', 0)} misaligned skipped, "
+                  f"{manifest.get('overlapping', 0)} overlapping kept in spans['sc'] only) → {out_dir} "
+                  f"in {time.perf_counter() - t0:.1f}s")
+            return
+
+        path, rows = export_dataset(session, args.dataset, args.format, out_dir=args.out or EXPORT_DIR,
+                                    full=args.full, chunk_size=args.chunk_size)
+        if path is None:
+            print(f"[Export] No new {args.dataset} rows since the last {args.format} export.")
+        else:
+            print(f"[Export] {rows} {args.dataset} rows → {path} in {time.perf_counter() - t0:.1f}s")
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    main()
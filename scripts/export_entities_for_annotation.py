@@ -1,31 +1,20 @@
-import csv
+# scripts/export_entities_for_annotation.py
+#
+# Kept for old habits: streams the entity mentions added since the last CSV
+# export. See scripts/export_dataset.py for the other datasets and formats.
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from db.article_model import get_session, Article, ArticleEntity
+from data.db.article_model import get_session
+from data.db.exports import export_dataset
 
 session = get_session()
-joined = session.query(ArticleEntity, Article).join(Article).all()
+path, rows = export_dataset(session, "entities", "csv")
+session.close()
 
-os.makedirs("data", exist_ok=True)
-with open("data/entity_annotation_dataset.csv", "w", newline='', encoding="utf-8") as csvfile:
-    writer = csv.DictWriter(csvfile, fieldnames=[
-        "article_id", "entity", "predicted_type", "title", "summary", "source", "published", "corrected_type"
-    ])
-    writer.writeheader()
-
-    for entity, article in joined:
-        writer.writerow({
-            "article_id": article.id,
-            "entity": entity.name,
-            "predicted_type": entity.type,
-            "title": article.title,
-            "summary": article.summary,
-            "source": article.source,
-            "published": article.published,
-            "corrected_type": ""
-        })
-
-print("✅ Exported entities to data/entity_annotation_dataset.csv")
+if path is None:
+    print("✅ No new entities since the last export")
+else:
+    print(f"✅ Exported {rows} entities to {path}")
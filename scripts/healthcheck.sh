@@ -8,4 +8,6 @@ source .venv/bin/activate
 echo "Python: $(python --version)"
 echo "DB exists? $(test -f data/articles.db && echo yes || echo no)"
 echo "Recent logs:"
-ls -l logs/*.log 2>/dev/null || echo "No logs yet"
\ No newline at end of file
+ls -l logs/*.log 2>/dev/null || echo "No logs yet"
+echo "Daemon:"
+python scripts/run_daemon.py --check || true
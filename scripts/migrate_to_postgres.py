@@ -0,0 +1,40 @@
+# scripts/migrate_to_postgres.py
+#
+#   python scripts/migrate_to_postgres.py --target "$SUPABASE_URL"             # data/articles.db → Postgres
+#   python scripts/migrate_to_postgres.py --target "$SUPABASE_URL" --truncate  # start over
+#
+# Interrupted runs resume where they stopped: just run the same command again.
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data.db.migrate import BATCH_SIZE, migrate
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-copy every table from SQLite into Postgres (COPY, resumable).")
+    parser.add_argument("--source", default="sqlite:///data/articles.db", help="Source DB URL")
+    parser.add_argument("--target", default=os.environ.get("DATABASE_URL"),
+                        help="Target DB URL (default: DATABASE_URL)")
+    parser.add_argument("--jobs", type=int, default=4, help="Tables copied in parallel within a dependency wave")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows per COPY / transaction")
+    parser.add_argument("--tables", nargs="*", help="Only these tables (default: all)")
+    parser.add_argument("--truncate", action="store_true",
+                        help="Empty the target tables and forget earlier progress first")
+    args = parser.parse_args()
+
+    if not args.target:
+        parser.error("--target (or DATABASE_URL) is required")
+    t0 = time.perf_counter()
+    try:
+        results = migrate(args.source, args.target, jobs=args.jobs, batch_size=args.batch_size,
+                          truncate=args.truncate, tables=args.tables)
+    except (RuntimeError, ValueError) as ex:
+        print(f"[Migrate] {ex}")
+        sys.exit(1)
+    rows = sum(r for r, _ in results.values())
+    orphans = sum(o for _, o in results.values())
+    print(f"[Migrate] Done: {rows:,} rows in {len(results)} tables in {time.perf_counter() - t0:.1f}s"
+          + (f"; {orphans:,} orphan rows skipped" if orphans else ""))
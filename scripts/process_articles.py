@@ -1,10 +1,21 @@
 # scripts/process_articles.py
+import argparse
 import sys, os
+import time
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from sqlalchemy import or_
+
 from data.db.article_model import get_session, Article, ArticleEntity
+from data.db.article_labels import backfill_from_tags, save_article_labels
+from data.db.versions import bump_version, ARTICLES, ENTITIES
 from digester.categorizer import categorize_article
-from digester.entity_extractor import extract_entities
+from digester import dedupe
+from digester.cooccurrence import load_graph
+from digester.related import load_index as load_related_index
+from digester.relevance import DEFAULT_THRESHOLD as RELEVANCE_THRESHOLD
+from digester.entity_extractor import extract_entities_many, mention_context, RULER_ONLY
+from utils import metrics, profiling
 
 # Simple heuristics to guess your taxonomy
 UNI_HINTS = ("University", "College", "Institute of", "Polytechnic", "École", "Technological University")
@@ -32,14 +43,90 @@ def guess_custom_label(name: str, raw_label: str) -> str:
 
     return "COMPANY"  # default bucket for remaining org-like entities
 
-def process_unprocessed_articles(batch_limit=500):
+def article_text(article) -> str:
+    # Prefer full content over summary for NER
+    return f"{article.title or ''}\n{article.content or article.summary or ''}"
+
+def link_body_duplicates(session, articles):
+    """
+    Link articles whose scraped body near-duplicates an earlier one to that
+    canonical article. Returns (articles that still need NER, {article_id:
+    body signature}); the signatures are only saved once the article itself
+    has been processed, so a failed or interrupted run leaves no fingerprint
+    behind for the article to match against next time.
+    """
+    with metrics.stage("body_dedupe_load"):
+        index = dedupe.load_index(session, dedupe.BODY)
+    keep, signatures = [], {}
+    t0 = time.perf_counter()
+    for article in articles:
+        # summary-only articles were already judged by run_fetcher's title stage
+        sig = dedupe.minhash(dedupe.body_text(article), dedupe.BODY)
+        match = index.query(sig, exclude=article.id) if sig is not None else None
+        if match:
+            article.canonical_id = match[0]
+            print(f"[Dedupe] Article {article.id} ≈ article {match[0]} (J≈{match[1]:.2f}); skipping NER")
+            continue
+        if sig is not None:
+            index.insert(article.id, sig)  # later articles in this batch match against it
+            signatures[article.id] = sig
+        keep.append(article)
+    if len(keep) < len(articles):
+        bump_version(session, ARTICLES)  # page caches count duplicates separately
+    session.commit()
+    metrics.record("body_dedupe", time.perf_counter() - t0, articles=len(articles),
+                   duplicates=len(articles) - len(keep))
+    return keep, signatures
+
+def process_unprocessed_articles(batch_limit=500, mode=None, include_deferred=False, graph=None, related=None):
+    """
+    Categorise and run NER over up to `batch_limit` new articles; returns the
+    number processed. `graph` / `related` are a resident co-occurrence graph and
+    related-articles index to update (loaded from disk when None).
+    """
     session = get_session()
 
-    # Articles missing tags or whose entities haven't been created yet (simple heuristic)
-    to_process = session.query(Article).filter((Article.tags == None) | (Article.tags == "")).limit(batch_limit).all()  # noqa: E711
+    # articles processed before article_labels was written only need their tags copied
+    with metrics.stage("labels_backfill") as m:
+        backfilled, m["rows"] = backfill_from_tags(session)
+    if backfilled:
+        print(f"[Labels] Backfilled labels for {backfilled} previously processed articles")
+
+    # Articles never categorized; near-duplicates are linked to a canonical
+    # article and never processed, entries the relevance filter deferred wait
+    # for --include-deferred
+    q = (
+        session.query(Article)
+        .filter(Article.categorized_at == None)  # noqa: E711
+        .filter(Article.canonical_id == None)  # noqa: E711
+    )
+    if not include_deferred:
+        # the fetcher records its decision (whatever --relevance-threshold it ran
+        # with); rows fetched before it did fall back to the default threshold
+        q = q.filter(or_(
+            Article.deferred == False,  # noqa: E712
+            (Article.deferred == None) & ((Article.relevance == None) | (Article.relevance >= RELEVANCE_THRESHOLD)),  # noqa: E711
+        ))
+    with metrics.stage("select") as m:
+        to_process = q.limit(batch_limit).all()
+        m["articles"] = len(to_process)
+    to_process, signatures = link_body_duplicates(session, to_process)
+
+    # Texts are built up front so NER can stream them through nlp.pipe
+    texts = [article_text(a) for a in to_process]
 
     processed = 0
-    for article in to_process:
+    tags_by_article = {}
+    # "ner" records time spent inside spaCy only (docs = items, chars = input size)
+    ents_stream = metrics.timed_iter(
+        extract_entities_many(texts, mode=mode), "ner", chars=sum(len(t) for t in texts)
+    )
+    for article, text, ents in zip(to_process, texts, ents_stream):
+        if ents is None:
+            # NER failed for this text alone; it stays unprocessed for the next run
+            print(f"[Error] Article {article.id}: NER failed, skipped")
+            continue
+        db_t0 = time.perf_counter()
         try:
             # Categorize (uses your existing keywords)
             article_dict = {
@@ -51,32 +138,75 @@ def process_unprocessed_articles(batch_limit=500):
             tags = categorize_article(article_dict)
             article.tags = ",".join(tags)
 
-            # Prefer full content over summary for NER
-            text = f"{article.title or ''}\n{article.content or article.summary or ''}"
-            ents = extract_entities(text)
-
             # idempotent replace of entities
             session.query(ArticleEntity).filter_by(article_id=article.id).delete()
 
             for ent in ents:
                 raw = ent["raw_label"]
-                custom = guess_custom_label(ent["text"], raw)
+                custom = ent.get("custom_label") or guess_custom_label(ent["text"], raw)
+                context, context_start = mention_context(text, ent["start_char"], ent["end_char"])
                 session.add(ArticleEntity(
                     article_id=article.id,
                     name=ent["text"],
                     raw_label=raw,
                     custom_label=custom,
-                    type=raw  # keep legacy in sync for now
+                    type=raw,  # keep legacy in sync for now
+                    start_char=ent["start_char"],
+                    end_char=ent["end_char"],
+                    context=context,
+                    context_start=context_start,
                 ))
+            if article.id in signatures:
+                # committed together with the entities, never ahead of them
+                dedupe.save_signature(session, dedupe.BODY, article.id, signatures[article.id])
 
             session.commit()
+            metrics.record("db_write", time.perf_counter() - db_t0, rows=len(ents) + 1)
+            tags_by_article[article.id] = tags
             processed += 1
             print(f"[Process] Article {article.id}: {len(ents)} entities")
         except Exception as ex:
             session.rollback()
             print(f"[Error] Article {article.id}: {ex}")
 
+    if processed:
+        # labels are written in bulk once the batch is through NER; an article
+        # interrupted before this point is simply processed again next run
+        with metrics.stage("labels") as m:
+            m["rows"] = save_article_labels(session, tags_by_article)  # bumps ARTICLES + LABELS
+            bump_version(session, ENTITIES)
+            session.commit()
+
+        # fold the new articles into the saved co-occurrence graph
+        with metrics.stage("cooccurrence") as m:
+            if graph is None:
+                graph = load_graph()
+            m["articles"] = added = graph.sync(session)
+            graph.save()
+        print(f"[Cooccurrence] Added {added} articles; graph has {len(graph)} entities.")
+
+        with metrics.stage("related_index") as m:
+            if related is None:
+                related = load_related_index()
+            m["articles"] = added = related.sync(session)
+            related.save()
+        print(f"[Related] Indexed {added} articles; index has {len(related)} articles.")
+
     print(f"[Done] Processed {processed} articles.")
+    session.close()
+    return processed
 
 if __name__ == "__main__":
-    process_unprocessed_articles()
+    parser = argparse.ArgumentParser(description="Categorise articles and extract entities.")
+    parser.add_argument("--limit", type=int, default=500, help="Max articles to process")
+    parser.add_argument("--ruler-only", action="store_true",
+                        help="Skip statistical NER; match only ruler/gazetteer patterns (fast backfills)")
+    parser.add_argument("--include-deferred", action="store_true",
+                        help="Also process entries the fetcher deferred as off-topic (never scraped)")
+    profiling.add_profile_argument(parser)
+    args = parser.parse_args()
+
+    with profiling.profiled("process_articles", profiling.profiling_enabled(args.profile)), \
+            metrics.pipeline_run("process_articles"):
+        process_unprocessed_articles(batch_limit=args.limit, mode=RULER_ONLY if args.ruler_only else None,
+                                     include_deferred=args.include_deferred)
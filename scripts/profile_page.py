@@ -0,0 +1,57 @@
+# scripts/profile_page.py
+#
+# Profile Streamlit pages headlessly. A live `streamlit run` serves every
+# session's reruns on their own threads, so cold and warm runs interleave;
+# instead each page is executed with streamlit.testing's AppTest: once cold
+# (empty st.cache_data / st.cache_resource) and once warm, which is what a user
+# sees on the first load and on every rerun. cProfile only sees its own thread,
+# so the profiler is started by a small wrapper that runs inside the script
+# thread and executes the page with runpy; st.stop() and rerun exceptions
+# unwind through its `with` block, so the profile is written either way.
+import argparse
+import glob
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+WRAPPER = """
+import runpy
+import sys
+import streamlit as st
+
+sys.path.insert(0, {root!r})
+from utils import profiling
+
+phase = "warm" if "_profile_page_ran" in st.session_state else "cold"
+st.session_state["_profile_page_ran"] = True
+with profiling.profiled({name!r} + "-" + phase, enabled=True):
+    runpy.run_path({path!r}, run_name="__main__")
+"""
+
+PAGES = ["streamlit_app/Home.py", *sorted(glob.glob("streamlit_app/pages/*.py")), "dashboard.py"]
+
+
+def profile_page(path, warm_runs=1, timeout=300):
+    from streamlit.testing.v1 import AppTest
+
+    name = "page-" + os.path.splitext(os.path.basename(path))[0]
+    script = WRAPPER.format(root=ROOT, name=name, path=os.path.abspath(path))
+    at = AppTest.from_string(script, default_timeout=timeout)
+    for _ in range(1 + warm_runs):
+        at.run()
+    if at.exception:
+        print(f"[Profile] {path} raised: {at.exception[0].message}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile Streamlit pages (cold + warm runs) into logs/.")
+    parser.add_argument("pages", nargs="*", help=f"Page scripts (default: all of {', '.join(PAGES)})")
+    parser.add_argument("--warm-runs", type=int, default=1, help="Cached reruns to profile after the cold run")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds allowed per page run")
+    args = parser.parse_args()
+
+    for page in args.pages or PAGES:
+        print(f"[Profile] {page}")
+        profile_page(page, warm_runs=args.warm_runs, timeout=args.timeout)
@@ -0,0 +1,124 @@
+# scripts/run_daemon.py
+#
+# Resident ingestion: one long-running process instead of a cold run per cron
+# tick. The spaCy pipeline, the DB engine, the HTTP session, the co-occurrence
+# graph and the related-articles index are loaded once; fetch and process run
+# as concurrent jobs (see digester/scheduler.py), each cycle recorded by
+# utils.metrics like the one-shot scripts.
+#
+#   python scripts/run_daemon.py                         # real feeds, until Ctrl-C / SIGTERM
+#   python scripts/run_daemon.py --stand-in /tmp/site    # local stand-in feeds (benchmarks/feed_server.py)
+#   python scripts/run_daemon.py --check                 # exit 1 unless a healthy daemon is running
+import argparse
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data.db.article_model import get_session
+from digester import entity_extractor
+from digester.cooccurrence import load_graph
+from digester.related import load_index as load_related_index
+from digester.entity_extractor import RULER_ONLY
+from digester.gazetteer import GAZETTEER_PATH
+from digester.scheduler import DaemonLocked, IngestDaemon, Job, STATUS_PATH, check_status
+from scripts.process_articles import process_unprocessed_articles
+from scripts.run_fetcher import load_sources, run_fetch
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def build_daemon(args, sources_fn):
+    mode = RULER_ONLY if args.ruler_only else None
+    validators = {}  # feed url → ETag / Last-Modified, kept across cycles
+    gazetteer = {"mtime": _mtime(GAZETTEER_PATH)}
+    resident = {}  # co-occurrence graph + related index, synced and saved by each process cycle
+
+    def warm_indexes():
+        resident["graph"] = load_graph()
+        resident["related"] = load_related_index()
+
+    def warm_nlp():
+        entity_extractor.get_nlp(mode)("warm-up")
+
+    def fetch():
+        return run_fetch(sources_fn(), limit=args.limit, delay=args.delay, fulltext=(not args.no_fulltext),
+                         validators=validators)
+
+    def process():
+        # a rebuilt gazetteer (scripts/build_gazetteer.py) is baked into the pipeline → reload it
+        mtime = _mtime(GAZETTEER_PATH)
+        if mtime != gazetteer["mtime"]:
+            print("[Daemon] Gazetteer changed; reloading the spaCy pipeline")
+            entity_extractor.reload_pipelines()
+            gazetteer["mtime"] = mtime
+        return process_unprocessed_articles(batch_limit=args.batch_limit, mode=mode,
+                                            graph=resident["graph"], related=resident["related"])
+
+    return IngestDaemon(
+        jobs=[
+            # new articles wake the process job instead of waiting for its next tick
+            Job("run_fetcher", fetch, args.fetch_every, then="process_articles"),
+            Job("process_articles", process, args.process_every),
+        ],
+        warmups=[("database", lambda: get_session().close()), ("spacy", warm_nlp), ("indexes", warm_indexes)],
+        status_path=args.status,
+        tick_s=args.tick,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Long-running fetch + process daemon.")
+    parser.add_argument("--sources", default="config/sources.yaml", help="Path to YAML sources (re-read every cycle)")
+    parser.add_argument("--fetch-every", type=int, default=1800, help="Seconds between fetch cycles")
+    parser.add_argument("--process-every", type=int, default=600, help="Seconds between process cycles")
+    parser.add_argument("--limit", type=int, default=None, help="Limit entries per feed")
+    parser.add_argument("--delay", type=float, default=1.5, help="Delay between article fetches (sec)")
+    parser.add_argument("--no-fulltext", action="store_true", help="Disable full-text scraping")
+    parser.add_argument("--batch-limit", type=int, default=500, help="Max articles per process cycle")
+    parser.add_argument("--ruler-only", action="store_true", help="Skip statistical NER")
+    parser.add_argument("--once", action="store_true", help="Warm up, run one fetch + process cycle, exit")
+    parser.add_argument("--status", default=STATUS_PATH, help="Health/status JSON file")
+    parser.add_argument("--tick", type=float, default=5.0, help="Scheduler / heartbeat interval (sec)")
+    parser.add_argument("--check", action="store_true", help="Check the status file and exit 0 (healthy) or 1")
+    parser.add_argument("--max-age", type=float, default=120, help="--check: max heartbeat age (sec)")
+    parser.add_argument("--stand-in", metavar="DIR",
+                        help="Serve DIR with benchmarks/feed_server.py (synthetic site written if empty) "
+                             "and fetch from it instead of --sources")
+    parser.add_argument("--stand-in-latency", type=float, default=0.0, help="Seconds added to stand-in responses")
+    args = parser.parse_args()
+
+    if args.check:
+        ok, message = check_status(args.status, args.max_age)
+        print(f"[Daemon] {'OK' if ok else 'UNHEALTHY'}: {message}")
+        sys.exit(0 if ok else 1)
+
+    server = None
+    if args.stand_in:
+        from benchmarks.corpus import write_site
+        from benchmarks.feed_server import FeedServer
+
+        if not os.path.isdir(os.path.join(args.stand_in, "feeds")):
+            write_site(args.stand_in)
+        server = FeedServer(args.stand_in, latency=args.stand_in_latency).start()
+        print(f"[Daemon] Stand-in feeds on {server.url}")
+        sources_fn = server.sources
+    else:
+        sources_fn = lambda: load_sources(args.sources)  # noqa: E731
+
+    daemon = build_daemon(args, sources_fn)
+    try:
+        if args.once:
+            sys.exit(0 if daemon.run_once() else 1)
+        daemon.run()
+    except DaemonLocked as ex:
+        print(f"[Daemon] {ex}")
+        sys.exit(1)
+    finally:
+        if server is not None:
+            server.stop()
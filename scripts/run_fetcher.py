@@ -17,48 +17,84 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 
 from data.db.article_model import get_session, Article
+from data.db.versions import bump_version, ARTICLES
+from digester import dedupe, relevance
+from utils import metrics, profiling
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (compatible; OpticsNewsDigester/1.0; +https://example.com/bot)"
 }
 
+# one pooled session per process: a resident daemon reuses keep-alive connections across cycles
+HTTP = requests.Session()
+HTTP.headers.update(HEADERS)
+
 def load_sources(yaml_path="config/sources.yaml"):
     with open(yaml_path, "r") as f:
         data = yaml.safe_load(f)
     return data.get("rss_feeds", [])
 
-def fetch_full_text(url, timeout=15):
+def fetch_full_text(url, timeout=15, feed=None):
     """
     Try newspaper3k first; if that fails, fallback to readability.
     Return plain text; raise on hard failures.
     """
-    # Try newspaper3k
-    try:
-        art = NPArticle(url)
-        art.download()
-        art.parse()
-        text = (art.text or "").strip()
-        if text:
-            return text
-    except Exception:
-        pass
-
-    # Fallback: requests + readability
-    resp = requests.get(url, headers=HEADERS, timeout=timeout)
-    resp.raise_for_status()
-    doc = Document(resp.text)
-    html = doc.summary(html_partial=True)
-    # Strip to text
-    soup = BeautifulSoup(html, "html5lib")
-    text = soup.get_text(separator="\n").strip()
-    return text
-
-def fetch_feed(feed):
+    with metrics.stage("scrape", feed=feed) as m:
+        # Try newspaper3k
+        try:
+            art = NPArticle(url)
+            art.download()
+            art.parse()
+            text = (art.text or "").strip()
+            if text:
+                m.update(method="newspaper", bytes=len(art.html or ""), chars=len(text))
+                return text
+        except Exception:
+            pass
+
+        # Fallback: requests + readability
+        resp = HTTP.get(url, timeout=timeout)
+        resp.raise_for_status()
+        doc = Document(resp.text)
+        html = doc.summary(html_partial=True)
+        # Strip to text
+        soup = BeautifulSoup(html, "html5lib")
+        text = soup.get_text(separator="\n").strip()
+        m.update(method="readability", bytes=len(resp.content), chars=len(text))
+        return text
+
+def fetch_feed(feed, timeout=20, validators=None):
+    """
+    Download and parse one feed. `validators` (url → {"etag", "modified"}),
+    kept across calls by long-running callers, turns this into a conditional
+    GET: an unchanged feed answers 304 and yields no entries.
+    """
     name = feed.get("name", "Unnamed")
     url = feed["url"]
     print(f"[RSS] Fetching from: {name} → {url}")
-    parsed = feedparser.parse(url)
-    entries = parsed.entries or []
+    headers = {}
+    seen = validators.get(url, {}) if validators is not None else {}
+    if seen.get("etag"):
+        headers["If-None-Match"] = seen["etag"]
+    if seen.get("modified"):
+        headers["If-Modified-Since"] = seen["modified"]
+    # download and parse separately so request latency and parse time are measured apart
+    try:
+        with metrics.stage("feed_request", feed=name) as m:
+            resp = HTTP.get(url, headers=headers, timeout=timeout)
+            m.update(status=str(resp.status_code), bytes=len(resp.content))
+    except Exception as ex:
+        print(f"[Warn] Feed request failed for {name}: {ex}")
+        return []
+    if resp.status_code == 304:
+        print(f"[RSS] {name} unchanged since last fetch.")
+        return []
+    if validators is not None and resp.ok:
+        validators[url] = {"etag": resp.headers.get("ETag"), "modified": resp.headers.get("Last-Modified")}
+    with metrics.stage("feed_parse", feed=name) as m:
+        parsed = feedparser.parse(resp.content, response_headers=dict(resp.headers))
+        entries = parsed.entries or []
+        m["entries"] = len(entries)
     print(f"[RSS] Found {len(entries)} entries.")
     return entries
 
@@ -69,14 +105,29 @@ def safe_get(obj, *keys, default=""):
             return v
     return default
 
-def run_fetch(sources, limit=None, delay=1.0, fulltext=True):
+def run_fetch(sources, limit=None, delay=1.0, fulltext=True, relevance_threshold=None, relevance_filter=True,
+              validators=None):
+    """Fetch every feed in `sources` and store new entries; returns the number inserted."""
     session = get_session()
+    title_index = dedupe.load_index(session, dedupe.TITLE)
+    model = relevance.load_model(threshold=relevance_threshold) if relevance_filter else None
     total_new = 0
+    total_dupes = 0
+    total_deferred = 0
     for feed in sources:
-        entries = fetch_feed(feed)
+        feed_name = feed.get("name", "Unnamed")
+        entries = fetch_feed(feed, validators=validators)
         if limit:
             entries = entries[:limit]
-        for e in entries:
+        feed_t0 = time.perf_counter()
+        # one batched scoring pass per feed
+        with metrics.stage("relevance", feed=feed_name, entries=len(entries)):
+            scores = model.score([
+                relevance.entry_text(safe_get(e, "title"), safe_get(e, "summary", "description"))
+                for e in entries
+            ]) if model else None
+        feed_new = feed_dupes = feed_deferred = 0
+        for i, e in enumerate(entries):
             link = safe_get(e, "link")
             if not link:
                 continue
@@ -89,10 +140,20 @@ def run_fetch(sources, limit=None, delay=1.0, fulltext=True):
             published = safe_get(e, "published", "updated", "pubDate")
             source = feed.get("name", urlparse(link).netloc)
 
+            # near-duplicate of an article we already have → link it, skip scraping
+            with metrics.stage("title_dedupe", feed=feed_name):
+                sig = dedupe.minhash(f"{title} {summary}")
+                match = title_index.query(sig) if sig is not None else None
+            canonical_id = match[0] if match else None
+
+            # off-topic → store the entry but defer scraping and NER
+            score = float(scores[i]) if scores is not None else None
+            deferred = score is not None and score < model.threshold
+
             content = None
-            if fulltext and link.startswith("http"):
+            if fulltext and link.startswith("http") and canonical_id is None and not deferred:
                 try:
-                    content = fetch_full_text(link)
+                    content = fetch_full_text(link, feed=feed_name)
                 except Exception as ex:
                     print(f"[Warn] Full-text failed for {link}: {ex}")
                     content = None
@@ -106,13 +167,42 @@ def run_fetch(sources, limit=None, delay=1.0, fulltext=True):
                 source=source,
                 tags="",  # will be filled by processing step
                 fetched_at=datetime.utcnow(),
+                canonical_id=canonical_id,
+                relevance=score,
+                deferred=deferred,
             )
-            session.add(art)
-            session.commit()
+            with metrics.stage("db_write", feed=feed_name, rows=1):
+                session.add(art)
+                # deferred entries are never scraped or NER'd, so they must not become
+                # the canonical article for later on-topic copies
+                if canonical_id is None and sig is not None and not deferred:
+                    session.flush()  # assigns art.id
+                    dedupe.remember(session, title_index, dedupe.TITLE, art.id, sig)
+                session.commit()
             total_new += 1
+            feed_new += 1
 
+            if canonical_id is not None:
+                total_dupes += 1
+                feed_dupes += 1
+                print(f"[Dedupe] {link} ≈ article {canonical_id} (J≈{match[1]:.2f})")
+                continue
+            if deferred:
+                total_deferred += 1
+                feed_deferred += 1
+                print(f"[Relevance] Deferred {link} (score {score:.2f})")
+                continue
             time.sleep(delay)  # be polite to sites
-    print(f"[Fetch] Inserted {total_new} new articles.")
+
+        if feed_new:
+            bump_version(session, ARTICLES)
+            session.commit()
+        metrics.record("feed_entries", time.perf_counter() - feed_t0, feed=feed_name,
+                       entries=len(entries), new=feed_new, duplicates=feed_dupes, deferred=feed_deferred)
+    print(f"[Fetch] Inserted {total_new} new articles "
+          f"({total_dupes} near-duplicates linked, {total_deferred} deferred as off-topic).")
+    session.close()
+    return total_new
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Fetch RSS and (optionally) full text.")
@@ -120,7 +210,14 @@ if __name__ == "__main__":
     parser.add_argument("--limit", type=int, default=None, help="Limit entries per feed")
     parser.add_argument("--no-fulltext", action="store_true", help="Disable full-text scraping")
     parser.add_argument("--delay", type=float, default=1.0, help="Delay between article fetches (sec)")
+    parser.add_argument("--relevance-threshold", type=float, default=None,
+                        help="Defer scraping/NER below this relevance score (default: RELEVANCE_THRESHOLD)")
+    parser.add_argument("--no-relevance-filter", action="store_true", help="Scrape every entry")
+    profiling.add_profile_argument(parser)
     args = parser.parse_args()
 
     sources = load_sources(args.sources)
-    run_fetch(sources, limit=args.limit, delay=args.delay, fulltext=(not args.no_fulltext))
+    with profiling.profiled("run_fetcher", profiling.profiling_enabled(args.profile)), \
+            metrics.pipeline_run("run_fetcher"):
+        run_fetch(sources, limit=args.limit, delay=args.delay, fulltext=(not args.no_fulltext),
+                  relevance_threshold=args.relevance_threshold, relevance_filter=(not args.no_relevance_filter))
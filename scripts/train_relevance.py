@@ -0,0 +1,68 @@
+# scripts/train_relevance.py
+import argparse
+import sys, os
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import numpy as np
+from sklearn.metrics import precision_score, recall_score
+from sklearn.model_selection import train_test_split
+
+from data.db.article_model import get_session
+from digester import relevance
+
+def _scores_line(name, labels, pred):
+    if not len(labels):
+        return f"[Relevance]   {name}: none held out"
+    return (f"[Relevance]   {name}: {len(labels)} articles ({int(labels.sum())} relevant)  "
+            f"precision={precision_score(labels, pred, zero_division=0):.3f}  "
+            f"recall={recall_score(labels, pred, zero_division=0):.3f}")
+
+def report(model, texts, labels, lengths, human, threshold):
+    t0 = time.perf_counter()
+    scores = model.score(texts)
+    per_entry_us = (time.perf_counter() - t0) / max(len(texts), 1) * 1e6
+    pred = (scores >= threshold).astype(int)
+
+    skipped = pred == 0
+    by_human = human >= 0
+    print(f"[Relevance] Held-out articles: {len(labels)} ({int(labels.sum())} relevant), threshold={threshold:.2f}")
+    # tag labels come from a keyword match over the same title + summary, so
+    # their scores overstate generalisation; human labels are the honest number
+    print(_scores_line("human labels (spans / corrections)", labels[by_human], pred[by_human]))
+    print(_scores_line("keyword-tag labels (partly circular)", labels[~by_human], pred[~by_human]))
+    print(f"[Relevance] Would skip scraping + NER for {skipped.sum()} / {len(pred)} entries "
+          f"({skipped.mean():.1%}), {lengths[skipped].sum():,} of {lengths.sum():,} content chars; "
+          f"relevant entries lost: {int((skipped & (labels == 1)).sum())}")
+    print(f"[Relevance] Scoring cost: {per_entry_us:.1f} µs/entry (batched)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the title+summary relevance pre-filter.")
+    parser.add_argument("--out", default=relevance.MODEL_PATH, help="Output .npz path")
+    parser.add_argument("--threshold", type=float, default=relevance.DEFAULT_THRESHOLD,
+                        help="Score below which entries are deferred (used for the report)")
+    parser.add_argument("--test-size", type=float, default=0.25, help="Held-out fraction for the report")
+    args = parser.parse_args()
+
+    session = get_session()
+    texts, labels, lengths, human = relevance.training_data(session)
+    session.close()
+
+    if len(set(labels.tolist())) < 2:
+        print("[Relevance] Need both relevant and off-topic processed articles to train.")
+        return
+
+    idx_train, idx_test = train_test_split(
+        np.arange(len(labels)), test_size=args.test_size, stratify=labels, random_state=0
+    )
+    held_out = relevance.train([texts[i] for i in idx_train], labels[idx_train])
+    report(held_out, [texts[i] for i in idx_test], labels[idx_test], lengths[idx_test], human[idx_test],
+           args.threshold)
+
+    # Final model uses every labelled article
+    model = relevance.train(texts, labels)
+    model.save(args.out)
+    print(f"[Relevance] Saved model trained on {len(labels)} articles to {args.out}")
+
+if __name__ == "__main__":
+    main()
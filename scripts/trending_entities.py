@@ -0,0 +1,32 @@
+# scripts/trending_entities.py
+import argparse
+import sys, os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from data.db.article_model import get_session
+from digester import trends
+
+def main():
+    parser = argparse.ArgumentParser(description="List entities whose mentions are bursting.")
+    parser.add_argument("--window", type=int, default=trends.DEFAULT_WINDOW, help="Recent window (days)")
+    parser.add_argument("--baseline", type=int, default=trends.DEFAULT_BASELINE, help="Baseline before the window (days)")
+    parser.add_argument("--end", default=None, help="Last day of the window (YYYY-MM-DD, default: today)")
+    parser.add_argument("--top", type=int, default=20, help="How many entities to list")
+    parser.add_argument("--min-recent", type=int, default=3, help="Minimum articles in the recent window")
+    parser.add_argument("--label", action="append", help="Restrict to a label (repeatable), e.g. COMPANY")
+    args = parser.parse_args()
+
+    session = get_session()
+    matrix = trends.build_matrix(session, days=args.window + args.baseline, end=args.end)
+    session.close()
+
+    top = trends.emerging_entities(matrix, args.window, args.baseline, args.top, args.min_recent, args.label)
+    print(f"\nTop {args.top} emerging entities — last {args.window} days vs previous {args.baseline} "
+          f"(ending {matrix.days[-1]:%Y-%m-%d}, {len(matrix)} entities scored):\n")
+    if top.empty:
+        print("(none)")
+    else:
+        print(top.to_string(index=False))
+
+if __name__ == "__main__":
+    main()
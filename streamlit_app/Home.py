@@ -26,7 +26,9 @@ for _k in _SECRET_KEYS:
         os.environ[_k] = st.secrets[_k]
 
 # ── page ─────────────────────────────────────────────────────────────────────
-from data.db.article_model import get_session, Article, ArticleEntity
+from data.db.article_model import get_session
+from data.db.queries import corpus_stats
+from data.db.versions import current_data_version, ARTICLES, ENTITIES
 
 st.set_page_config(
     page_title="Optics & Photonics Dashboard",
@@ -40,17 +42,22 @@ st.caption("Named-entity tracking across optics, photonics, and LiDAR news sourc
 st.divider()
 
 # ── quick stats ──────────────────────────────────────────────────────────────
-try:
+# `version` only keys the cache: it changes whenever articles or entities are written.
+@st.cache_data(max_entries=2)
+def load_stats(version):
     session = get_session()
-    n_articles = session.query(Article).count()
-    n_entities = session.query(ArticleEntity).count()
-    n_sources  = session.query(Article.source).distinct().count()
+    try:
+        return corpus_stats(session)
+    finally:
+        session.close()
+
+try:
+    stats = load_stats(current_data_version(ARTICLES, ENTITIES))
 
     col1, col2, col3 = st.columns(3)
-    col1.metric("Articles ingested", f"{n_articles:,}")
-    col2.metric("Entity mentions", f"{n_entities:,}")
-    col3.metric("News sources", n_sources)
-    session.close()
+    col1.metric("Articles ingested", f"{stats['articles']:,}")
+    col2.metric("Entity mentions", f"{stats['entities']:,}")
+    col3.metric("News sources", stats["sources"])
 except Exception as e:
     st.warning(f"Could not connect to the database: {e}")
 
@@ -62,8 +69,11 @@ st.markdown("""
 | Page | What it does |
 |------|-------------|
 | **Entity Dashboard** | Bar charts of the most-mentioned organisations, people, and labs |
+| **Trending Entities** | Companies, labs and people suddenly mentioned more than usual |
+| **Entity Network** | Who appears together with whom (top neighbours, label-to-label pairs) |
 | **Label Correction** | Review and correct the spaCy-predicted entity taxonomy labels |
 | **Span Annotator** | Create character-level ground-truth spans for model training |
+| **Pipeline Health** | Per-stage timings of fetch / process runs: feeds, scraping, NER, database |
 
 Use the sidebar to navigate between pages.
 """)
@@ -10,9 +10,12 @@ sys.path.insert(0, str(ROOT))
 import re
 import pandas as pd
 import streamlit as st
-from sqlalchemy.orm import joinedload
 
-from data.db.article_model import get_session, ArticleEntity, Article
+from data.db.article_model import get_session
+from data.db.frames import entity_review_frame, article_texts
+from data.db.versions import current_data_version, ARTICLES, ENTITIES
+from streamlit_app.related_panel import render_related
+from data.db.label_edits import save_label_changes, relabel_by_name, undo_batch, recent_batches
 
 CUSTOM_TYPES = [
     "PERSON", "COMPANY", "UNIVERSITY", "RESEARCH_GROUP", "GOV_LAB",
@@ -22,7 +25,29 @@ CUSTOM_TYPES = [
 st.set_page_config(page_title="Entity Label Correction", layout="wide")
 st.title("🧠 Named Entity Label Correction Tool")
 
+# Bumping the version gives the data editor a fresh key, so it re-reads the
+# reloaded labels instead of replaying edits that are already saved.
+if "editor_version" not in st.session_state:
+    st.session_state.editor_version = 0
+
+flash = st.session_state.pop("flash", None)
+if flash:
+    st.success(flash)
+
+def reload_after_write(message: str):
+    # the write bumped the data version, so load_entities misses on the rerun
+    st.session_state.editor_version += 1
+    st.session_state.flash = message
+    st.rerun()
+
+def highlight_context(ctx: str, context_start: int, start_char: int, end_char: int) -> str:
+    """Render the stored context window with the exact mention spaCy found in bold."""
+    s = int(start_char - context_start)
+    e = int(end_char - context_start)
+    return f"{ctx[:s]}**🟡{ctx[s:e]}**{ctx[e:]}"
+
 def extract_context(entity_text: str, full_text: str, window_chars: int = 200) -> str:
+    """Fallback for mentions processed before offsets were stored."""
     if not full_text:
         return "No text available."
     pattern = re.compile(re.escape(entity_text), flags=re.IGNORECASE)
@@ -35,36 +60,32 @@ def extract_context(entity_text: str, full_text: str, window_chars: int = 200) -
     highlighted = pattern.sub(lambda _: f"**🟡{entity_text}**", snippet)
     return highlighted
 
-@st.cache_data
-def load_pairs():
+@st.cache_data(max_entries=2)
+def load_entities(version):
     session = get_session()
-    results = (
-        session.query(ArticleEntity, Article)
-        .join(Article)
-        .options(joinedload(ArticleEntity.article))
-        .all()
-    )
-    return results
-
-pairs = load_pairs()
-
-rows = []
-for ent, art in pairs:
-    base_text = (getattr(art, "content", None) or art.summary or "")
-    full_text = f"{(art.title or '').strip()}\n{base_text.strip()}"
-    rows.append({
-        "Entity ID": ent.id,
-        "Entity Name": ent.name,
-        "Raw (spaCy)": ent.raw_label or ent.type or "",
-        "Custom Label": ent.custom_label or "",
-        "Entity Context": extract_context(ent.name, full_text),
-        "Title": art.title,
-        "Source": art.source,
-        "Link": art.link,
-        "Published": art.published,
-    })
-
-df = pd.DataFrame(rows)
+    try:
+        frame = entity_review_frame(session)
+        has_offsets = frame["context"].notna() & frame["start_char"].notna()
+        # article text is only fetched for mentions stored before offsets were
+        texts = article_texts(session, frame.loc[~has_offsets, "article_id"].unique().tolist())
+    finally:
+        session.close()
+
+    frame["context"] = [
+        highlight_context(ctx, cs, s, e) if offsets else extract_context(name, texts.get(aid, ""))
+        for offsets, ctx, cs, s, e, name, aid in zip(
+            has_offsets, frame["context"], frame["context_start"], frame["start_char"], frame["end_char"],
+            frame["name"], frame["article_id"].tolist(),
+        )
+    ]
+    return frame.rename(columns={
+        "entity_id": "Entity ID", "name": "Entity Name", "raw_label": "Raw (spaCy)",
+        "custom_label": "Custom Label", "context": "Entity Context", "title": "Title",
+        "article_id": "Article ID", "source": "Source", "link": "Link", "published": "Published",
+    })[["Entity ID", "Entity Name", "Raw (spaCy)", "Custom Label", "Entity Context",
+        "Title", "Article ID", "Source", "Link", "Published"]]
+
+df = load_entities(current_data_version(ARTICLES, ENTITIES))
 if df.empty:
     st.warning("⚠️ No entities found. Fetch & process articles, then reload.")
     st.stop()
@@ -79,23 +100,23 @@ raw_sel = st.sidebar.multiselect("Filter by Raw (spaCy)", options=raw_opts, defa
 custom_opts = sorted([x for x in df["Custom Label"].dropna().unique().tolist() if x] or CUSTOM_TYPES)
 custom_sel = st.sidebar.multiselect("Filter by Custom Label", options=custom_opts, default=custom_opts)
 
-text_filter = st.sidebar.text_input("Search (entity/title/source)")
+text_filter = st.sidebar.text_input("Search (entity/title/source)", key="text_filter")
 
-mask = pd.Series([True] * len(df))
+mask = pd.Series(True, index=df.index)
 if raw_sel:
     mask &= df["Raw (spaCy)"].isin(raw_sel)
 if custom_sel:
-    mask &= df["Custom Label"].replace("", "OTHER").isin(custom_sel)  # treat empty as OTHER for filtering
+    labels = df["Custom Label"]
+    mask &= labels.isin(custom_sel) | ((labels == "") & ("OTHER" in custom_sel))  # treat empty as OTHER for filtering
 if text_filter:
-    t = text_filter.lower()
-    mask &= df.apply(
-        lambda r: t in (r.get("Entity Name", "") or "").lower()
-               or t in (r.get("Title", "") or "").lower()
-               or t in (r.get("Source", "") or "").lower(),
-        axis=1
-    )
+    hit = pd.Series(False, index=df.index)
+    for col in ("Entity Name", "Title", "Source"):
+        hit |= df[col].str.contains(text_filter, case=False, regex=False, na=False)
+    mask &= hit
 
 df_view = df[mask].copy()
+# the editor writes arbitrary CUSTOM_TYPES into this column, so it can't stay categorical
+df_view["Custom Label"] = df_view["Custom Label"].astype(object)
 
 edited = st.data_editor(
     df_view,
@@ -107,9 +128,9 @@ edited = st.data_editor(
     },
     disabled=[
         "Entity ID", "Entity Name", "Raw (spaCy)",
-        "Entity Context", "Title", "Source", "Link", "Published"
+        "Entity Context", "Title", "Article ID", "Source", "Link", "Published"
     ],
-    key="entity_editor"
+    key=f"entity_editor_{st.session_state.editor_version}"
 )
 
 col1, col2 = st.columns(2)
@@ -122,18 +143,68 @@ with col1:
 
 with col2:
     if st.button("🗄️ Save Custom Labels to DB"):
+        # Only rows whose label differs from what was loaded are sent
+        before = df_view["Custom Label"].fillna("")
+        after = edited["Custom Label"].fillna("")
+        changed = edited.loc[before != after, ["Entity ID", "Custom Label"]]
+        changes = {int(eid): (label or None) for eid, label in changed.itertuples(index=False)}
+        if not changes:
+            st.info("No label changes to save.")
+        else:
+            session = get_session()
+            _, updated = save_label_changes(session, changes, action=f"edit {len(changes)} rows")
+            session.close()
+            reload_after_write(f"Updated {updated} rows in the database.")
+
+st.markdown("### 🏷️ Relabel all mentions of a name")
+names = df["Entity Name"].str.strip().fillna("")
+rcol1, rcol2, rcol3 = st.columns([3, 2, 2])
+with rcol1:
+    relabel_name = st.selectbox("Entity name", options=sorted(n for n in names.unique() if n))
+with rcol2:
+    relabel_to = st.selectbox("New custom label", options=CUSTOM_TYPES)
+with rcol3:
+    n_mentions = int((names == relabel_name).sum())
+    st.caption(f"{n_mentions} loaded mention(s) of this name.")
+    if st.button("Apply label to all mentions"):
         session = get_session()
-        updated = 0
-        for _, row in edited.iterrows():
-            eid = row["Entity ID"]
-            new_label = row["Custom Label"] or None
-            ent = session.query(ArticleEntity).get(eid)
-            if ent and ent.custom_label != new_label:
-                ent.custom_label = new_label
-                session.add(ent)
-                updated += 1
-        session.commit()
-        st.success(f"Updated {updated} rows in the database.")
+        _, updated = relabel_by_name(session, relabel_name, relabel_to)
+        session.close()
+        reload_after_write(f"Relabelled {updated} mention(s) of '{relabel_name}' as {relabel_to}.")
+
+with st.expander("↩️ Undo recent label changes"):
+    session = get_session()
+    batches = recent_batches(session)
+    session.close()
+    if not batches:
+        st.caption("No logged label changes yet.")
+    for batch_id, action, n_rows, created_at in batches:
+        bcol1, bcol2 = st.columns([5, 1])
+        bcol1.markdown(f"**{action}** — {n_rows} row(s) @ {created_at:%Y-%m-%d %H:%M}")
+        if bcol2.button("Undo", key=f"undo_{batch_id}"):
+            session = get_session()
+            restored, skipped = undo_batch(session, batch_id)
+            session.close()
+            reload_after_write(
+                f"Restored {restored} label(s)."
+                + (f" {skipped} label(s) were changed again by a later batch and were kept;"
+                   " undo that batch first to restore them." if skipped else "")
+            )
+
+def show_article(_related_id, title):
+    # narrow the table to the picked article via the search box
+    st.session_state.text_filter = title or ""
+
+with st.expander("🔗 Related coverage"):
+    titles = edited[["Article ID", "Title"]].drop_duplicates("Article ID")
+    if titles.empty:
+        st.caption("No rows in view.")
+    else:
+        picked = st.selectbox(
+            "Article", titles["Article ID"].tolist(),
+            format_func=dict(zip(titles["Article ID"], titles["Title"])).get,
+        )
+        render_related(int(picked), on_pick=show_article)
 
 st.markdown("### 🔍 Entity Context Viewer")
 for _, row in edited.iterrows():
@@ -1,60 +1,109 @@
 import streamlit as st
-from collections import Counter
 import pandas as pd
 import sys
 import os
+from datetime import timedelta
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
 
-from data.db.article_model import get_session, ArticleEntity, Article
+from data.db.article_model import get_session
+from data.db.versions import current_data_version, ARTICLES, ENTITIES, LABELS
+from data.db.queries import distinct_entity_types, distinct_sources, categorization_status
+from data.db.frames import entity_counts_frame, entity_mentions_frame, tag_counts_frame
+from digester.categorizer import KEYWORDS
 
 st.set_page_config(page_title="Optics & Photonics Entity Dashboard", layout="wide")
 st.title("Named Entity Frequency in Optics & Photonics News")
 
-# Sidebar filters
-st.sidebar.title("Filters")
-top_n = st.sidebar.slider("Top N entities", min_value=5, max_value=50, value=20)
+
+# `version` only keys the cache: it changes whenever articles or entities are written.
+@st.cache_data(max_entries=4)
+def load_filter_options(version):
+    session = get_session()
+    try:
+        return distinct_entity_types(session), distinct_sources(session)
+    finally:
+        session.close()
 
 
-@st.cache_data
-def load_entity_data():
+# Cached per data version and filter combination; all aggregation happens in SQL.
+@st.cache_data(max_entries=64)
+def load_entity_data(version, types, sources, tag, since, until, limit):
     session = get_session()
-    entities = session.query(ArticleEntity).all()
-    return [(e.name.strip(), e.type) for e in entities]
+    try:
+        return entity_counts_frame(session, types, sources, tag, since, until, limit)
+    finally:
+        session.close()
 
 
-data = load_entity_data()
+@st.cache_data(max_entries=16)
+def load_tag_counts(version, sources, since, until):
+    session = get_session()
+    try:
+        return tag_counts_frame(session, sources, since, until), categorization_status(session, sources, since, until)
+    finally:
+        session.close()
+
+
+@st.cache_data(max_entries=64)
+def load_audit_data(version, types, sources, tag, since, until, limit):
+    session = get_session()
+    try:
+        return entity_mentions_frame(session, types, sources, tag, since, until, limit)
+    finally:
+        session.close()
+
 
-# Frequency aggregation
-counter = Counter(data)
-df = pd.DataFrame(counter.items(), columns=["Entity", "Count"])
-df[["Name", "Type"]] = pd.DataFrame(df["Entity"].tolist(), index=df.index)
-df = df[["Name", "Type", "Count"]].sort_values("Count", ascending=False)
+version = current_data_version(ARTICLES, ENTITIES, LABELS)
+entity_types, all_sources = load_filter_options(version)
 
-# Filter by type
-entity_types = sorted(df["Type"].unique())
+# Sidebar filters
+st.sidebar.title("Filters")
+top_n = st.sidebar.slider("Top N entities", min_value=5, max_value=50, value=20)
 selected_types = st.sidebar.multiselect("Entity Types", entity_types, default=entity_types)
-filtered_df = df[df["Type"].isin(selected_types)]
+selected_sources = st.sidebar.multiselect("Sources", all_sources, default=[])
+date_range = st.sidebar.date_input("Fetched between", value=())
+table_rows = st.sidebar.number_input("Table rows", min_value=top_n, max_value=5000, value=max(200, top_n), step=50)
+
+# Normalise widget values into hashable, order-independent cache keys
+types_key = tuple(sorted(selected_types)) if len(selected_types) < len(entity_types) else None
+sources_key = tuple(sorted(selected_sources)) or None
+since = until = None
+if len(date_range) == 2:
+    since = pd.Timestamp(date_range[0]).to_pydatetime()
+    until = pd.Timestamp(date_range[1] + timedelta(days=1)).to_pydatetime()
+
+# Tag options carry their article counts under the source/date filters above
+tags_df, tag_status = load_tag_counts(version, sources_key, since, until)
+tag_articles = dict(zip(tags_df["Tag"], tags_df["Articles"]))
+tag_options = list(tag_articles) + [t for t in KEYWORDS if t not in tag_articles]
+tag = st.sidebar.selectbox(
+    "Tag", ["(any)"] + tag_options, index=0,
+    format_func=lambda t: t if t == "(any)" else f"{t} ({tag_articles.get(t, 0):,})",
+)
+tag_key = None if tag == "(any)" else tag
+
+if not selected_types:
+    st.info("Select at least one entity type.")
+    st.stop()
+
+df = load_entity_data(version, types_key, sources_key, tag_key, since, until, int(table_rows))
 
 # Chart
-st.bar_chart(filtered_df.head(top_n).set_index("Name")["Count"])
+st.bar_chart(df.head(top_n).set_index("Name")["Count"])
+
+with st.expander("🏷️ Articles per Tag"):
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Tagged", f"{tag_status['tagged']:,}")
+    col2.metric("No matching tag", f"{tag_status['untagged']:,}")
+    col3.metric("Not processed yet", f"{tag_status['unprocessed']:,}")
+    if not tags_df.empty:
+        st.bar_chart(tags_df.set_index("Tag")["Articles"])
 
 with st.expander("📋 Show Full Table"):
-    st.dataframe(filtered_df.reset_index(drop=True))
+    st.dataframe(df)
 
 with st.expander("🕵️ Audit Entities by Article"):
-    session = get_session()
-    joined = session.query(ArticleEntity, Article).join(Article).all()
-
-    audit_rows = []
-    for entity, article in joined:
-        audit_rows.append({
-            "Entity": entity.name,
-            "Type": entity.type,
-            "Article Title": article.title,
-            "Source": article.source,
-            "Published": article.published
-        })
-
-    audit_df = pd.DataFrame(audit_rows)
+    audit_df = load_audit_data(version, types_key, sources_key, tag_key, since, until, 1000)
+    st.caption("Most recent 1,000 mentions matching the filters.")
     st.dataframe(audit_df)
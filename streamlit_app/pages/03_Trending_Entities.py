@@ -0,0 +1,70 @@
+# streamlit_app/pages/03_Trending_Entities.py
+
+# --- bootstrap path ---
+import sys
+from pathlib import Path
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+# ----------------------
+
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from data.db.article_model import get_session
+from data.db.versions import current_data_version, ARTICLES, ENTITIES
+from digester import trends
+
+st.set_page_config(page_title="Trending Entities", layout="wide")
+st.title("📈 Trending & Emerging Entities")
+st.caption("Entities whose article count in the recent window is far above their own baseline rate.")
+
+@st.cache_data(max_entries=8)
+def load_matrix(version, days, end):
+    session = get_session()
+    try:
+        return trends.build_matrix(session, days=days, end=end)
+    finally:
+        session.close()
+
+st.sidebar.title("Settings")
+end = st.sidebar.date_input("Window ends on", value=date.today())
+window = st.sidebar.slider("Recent window (days)", min_value=1, max_value=30, value=trends.DEFAULT_WINDOW)
+baseline = st.sidebar.slider("Baseline (days before window)", min_value=7, max_value=180, value=trends.DEFAULT_BASELINE)
+min_recent = st.sidebar.number_input("Min. articles in window", min_value=1, max_value=100, value=3)
+top = st.sidebar.slider("Show top", min_value=5, max_value=100, value=25)
+
+matrix = load_matrix(current_data_version(ARTICLES, ENTITIES), window + baseline, end)
+if len(matrix) == 0:
+    st.warning("No entity mentions in this period. Pick another end date or fetch & process articles.")
+    st.stop()
+
+label_opts = sorted(set(matrix.labels.tolist()) - {""})
+labels = st.sidebar.multiselect("Labels", label_opts, default=[])
+
+emerging = trends.emerging_entities(matrix, window, baseline, top, min_recent, labels or None)
+st.caption(
+    f"{len(matrix):,} entities scored · {matrix.days[0]:%Y-%m-%d} → {matrix.days[-1]:%Y-%m-%d}"
+)
+
+if emerging.empty:
+    st.info("No entity reaches the minimum article count in the recent window.")
+    st.stop()
+
+st.dataframe(emerging, use_container_width=True, hide_index=True)
+
+st.markdown("### Daily article counts")
+default_pick = emerging["Name"].head(5).tolist()
+picked = st.multiselect("Entities", emerging["Name"].tolist(), default=default_pick)
+if picked:
+    mask = pd.Index(matrix.names).isin(picked)
+    if labels:
+        mask &= pd.Index(matrix.labels).isin(labels)
+    rows = mask.nonzero()[0]
+    series = pd.DataFrame(
+        matrix.counts[rows].T,
+        index=matrix.days,
+        columns=[f"{matrix.names[i]} ({matrix.labels[i]})" for i in rows],
+    )
+    st.line_chart(series)
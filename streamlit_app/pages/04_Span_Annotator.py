@@ -7,12 +7,17 @@ ROOT = Path(__file__).resolve().parents[2]
 sys.path.insert(0, str(ROOT))
 # ----------------------
 
+import os
 import re
+import threading
+import pandas as pd
 import streamlit as st
-from data.db.article_model import get_session, Article, ArticleSpanAnnotation
-from sqlalchemy.orm import joinedload
-from sqlalchemy import desc
-from html import escape
+from data.db.article_model import get_session, Article, ArticleEntity, ArticleSpanAnnotation
+from data.db.versions import bump_version, current_data_version, ARTICLES, ENTITIES, SPANS
+from digester.gazetteer import GAZETTEER_PATH
+from digester.span_suggestions import IntervalIndex, gazetteer_terms, highlight_spans, suggest_spans
+from streamlit_app.related_panel import render_related
+from sqlalchemy import delete, desc, func, insert, select
 
 # Customize your taxonomy here (these are span labels)
 SPAN_LABELS = [
@@ -23,86 +28,245 @@ SPAN_LABELS = [
 st.set_page_config(page_title="Span-level NER Annotator", layout="wide")
 st.title("✍️ Span-level Entity Annotator")
 
-@st.cache_data
-def list_article_ids():
-    s = get_session()
-    ids = [row[0] for row in s.query(Article.id).order_by(desc(Article.fetched_at), desc(Article.id)).all()]
-    return ids
+@st.cache_resource
+def _article_id_index():
+    # Shared across sessions; grown incrementally as new articles arrive.
+    return {"lock": threading.Lock(), "version": None, "max_id": 0, "ids": []}
+
+def list_article_ids(version):
+    """Newest-first article ids; only rows past the last seen id are fetched."""
+    idx = _article_id_index()
+    with idx["lock"]:
+        if idx["version"] != version:
+            s = get_session()
+            new_ids = [
+                row[0] for row in
+                s.query(Article.id)
+                .filter(Article.id > idx["max_id"])
+                .order_by(desc(Article.fetched_at), desc(Article.id))
+                .all()
+            ]
+            s.close()
+            if new_ids:
+                idx["ids"] = new_ids + idx["ids"]
+                idx["max_id"] = max(idx["max_id"], *new_ids)
+            idx["version"] = version
+        return idx["ids"]
+
+def forget_article_id(article_id):
+    """Drop an id whose article was deleted after the id list was built."""
+    idx = _article_id_index()
+    with idx["lock"]:
+        idx["ids"] = [i for i in idx["ids"] if i != article_id]
 
 def find_occurrences(text: str, needle: str):
     """Return list of (start, end) indices for case-insensitive non-overlapping matches."""
-    spans = []
     if not text or not needle:
-        return spans
-    pattern = re.compile(re.escape(needle), flags=re.IGNORECASE)
-    for m in pattern.finditer(text):
-        spans.append((m.start(), m.end()))
-    return spans
+        return []
+    # re caches compiled patterns, so repeated reruns with the same needle don't recompile
+    return [(m.start(), m.end()) for m in re.finditer(re.escape(needle), text, flags=re.IGNORECASE)]
+
+def _gazetteer_mtime():
+    try:
+        return os.path.getmtime(GAZETTEER_PATH)
+    except OSError:
+        return None
+
+@st.cache_data(max_entries=64)
+def load_article_view(article_id, version, gazetteer_mtime):
+    """
+    Article text, its annotations and pre-annotation suggestions, cached per
+    annotation version; None if the article no longer exists.
+    """
+    s = get_session()
+    try:
+        article = s.get(Article, article_id)
+        if article is None:
+            return None
+        text = article.content or article.summary or ""  # prefer full
+        annotations = [
+            {"id": a.id, "start": a.start_char, "end": a.end_char, "label": a.label,
+             "text": a.text, "annotator": a.annotator, "created_at": a.created_at}
+            for a in s.query(ArticleSpanAnnotation)
+            .filter_by(article_id=article_id)
+            .order_by(ArticleSpanAnnotation.start_char, ArticleSpanAnnotation.id)
+        ]
+        mentions = s.execute(
+            select(
+                ArticleEntity.name,
+                func.coalesce(ArticleEntity.custom_label, ArticleEntity.type),
+                ArticleEntity.start_char,
+                ArticleEntity.end_char,
+            ).where(ArticleEntity.article_id == article_id)
+        ).all()
+        view = {
+            "title": article.title, "source": article.source, "published": article.published,
+            "link": article.link, "text": text, "annotations": annotations,
+        }
+    finally:
+        s.close()
 
-def highlight_spans(text: str, highlights: list):
+    # ArticleEntity offsets index "title\ncontent" (see process_articles.article_text)
+    suggestions = suggest_spans(
+        text, mentions, gazetteer_terms(),
+        existing=[(a["start"], a["end"]) for a in annotations],
+        offset=len(view["title"] or "") + 1,
+    )
+    for sug in suggestions:
+        sug["label"] = sug["label"] if sug["label"] in SPAN_LABELS else "OTHER"
+    view["suggestions"] = suggestions
+    return view
+
+@st.cache_data(max_entries=64)
+def preview_html(article_id, version, gazetteer_mtime, rejected):
+    """Highlighted article HTML; annotations solid, pending suggestions outlined."""
+    view = load_article_view(article_id, version, gazetteer_mtime)
+    highlights = [
+        {"start": a["start"], "end": a["end"], "label": a["label"], "color": palette[i % len(palette)]}
+        for i, a in enumerate(view["annotations"])
+    ]
+    highlights += [
+        {"start": sug["start"], "end": sug["end"], "label": f"suggested: {sug['label']}",
+         "color": "transparent", "style": " outline:1px dashed #888;"}
+        for sug in view["suggestions"] if (sug["start"], sug["end"]) not in rejected
+    ]
+    html = highlight_spans(view["text"], highlights)
+    return (
+        "<div style='white-space:pre-wrap; font-family: ui-monospace, SFMono-Regular, Menlo, monospace;'>"
+        f"{html}</div>"
+    )
+
+def add_spans(article_id, spans, annotator):
     """
-    highlights: list of dicts with keys:
-       - start, end (char offsets, exclusive end)
-       - label (string)
-       - color (string HEX or name)
-    Returns HTML with <mark> wrappers for spans. Assumes non-overlapping.
+    Insert [(start, end, label, text), ...] in one statement. Spans overlapping
+    an annotation already in the database are skipped; returns (added, skipped).
     """
-    if not text:
-        return "<i>No text</i>"
-
-    # sort by start asc
-    highlights = sorted(highlights, key=lambda h: h["start"])
-    out = []
-    curr = 0
-    for h in highlights:
-        s, e = h["start"], h["end"]
-        color = h.get("color", "#ffd54f")
-        lab = h.get("label", "")
-        # add plain segment
-        if s > curr:
-            out.append(escape(text[curr:s]))
-        # add highlighted
-        span_html = f'<mark style="background:{color}; padding:0 2px; border-radius:3px;" title="{escape(lab)}">{escape(text[s:e])}</mark>'
-        out.append(span_html)
-        curr = e
-    # tail
-    if curr < len(text):
-        out.append(escape(text[curr:]))
-    return "".join(out)
+    s = get_session()
+    try:
+        stored = s.execute(
+            select(ArticleSpanAnnotation.start_char, ArticleSpanAnnotation.end_char)
+            .where(ArticleSpanAnnotation.article_id == article_id)
+        ).all()
+        taken = IntervalIndex(stored)
+        rows = [
+            {"article_id": article_id, "start_char": int(start), "end_char": int(end),
+             "label": label, "text": text, "annotator": annotator or "manual"}
+            for start, end, label, text in spans
+            if not taken.overlaps(start, end)
+        ]
+        if rows:
+            s.execute(insert(ArticleSpanAnnotation), rows)
+            bump_version(s, SPANS)
+            s.commit()
+        return len(rows), len(spans) - len(rows)
+    finally:
+        s.close()
+
+def delete_span(annotation_id):
+    s = get_session()
+    try:
+        s.execute(delete(ArticleSpanAnnotation).where(ArticleSpanAnnotation.id == annotation_id))
+        bump_version(s, SPANS)
+        s.commit()
+    finally:
+        s.close()
+
+def report_added(added, skipped, what):
+    if added:
+        st.session_state.flash = f"Added {added} {what}" + (f"; skipped {skipped} overlapping" if skipped else "")
+    else:
+        st.session_state.flash_error = "Span overlaps an existing annotation." if skipped else "Nothing to add."
+    st.rerun()
+
+palette = ["#ffeb3b", "#a5d6a7", "#90caf9", "#f48fb1", "#ffe082", "#b39ddb", "#80deea"]
 
 # Pick article
-article_ids = list_article_ids()
+article_ids = list_article_ids(current_data_version(ARTICLES))
 if not article_ids:
     st.warning("No articles found. Fetch & process first.")
     st.stop()
 
-idx = st.selectbox("Select article (newest first by fetched_at)", options=list(range(len(article_ids))), index=0)
+def open_article(related_id, _title):
+    # runs before the next rerun, so the selectbox picks up the new position
+    if related_id in article_ids:
+        st.session_state.article_idx = article_ids.index(related_id)
+
+idx = st.selectbox("Select article (newest first by fetched_at)", options=list(range(len(article_ids))), index=0, key="article_idx")
 article_id = article_ids[idx]
 
-s = get_session()
-article = s.query(Article).options(joinedload(Article.span_annotations)).get(article_id)
-full_text = (article.content or article.summary or "")  # prefer full
-st.subheader(article.title or "(untitled)")
-st.caption(f"{article.source} — {article.published}")
-if article.link:
-    st.markdown(f"[🔗 Open original]({article.link})")
+version = current_data_version(SPANS, ENTITIES)
+gazetteer_mtime = _gazetteer_mtime()
+view = load_article_view(article_id, version, gazetteer_mtime)
+if view is None:
+    # deleted since the id list was cached: drop it and show the next article
+    forget_article_id(article_id)
+    if idx >= len(article_ids) - 1:
+        del st.session_state["article_idx"]
+    st.rerun()
+full_text = view["text"]
+st.subheader(view["title"] or "(untitled)")
+st.caption(f"{view['source']} — {view['published']}")
+if view["link"]:
+    st.markdown(f"[🔗 Open original]({view['link']})")
+with st.expander("🔗 Related articles"):
+    render_related(article_id, on_pick=open_article)
 st.divider()
 
-# Show current annotations as highlights
-palette = ["#ffeb3b", "#a5d6a7", "#90caf9", "#f48fb1", "#ffe082", "#b39ddb", "#80deea"]
-existing = article.span_annotations or []
-existing_highlights = []
-for i, ann in enumerate(existing):
-    existing_highlights.append({
-        "start": ann.start_char,
-        "end": ann.end_char,
-        "label": f"{ann.label}",
-        "color": palette[i % len(palette)]
-    })
+if "flash" in st.session_state:
+    st.success(st.session_state.pop("flash"))
+if "flash_error" in st.session_state:
+    st.error(st.session_state.pop("flash_error"))
 
-html_preview = highlight_spans(full_text, existing_highlights)
-st.markdown("**Preview (existing spans highlighted):**", unsafe_allow_html=True)
-st.markdown(f"<div style='white-space:pre-wrap; font-family: ui-monospace, SFMono-Regular, Menlo, monospace;'>{html_preview}</div>", unsafe_allow_html=True)
+# Suggestions rejected in this session, per article; they stay hidden until the page reloads
+rejected = st.session_state.setdefault("rejected_suggestions", {}).setdefault(article_id, set())
+pending = [sug for sug in view["suggestions"] if (sug["start"], sug["end"]) not in rejected]
+
+st.markdown("**Preview (existing spans highlighted, suggestions outlined):**", unsafe_allow_html=True)
+st.markdown(preview_html(article_id, version, gazetteer_mtime, frozenset(rejected)), unsafe_allow_html=True)
+st.divider()
+
+annotator = st.text_input("Annotator (optional)", value="manual")
+
+# Pre-annotation suggestions
+st.markdown("### 💡 Suggestions")
+if pending:
+    st.caption(
+        f"{len(pending)} suggestion(s) from extracted entities and the gazetteer. "
+        "Untick any you don't want, fix labels, then accept or reject the ticked rows."
+    )
+    sug_df = pd.DataFrame({
+        "Use": True,
+        "Text": [sug["text"] for sug in pending],
+        "Label": [sug["label"] for sug in pending],
+        "Source": [sug["source"] for sug in pending],
+        "Start": [sug["start"] for sug in pending],
+        "End": [sug["end"] for sug in pending],
+    })
+    edited = st.data_editor(
+        sug_df,
+        key=f"suggestions_{article_id}_{version}_{len(rejected)}",
+        hide_index=True,
+        use_container_width=True,
+        disabled=["Text", "Source", "Start", "End"],
+        column_config={
+            "Use": st.column_config.CheckboxColumn("Use"),
+            "Label": st.column_config.SelectboxColumn("Label", options=SPAN_LABELS, required=True),
+        },
+    )
+    picked = edited[edited["Use"]]
+    col1, col2 = st.columns(2)
+    if col1.button(f"✅ Accept {len(picked)} suggestion(s)", disabled=picked.empty):
+        added, skipped = add_spans(
+            article_id,
+            list(zip(picked["Start"], picked["End"], picked["Label"], picked["Text"])),
+            annotator,
+        )
+        report_added(added, skipped, "suggested span(s)")
+    if col2.button(f"🚫 Reject {len(picked)} suggestion(s)", disabled=picked.empty):
+        rejected.update(zip(picked["Start"].astype(int), picked["End"].astype(int)))
+        st.rerun()
+else:
+    st.caption("No suggestions for this article.")
 st.divider()
 
 # Annotate via substring search
@@ -114,7 +278,6 @@ if needle:
 occ_idx = st.number_input("Occurrence index (0-based)", min_value=0, max_value=max(0, len(occ_spans)-1), value=0, step=1, disabled=(len(occ_spans) == 0))
 
 label = st.selectbox("Label", options=SPAN_LABELS, index=0)
-annotator = st.text_input("Annotator (optional)", value="manual")
 
 col1, col2 = st.columns(2)
 with col1:
@@ -123,19 +286,8 @@ with col1:
             st.error("Enter an entity text and make sure it exists in the article.")
         else:
             start, end = occ_spans[int(occ_idx)]
-            span_text = full_text[start:end]
-            ann = ArticleSpanAnnotation(
-                article_id=article.id,
-                start_char=start,
-                end_char=end,
-                label=label,
-                text=span_text,
-                annotator=annotator or "manual"
-            )
-            s.add(ann)
-            s.commit()
-            st.success(f"Added span [{start}, {end}) → {label}")
-            st.rerun()
+            added, skipped = add_spans(article_id, [(start, end, label, full_text[start:end])], annotator)
+            report_added(added, skipped, f"span [{start}, {end}) → {label}")
 
 with col2:
     with st.expander("✍️ Or annotate by manual character offsets"):
@@ -145,30 +297,20 @@ with col2:
             if end_char <= start_char or end_char > len(full_text):
                 st.error("Invalid offsets.")
             else:
-                span_text = full_text[start_char:end_char]
-                ann = ArticleSpanAnnotation(
-                    article_id=article.id,
-                    start_char=int(start_char),
-                    end_char=int(end_char),
-                    label=label,
-                    text=span_text,
-                    annotator=annotator or "manual"
-                )
-                s.add(ann)
-                s.commit()
-                st.success(f"Added span [{start_char}, {end_char}) → {label}")
-                st.rerun()
+                start, end = int(start_char), int(end_char)
+                added, skipped = add_spans(article_id, [(start, end, label, full_text[start:end])], annotator)
+                report_added(added, skipped, f"span [{start}, {end}) → {label}")
 
 st.divider()
 st.markdown("### 🗂️ Existing annotations")
 
+existing = view["annotations"]
 if existing:
     for ann in existing:
-        st.markdown(f"- **{ann.label}**: `{ann.text}`  [{ann.start_char}, {ann.end_char})  —  {ann.annotator} @ {ann.created_at}")
-        if st.button(f"🗑️ Delete #{ann.id}", key=f"del_{ann.id}"):
-            s.delete(ann)
-            s.commit()
-            st.success(f"Deleted annotation {ann.id}")
+        st.markdown(f"- **{ann['label']}**: `{ann['text']}`  [{ann['start']}, {ann['end']})  —  {ann['annotator']} @ {ann['created_at']}")
+        if st.button(f"🗑️ Delete #{ann['id']}", key=f"del_{ann['id']}"):
+            delete_span(ann["id"])
+            st.session_state.flash = f"Deleted annotation {ann['id']}"
             st.rerun()
 else:
     st.info("No span annotations yet for this article.")
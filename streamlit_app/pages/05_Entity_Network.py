@@ -0,0 +1,70 @@
+# streamlit_app/pages/05_Entity_Network.py
+
+# --- bootstrap path ---
+import sys
+from pathlib import Path
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+# ----------------------
+
+import numpy as np
+import streamlit as st
+
+from data.db.article_model import get_session
+from data.db.versions import current_data_version, ARTICLES, ENTITIES
+from digester.cooccurrence import load_graph
+
+st.set_page_config(page_title="Entity Co-occurrence", layout="wide")
+st.title("🕸️ Entity Co-occurrence")
+st.caption("Who shows up in the same articles — by raw article count or pointwise mutual information (PMI).")
+
+# cache_resource: the graph is shared, not copied per rerun. Loading the saved
+# graph and syncing only adds articles it hasn't seen yet.
+@st.cache_resource(max_entries=2)
+def load_network(version):
+    graph = load_graph()
+    session = get_session()
+    try:
+        graph.sync(session)
+    finally:
+        session.close()
+    return graph
+
+graph = load_network(current_data_version(ARTICLES, ENTITIES))
+if len(graph) == 0:
+    st.warning("No processed articles yet. Fetch & process articles, then reload.")
+    st.stop()
+
+label_opts = sorted(set(graph.labels) - {""})
+
+st.sidebar.title("Settings")
+metric = st.sidebar.radio("Rank by", ["count", "pmi"], format_func=lambda m: "Articles together" if m == "count" else "PMI")
+k = st.sidebar.slider("Top k", min_value=5, max_value=100, value=20)
+min_count = st.sidebar.number_input("Min. articles together", min_value=1, max_value=100, value=2)
+
+st.markdown("### Neighbours of an entity")
+# most frequent names first so the common ones are easy to find
+by_freq = [graph.names[i] for i in np.argsort(-graph.doc_freq, kind="stable")]
+col1, col2 = st.columns([2, 3])
+with col1:
+    name = st.selectbox("Entity", by_freq, index=0)
+with col2:
+    neighbor_labels = st.multiselect("Only neighbours labelled", label_opts, default=[])
+st.caption(f"{name} appears in {int(graph.doc_freq[graph.index[name]])} of {graph.n_docs} articles.")
+st.dataframe(
+    graph.neighbors(name, k=k, metric=metric, labels=neighbor_labels or None, min_count=min_count),
+    use_container_width=True, hide_index=True,
+)
+
+st.divider()
+st.markdown("### Strongest pairs between two labels")
+col3, col4 = st.columns(2)
+with col3:
+    label_a = st.selectbox("Label A", label_opts, index=label_opts.index("UNIVERSITY") if "UNIVERSITY" in label_opts else 0)
+with col4:
+    label_b = st.selectbox("Label B", label_opts, index=label_opts.index("COMPANY") if "COMPANY" in label_opts else 0)
+pairs = graph.top_pairs(label_a, label_b, k=k, metric=metric, min_count=min_count)
+if pairs.empty:
+    st.info("No pairs above the minimum count.")
+else:
+    st.dataframe(pairs, use_container_width=True, hide_index=True)
@@ -0,0 +1,125 @@
+# streamlit_app/pages/06_Pipeline_Health.py
+
+# --- bootstrap path ---
+import sys
+from pathlib import Path
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+# ----------------------
+
+import glob
+import json
+import os
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import select
+
+from data.db.article_model import get_session, PipelineRun
+from data.db.versions import current_data_version, PIPELINE_RUNS
+from utils.metrics import METRICS_DIR
+
+st.set_page_config(page_title="Pipeline Health", layout="wide")
+st.title("🩺 Pipeline Health")
+st.caption("Per-stage timings and counters recorded by each fetch / process run (see utils/metrics.py).")
+
+@st.cache_data(max_entries=4)
+def load_runs(version, limit):
+    session = get_session()
+    try:
+        rows = session.execute(
+            select(PipelineRun.run_id, PipelineRun.name, PipelineRun.started_at,
+                   PipelineRun.duration_s, PipelineRun.status, PipelineRun.summary)
+            .order_by(PipelineRun.started_at.desc())
+            .limit(limit)
+        ).all()
+    finally:
+        session.close()
+    runs = pd.DataFrame(rows, columns=["run_id", "name", "started_at", "duration_s", "status", "summary"])
+    runs["summary"] = runs["summary"].map(json.loads)
+    return runs.sort_values("started_at").reset_index(drop=True)
+
+@st.cache_data(max_entries=8)
+def load_events(run_id, day):
+    """Raw JSON-line events of one run, when the logs are on this machine."""
+    events = []
+    for path in glob.glob(os.path.join(METRICS_DIR, f"metrics-{day}.jsonl")):
+        with open(path, "r", encoding="utf-8") as f:
+            events += [e for e in map(json.loads, f) if e.get("run_id") == run_id]
+    df = pd.DataFrame(events)
+    # stages carry different fields; mixed-type columns are shown as text
+    text_cols = df.select_dtypes("object").columns
+    df[text_cols] = df[text_cols].astype(str)
+    return df
+
+def stage_frame(runs, field="total_s"):
+    """runs × stages matrix of one aggregated stage field."""
+    return pd.DataFrame(
+        [{stage: agg.get(field, 0) for stage, agg in s["stages"].items()} for s in runs["summary"]],
+        index=runs["started_at"],
+    ).fillna(0)
+
+st.sidebar.title("Settings")
+limit = st.sidebar.slider("Runs to load", min_value=10, max_value=1000, value=200, step=10)
+
+runs = load_runs(current_data_version(PIPELINE_RUNS), limit)
+if runs.empty:
+    st.info("No instrumented runs yet. Run scripts/run_fetcher.py or scripts/process_articles.py.")
+    st.stop()
+
+names = sorted(runs["name"].unique())
+name = st.sidebar.selectbox("Pipeline", names, index=names.index("run_fetcher") if "run_fetcher" in names else 0)
+runs = runs[runs["name"] == name].reset_index(drop=True)
+
+latest = runs.iloc[-1]
+summary = latest["summary"]
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Last run", f"{latest['duration_s']:.1f}s", delta=(
+    f"{latest['duration_s'] - runs['duration_s'].iloc[-2]:+.1f}s" if len(runs) > 1 else None
+), delta_color="inverse")
+col2.metric("Status", latest["status"])
+col3.metric("DB queries", f"{summary['db']['queries']:,}")
+col4.metric("Time in DB", f"{summary['db']['total_s']:.1f}s")
+failed = int((runs["status"] != "ok").sum())
+if failed:
+    st.warning(f"{failed} of the last {len(runs)} runs ended with an error.")
+
+st.markdown("### Run duration")
+st.line_chart(runs.set_index("started_at")["duration_s"])
+
+st.markdown("### Time per stage")
+st.bar_chart(stage_frame(runs))
+
+if name == "process_articles":
+    ner = stage_frame(runs, "items").get("ner")
+    if ner is not None:
+        st.markdown("### NER throughput")
+        ner_s = stage_frame(runs).get("ner")
+        st.line_chart(pd.DataFrame({"docs / s": (ner / ner_s.where(ner_s > 0)).fillna(0)}))
+
+st.markdown("### Database")
+db = pd.DataFrame([s["db"] for s in runs["summary"]], index=runs["started_at"])
+st.line_chart(db[["total_s", "max_s"]].rename(columns={"total_s": "total query time (s)", "max_s": "slowest query (s)"}))
+
+run_ids = runs["run_id"].tolist()[::-1]
+picked = st.selectbox("Inspect run", run_ids, index=0)
+run = runs[runs["run_id"] == picked].iloc[0]
+
+stages = pd.DataFrame(run["summary"]["stages"]).T.sort_values("total_s", ascending=False)
+st.markdown("#### Stages")
+st.dataframe(stages, use_container_width=True)
+
+feeds = run["summary"].get("feeds") or {}
+if feeds:
+    st.markdown("#### Feeds")
+    feed_df = pd.DataFrame(feeds).T.fillna(0)
+    if "feed_request_s" in feed_df:
+        feed_df = feed_df.sort_values("feed_request_s", ascending=False)
+    st.dataframe(feed_df, use_container_width=True)
+
+with st.expander("📜 Raw events"):
+    events = load_events(run["run_id"], f"{run['started_at']:%Y-%m-%d}")
+    if events.empty:
+        st.caption(f"No event log for this run under {METRICS_DIR}/ (CI runs keep theirs on the runner).")
+    else:
+        st.dataframe(events, use_container_width=True)
@@ -0,0 +1,50 @@
+# streamlit_app/related_panel.py
+#
+# "Related articles" panel shared by the Span Annotator and Label Correction
+# pages. Lives outside pages/ so Streamlit doesn't list it as a page; the
+# index is a cache_resource, so both pages share one copy per data version.
+import streamlit as st
+
+from data.db.article_model import get_session
+from data.db.versions import ARTICLES, current_data_version
+from digester.related import load_index, related_articles
+
+
+@st.cache_resource(max_entries=2)
+def related_index(version):
+    # start from the saved index and append whatever it hasn't seen yet
+    index = load_index()
+    session = get_session()
+    try:
+        index.sync(session)
+    finally:
+        session.close()
+    return index
+
+
+def render_related(article_id, on_pick=None, k=5, key_prefix="related"):
+    """
+    List the k most similar articles. When `on_pick` is given, each row gets a
+    button that calls on_pick(related_article_id, title) as an on_click callback.
+    """
+    index = related_index(current_data_version(ARTICLES))
+    session = get_session()
+    try:
+        df = related_articles(session, index, article_id, k)
+    finally:
+        session.close()
+
+    if df.empty:
+        st.caption("No related articles found.")
+        return
+    for row in df.itertuples(index=False):
+        col1, col2 = st.columns([5, 1])
+        col1.markdown(
+            f"**{row.Title or '(untitled)'}** — {row.Source} · {row.Published} "
+            f"· similarity {row.Similarity:.2f}" + (f" · [🔗]({row.Link})" if row.Link else "")
+        )
+        if on_pick is not None:
+            col2.button(
+                "Open", key=f"{key_prefix}_{article_id}_{row[0]}",
+                on_click=on_pick, args=(int(row[0]), row.Title),
+            )
@@ -0,0 +1,232 @@
+# utils/metrics.py
+#
+# Lightweight pipeline instrumentation. An entry point wraps its work in
+# pipeline_run(name); inside it, stage() blocks record durations plus counters
+# (bytes, rows, entries, ...) optionally tagged with a feed. Every stage is
+# appended as a JSON line to logs/metrics-YYYY-MM-DD.jsonl, and when the run
+# ends its aggregated summary goes to logs/runs.jsonl and the pipeline_runs
+# table (read by the Pipeline Health page). Engines created by get_session()
+# report every query's execution time into the active run.
+#
+# The active run is thread-local, and with no active run every call is a
+# no-op, so Streamlit pages and ad-hoc scripts pay nothing.
+import json
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+METRICS_DIR = os.environ.get("METRICS_DIR", "logs")
+
+_local = threading.local()
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+class Run:
+    def __init__(self, name):
+        self.name = name
+        self.started_at = datetime.utcnow()
+        self.run_id = f"{name}-{self.started_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+        self._t0 = time.perf_counter()
+        self.stages = defaultdict(lambda: defaultdict(float))
+        self.feeds = defaultdict(lambda: defaultdict(float))
+        self.counters = defaultdict(float)
+        self.db = {"queries": 0, "total_s": 0.0, "max_s": 0.0}
+        self._events = None
+
+    def _write(self, event):
+        if self._events is None:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+            path = os.path.join(METRICS_DIR, f"metrics-{self.started_at:%Y-%m-%d}.jsonl")
+            self._events = open(path, "a", encoding="utf-8")
+        self._events.write(json.dumps(event, default=str) + "\n")
+
+    def record(self, stage, duration_s, feed=None, **counters):
+        agg = self.stages[stage]
+        agg["calls"] += 1
+        agg["total_s"] += duration_s
+        agg["max_s"] = max(agg["max_s"], duration_s)
+        for k, v in counters.items():
+            if isinstance(v, (int, float)) and not isinstance(v, bool):
+                agg[k] += v
+        if feed is not None:
+            per_feed = self.feeds[feed]
+            per_feed[f"{stage}_s"] += duration_s
+            for k, v in counters.items():
+                if isinstance(v, (int, float)) and not isinstance(v, bool):
+                    per_feed[k] += v
+        event = {
+            "ts": datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+            "run_id": self.run_id, "run": self.name, "stage": stage,
+            "duration_s": round(duration_s, 6),
+        }
+        if feed is not None:
+            event["feed"] = feed
+        event.update(counters)
+        self._write(event)
+
+    def observe_query(self, duration_s):
+        self.db["queries"] += 1
+        self.db["total_s"] += duration_s
+        self.db["max_s"] = max(self.db["max_s"], duration_s)
+
+    def summary(self, status="ok"):
+        def plain(d):
+            # durations stay float seconds; counters accumulated as floats go back to ints
+            return {
+                k: round(v, 6) if k.endswith("_s") else (int(v) if float(v).is_integer() else v)
+                for k, v in d.items()
+            }
+        return {
+            "run_id": self.run_id,
+            "name": self.name,
+            "started_at": self.started_at.isoformat(timespec="seconds") + "Z",
+            "duration_s": round(time.perf_counter() - self._t0, 3),
+            "status": status,
+            "stages": {k: plain(v) for k, v in self.stages.items()},
+            "feeds": {k: plain(v) for k, v in self.feeds.items()},
+            "counters": plain(self.counters),
+            "db": plain(self.db),
+        }
+
+    def finish(self, status="ok"):
+        summary = self.summary(status)
+        self._write({"ts": datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+                     "run_id": self.run_id, "run": self.name, "stage": "run_end",
+                     "duration_s": summary["duration_s"], "status": status})
+        self._events.close()
+        with open(os.path.join(METRICS_DIR, "runs.jsonl"), "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+        _store_summary(summary)
+        return summary
+
+
+def _store_summary(summary):
+    # imported here: article_model imports this module for the query hooks
+    from data.db.article_model import PipelineRun, get_session
+    from data.db.versions import bump_version, PIPELINE_RUNS
+
+    session = get_session()
+    try:
+        session.add(PipelineRun(
+            run_id=summary["run_id"],
+            name=summary["name"],
+            started_at=datetime.fromisoformat(summary["started_at"].rstrip("Z")),
+            duration_s=summary["duration_s"],
+            status=summary["status"],
+            summary=json.dumps(summary),
+        ))
+        bump_version(session, PIPELINE_RUNS)
+        session.commit()
+    except Exception as ex:
+        session.rollback()
+        print(f"[Metrics] Could not store run summary: {ex}")
+    finally:
+        session.close()
+
+
+@contextmanager
+def pipeline_run(name):
+    """Make `name` the active run for this thread; its summary is stored on exit."""
+    outer = current_run()
+    run = Run(name)
+    _local.run = run
+    status = "ok"
+    try:
+        yield run
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        _local.run = outer
+        summary = run.finish(status)
+        print(f"[Metrics] {name} {status} in {summary['duration_s']:.1f}s "
+              f"({summary['db']['queries']} queries, {summary['db']['total_s']:.2f}s in the DB)")
+
+
+def record(stage, duration_s, feed=None, **counters):
+    run = current_run()
+    if run is not None:
+        run.record(stage, duration_s, feed=feed, **counters)
+
+
+def count(name, n=1):
+    run = current_run()
+    if run is not None:
+        run.counters[name] += n
+
+
+@contextmanager
+def stage(name, feed=None, **counters):
+    """
+    Time a block as one `name` event. The yielded dict collects counters:
+
+        with metrics.stage("feed_request", feed=name) as m:
+            resp = requests.get(url)
+            m["bytes"] = len(resp.content)
+    """
+    data = dict(counters)
+    t0 = time.perf_counter()
+    try:
+        yield data
+    except Exception as ex:
+        data["error"] = type(ex).__name__
+        raise
+    finally:
+        record(name, time.perf_counter() - t0, feed=feed, **data)
+
+
+def timed_iter(iterable, name, **counters):
+    """
+    Yield from `iterable`, timing only the time spent producing items (e.g. NER
+    batches interleaved with DB writes); records one `name` event at the end
+    with the number of `items` plus `counters`.
+    """
+    run = current_run()
+    if run is None:
+        yield from iterable
+        return
+    busy = 0.0
+    items = 0
+    it = iter(iterable)
+    try:
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                busy += time.perf_counter() - t0
+                break
+            busy += time.perf_counter() - t0
+            items += 1
+            yield item
+    finally:
+        run.record(name, busy, items=items, **counters)
+
+
+def instrument_engine(engine):
+    """Report every cursor execution's wall time to the thread's active run."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["metrics_query_start"].pop()
+        run = current_run()
+        if run is not None:
+            run.observe_query(time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("metrics_query_start"):
+            conn.info["metrics_query_start"].pop()
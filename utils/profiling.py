@@ -0,0 +1,94 @@
+# utils/profiling.py
+#
+# Opt-in profiling for entry points. `--profile` (or PROFILE=1 in the
+# environment) wraps a run in cProfile plus tracemalloc; on exit the CPU
+# profile (.prof, open with snakeviz / pstats), the memory snapshot
+# (.tracemalloc) and a text summary are written to logs/ with a timestamp, and
+# the top-N hotspots are printed.
+import cProfile
+import io
+import os
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "logs")
+TOP_N = int(os.environ.get("PROFILE_TOP", "25"))
+
+_TRUE = {"1", "true", "yes", "on"}
+
+
+def profiling_enabled(flag=False):
+    return bool(flag) or os.environ.get("PROFILE", "").strip().lower() in _TRUE
+
+
+def memory_enabled():
+    # tracemalloc slows allocation-heavy code 2-3x; PROFILE_MEMORY=0 keeps CPU numbers honest
+    return os.environ.get("PROFILE_MEMORY", "1").strip().lower() in _TRUE
+
+
+def add_profile_argument(parser):
+    parser.add_argument("--profile", action="store_true",
+                        help="Write a cProfile + tracemalloc profile to logs/ and print hotspots (or PROFILE=1)")
+
+
+def hotspot_summary(prof, snapshot=None, top=TOP_N):
+    """Text report: top functions by own time and by cumulative time, plus top allocation sites."""
+    out = io.StringIO()
+    for sort, title in (("tottime", "own time"), ("cumulative", "cumulative time")):
+        out.write(f"── Top {top} functions by {title} ──\n")
+        stats = pstats.Stats(prof, stream=out)
+        stats.strip_dirs().sort_stats(sort).print_stats(top)
+    if snapshot is not None:
+        out.write(f"── Top {top} allocation sites (live at exit) ──\n")
+        for stat in snapshot.statistics("lineno")[:top]:
+            frame = stat.traceback[0]
+            out.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}\n")
+    return out.getvalue()
+
+
+@contextmanager
+def profiled(name, enabled=None, top=TOP_N):
+    """
+    Profile the block when enabled (default: PROFILE env var). Yields the
+    output path prefix, or None when profiling is off.
+    """
+    if enabled is None:
+        enabled = profiling_enabled()
+    if not enabled:
+        yield None
+        return
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    now = datetime.now()
+    prefix = os.path.join(PROFILE_DIR, f"profile-{name}-{now:%Y%m%dT%H%M%S}-{now.microsecond // 1000:03d}")
+    memory = memory_enabled()
+    if memory:
+        tracemalloc.start(10)
+    prof = cProfile.Profile()
+    t0 = time.perf_counter()
+    prof.enable()
+    try:
+        yield prefix
+    finally:
+        prof.disable()
+        elapsed = time.perf_counter() - t0
+        snapshot = None
+        peak = None
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            snapshot.dump(prefix + ".tracemalloc")
+        prof.dump_stats(prefix + ".prof")
+
+        header = f"[Profile] {name}: {elapsed:.2f}s wall"
+        if peak is not None:
+            header += f", peak traced memory {peak / 2**20:.1f} MiB"
+        report = header + "\n" + hotspot_summary(prof, snapshot, top)
+        with open(prefix + ".txt", "w", encoding="utf-8") as f:
+            f.write(report)
+        print(report)
+        print(f"[Profile] Wrote {prefix}.prof" + (f", {prefix}.tracemalloc" if memory else "") + f", {prefix}.txt")